@@ -1,12 +1,19 @@
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
+from app.config import USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_SIZE, TOKEN_CACHE_MAX_SIZE, REVOKED_TOKENS_MAX_SIZE
+from app.database import get_read_db
 from app.models import User
+from app.password_hasher import password_hasher
 
 # Security configurations
 SECRET_KEY = "your-secret-key-change-in-production"  # TODO: Move to environment variable
@@ -20,6 +27,50 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Lightweight identity of the authenticated user, cheap to cache and share"""
+    id: int
+    email: str
+    username: str
+
+
+# Verified token payloads keyed by the raw token, each kept until the token's exp
+token_cache = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60, name="token")
+
+# Revoked tokens, each kept until its exp (after which it fails verification anyway).
+# Per process: a revocation reaches only the worker that recorded it.
+revoked_tokens = TTLCache(maxsize=REVOKED_TOKENS_MAX_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+# Principals of recently authenticated users, keyed by user id
+principal_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS, name="principal")
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changed_users(session, flush_context):
+    """Remember users updated or deleted by an ORM flush, to evict once committed"""
+    changed = {obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault("changed_users", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals(session):
+    """Drop the cached principals of users changed by the committed transaction.
+
+    Evicting at commit (not at flush) keeps a concurrent read from re-caching
+    the old row. Core update(User) statements and reads that overlap the commit
+    are not covered: their staleness is bounded only by USER_CACHE_TTL_SECONDS.
+    """
+    for user_id in session.info.pop("changed_users", ()):
+        principal_cache.pop(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_users", None)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -30,6 +81,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the dedicated hashing pool, off the event loop"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the dedicated hashing pool, off the event loop"""
+    return await password_hasher.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -44,10 +105,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_token(token: str) -> dict:
-    """Decode a JWT token"""
+    """Decode a JWT token, reusing the verified payload of tokens seen before"""
+    if revoked_tokens.get(token) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,12 +126,38 @@ def decode_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    exp = payload.get("exp")
+    if exp is not None:
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(token, payload, ttl=remaining)
+    return payload
+
+
+def revoke_token(token: str):
+    """Reject a token from now on, even if its verified payload is cached"""
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp", 0)
+    except JWTError:
+        return
+
+    remaining = exp - time.time()
+    if remaining > 0:
+        revoked_tokens.set(token, True, ttl=remaining)
+    token_cache.pop(token)
+
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user"""
+    db: AsyncSession = Depends(get_read_db)
+) -> UserPrincipal:
+    """Get the principal of the current authenticated user (cached by user id)"""
+    # Sub-requests of POST /api/batch run as the user the batch authenticated
+    principal = request.scope.get("batch_principal")
+    if principal is not None:
+        return principal
+
     token = credentials.credentials
     payload = decode_token(token)
 
@@ -81,22 +178,51 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(select(User.id, User.email, User.username).where(User.id == user_id))
+    row = result.first()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    principal = UserPrincipal(id=row.id, email=row.email, username=row.username)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+async def get_current_db_user(
+    principal: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+) -> User:
+    """Load the full ORM User for routes that need more than the principal"""
+    user = await db.get(User, principal.id)
+    if user is None:
+        principal_cache.pop(principal.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    """Authenticate a user by email and password"""
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    """Authenticate a user by email and password.
+
+    The session is closed once the user is loaded, so its connection goes back
+    to the pool while bcrypt runs.
+    """
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
+    await db.close()
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
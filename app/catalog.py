@@ -0,0 +1,43 @@
+import hashlib
+from typing import Dict, List, Optional
+from app.mock_data import MOCK_TOURNAMENTS, MOCK_PLAYERS, MOCK_PLAYER_ODDS
+
+
+class Catalog:
+    """In-process cache of the read-only catalog (tournaments, players and odds).
+
+    The catalog changes rarely compared to how often it is read, so lookups are
+    served from dictionaries built once instead of scanning the source lists.
+    Call `reload()` after the underlying data changes to rebuild the indexes.
+    """
+
+    def __init__(self):
+        self.reload()
+
+    def reload(self):
+        """Rebuild the lookup indexes and bump the catalog version"""
+        self._tournaments: Dict[int, dict] = {t["id"]: t for t in MOCK_TOURNAMENTS}
+        self._players: Dict[int, dict] = {p["id"]: p for p in MOCK_PLAYERS}
+        self._odds: Dict[int, List[dict]] = {}
+        for odds in MOCK_PLAYER_ODDS:
+            self._odds.setdefault(odds["tournament_id"], []).append(odds)
+
+        digest = hashlib.blake2s(digest_size=8)
+        for source in (MOCK_TOURNAMENTS, MOCK_PLAYERS, MOCK_PLAYER_ODDS):
+            digest.update(repr(source).encode())
+        self.version = digest.hexdigest()
+
+    def get_tournament(self, tournament_id: int) -> Optional[dict]:
+        """Get a tournament by ID"""
+        return self._tournaments.get(tournament_id)
+
+    def get_player(self, player_id: int) -> Optional[dict]:
+        """Get a player by ID"""
+        return self._players.get(player_id)
+
+    def get_player_odds(self, tournament_id: int) -> List[dict]:
+        """Get all player odds for a tournament"""
+        return self._odds.get(tournament_id, [])
+
+
+catalog = Catalog()
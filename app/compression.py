@@ -0,0 +1,141 @@
+import gzip
+from typing import Dict, Iterable, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from app.config import COMPRESSION_MIN_SIZE_BYTES
+
+# Brotli and zstd are optional; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content codings by preference, as (per-request compressor, compressor for
+# payloads encoded once and cached, where a slower, denser level pays off)
+CODECS: Dict[str, tuple] = {}
+if zstandard is not None:
+    CODECS["zstd"] = (zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdCompressor(level=19).compress)
+if brotli is not None:
+    CODECS["br"] = (
+        lambda data: brotli.compress(data, quality=4),
+        lambda data: brotli.compress(data, quality=11),
+    )
+CODECS["gzip"] = (
+    lambda data: gzip.compress(data, compresslevel=6, mtime=0),
+    lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Iterable[str] = CODECS) -> Optional[str]:
+    """The preferred available coding the client accepts (highest q-value, then our order), or None"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for name in available:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compresses JSON and text responses of at least `minimum_size` bytes.
+
+    Uses zstd or brotli when installed and accepted, gzip otherwise. Responses
+    that already carry a Content-Encoding (precompressed payloads) and
+    streaming responses are passed through unchanged.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        compress = CODECS[encoding][0]
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            # First body message: decide now that the size is known
+            passthrough = True
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                "content-encoding" not in headers
+                and not message.get("more_body", False)
+                and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                and len(body) >= self.minimum_size
+            ):
+                body = compress(body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+class CompressedPayload:
+    """A cacheable response body, compressed once with every available coding.
+
+    Serving it only picks the variant the client accepts, so cached payloads
+    cost no compression per request. Codings that would not shrink the body
+    (or bodies under the compression threshold) are not kept.
+    """
+
+    __slots__ = ("body", "media_type", "encoded")
+
+    def __init__(self, body: bytes, media_type: str = "application/json", minimum_size: int = COMPRESSION_MIN_SIZE_BYTES):
+        self.body = body
+        self.media_type = media_type
+        self.encoded: Dict[str, bytes] = {}
+        if len(body) >= minimum_size:
+            for name, (_, compress_static) in CODECS.items():
+                encoded = compress_static(body)
+                if len(encoded) < len(body):
+                    self.encoded[name] = encoded
+
+    def response(self, accept_encoding: Optional[str]) -> Response:
+        """The payload in the best coding accepted by the client"""
+        headers = {"Vary": "Accept-Encoding"} if self.encoded else {}
+        encoding = choose_encoding(accept_encoding, self.encoded)
+        if encoding is None:
+            return Response(self.body, media_type=self.media_type, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(self.encoded[encoding], media_type=self.media_type, headers=headers)
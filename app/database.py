@@ -1,26 +1,214 @@
-from sqlalchemy import create_engine
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.cache import TTLCache
+from app.metrics import DB_CHECKOUT_WAIT, DB_CONNECTIONS_IN_USE
+from app.config import (
+    DATABASE_URL,
+    DATABASE_READ_URL,
+    READ_YOUR_WRITES_SECONDS,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_PRE_PING,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_MMAP_SIZE,
+    SQLITE_CACHE_SIZE_KB,
+)
+
+# Async drivers for each supported backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> URL:
+    """Map a sync database URL (e.g. sqlite://, postgresql+psycopg2://) to its async driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported database backend: {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def timed_pool_class(poolclass, name: str):
+    """Subclass of `poolclass` recording how long each checkout waits, as DB_CHECKOUT_WAIT{engine=name}.
+
+    Only actual checkouts are timed, so sessions that never run a query cost nothing.
+    """
+    checkout_wait = DB_CHECKOUT_WAIT.labels(name)
+
+    class TimedPool(poolclass):
+        def _do_get(self):
+            started_at = time.perf_counter()
+            connection = super()._do_get()
+            checkout_wait.observe(time.perf_counter() - started_at)
+            return connection
+
+    TimedPool.__name__ = f"Timed{poolclass.__name__}"
+    return TimedPool
+
+
+def engine_options(url: str, is_async: bool = False, name: Optional[str] = None) -> dict:
+    """Pool settings for an engine; in-memory SQLite uses a single shared connection instead.
+
+    With a `name`, the pool records its checkout wait under that engine label.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}  # Needed for SQLite
+        if parsed.database in (None, "", ":memory:"):
+            return options
+    else:
+        options = {}
+    # For file SQLite, aiosqlite would otherwise open a new connection (and rerun the pragmas) per session
+    poolclass = AsyncAdaptedQueuePool if is_async else QueuePool
+    options["poolclass"] = timed_pool_class(poolclass, name) if name else poolclass
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection.
+
+    WAL lets readers proceed while a writer commits; NORMAL sync is safe in WAL
+    mode; busy_timeout makes writers wait for the lock instead of failing.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")  # Negative means KiB
+    cursor.close()
+
+
+def configure_engine(sync_engine, read_only: bool = False):
+    """Attach backend-specific connection setup to an engine"""
+    is_sqlite = sync_engine.dialect.name == "sqlite"
+    if is_sqlite:
+        event.listen(sync_engine, "connect", set_sqlite_pragmas)
+
+    if read_only:
+        statement = "PRAGMA query_only=ON" if is_sqlite else "SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY"
+
+        def set_read_only(dbapi_connection, connection_record):
+            """Reject writes on connections of the read engine"""
+            cursor = dbapi_connection.cursor()
+            cursor.execute(statement)
+            cursor.close()
+
+        event.listen(sync_engine, "connect", set_read_only)
+
+
+def instrument_pool(sync_engine, name: str):
+    """Track the engine's checked-out connections as a metric"""
+    in_use = DB_CONNECTIONS_IN_USE.labels(name)
+    event.listen(sync_engine, "checkout", lambda *args: in_use.inc())
+    event.listen(sync_engine, "checkin", lambda *args: in_use.dec())
+
 
-# Database URL - Using SQLite for development
-SQLALCHEMY_DATABASE_URL = "sqlite:///./fantasy_golf.db"
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
+ASYNC_SQLALCHEMY_DATABASE_URL = to_async_url(DATABASE_URL)
 
-# Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+# Sync engine, used for schema management and offline scripts
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+configure_engine(engine)
+
+# Async engine, used by the API so requests never block the event loop
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL, is_async=True, name="primary")
+)
+configure_engine(async_engine.sync_engine)
+instrument_pool(async_engine.sync_engine, "primary")
+
+# Read engine: the replica when configured, otherwise read-only connections to the
+# primary so GETs do not share the pool with webhook and team writes
+SQLALCHEMY_READ_DATABASE_URL = DATABASE_READ_URL or SQLALCHEMY_DATABASE_URL
+read_async_engine = create_async_engine(
+    to_async_url(SQLALCHEMY_READ_DATABASE_URL),
+    **engine_options(SQLALCHEMY_READ_DATABASE_URL, is_async=True, name="read")
 )
+configure_engine(read_async_engine.sync_engine, read_only=True)
+instrument_pool(read_async_engine.sync_engine, "read")
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+class PrimarySession(Session):
+    """Session class behind the primary AsyncSession, so write tracking ignores other sessions"""
+
+
+# Async sessions keep attributes loaded after commit: lazy loads are not allowed
+# outside of awaited calls, so expiring everything on commit would break responses
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=read_async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Callers that committed a write recently keep reading from the primary until the
+# replica has caught up (read-your-writes). Keyed by the caller's Authorization header.
+recent_writers = TTLCache(maxsize=100000, ttl=READ_YOUR_WRITES_SECONDS)
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _record_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _stick_to_primary(session):
+    if session.info.pop("wrote", False) and session.info.get("caller"):
+        recent_writers.set(session.info["caller"], True)
+
+
+def read_session_factory(caller: Optional[str]):
+    """Pick the session factory for a read: the primary for recent writers, else the read engine"""
+    if caller and recent_writers.get(caller):
+        return AsyncSessionLocal
+    return AsyncReadSessionLocal
+
+
 # Create Base class for models
 Base = declarative_base()
 
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        db.info["caller"] = request.headers.get("authorization")
+        yield db
+
+
+# Dependency for endpoints that open a session only when they need one
+async def get_session_factory():
+    return AsyncSessionLocal
+
+
+# Dependency to get a read-only database session for GET endpoints
+async def get_read_db(request: Request):
+    session_factory = read_session_factory(request.headers.get("authorization"))
+    async with session_factory() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,88 @@
+import typing
+from typing import Any, Dict, List, Optional, Set, Type
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+
+# Requested fields: name -> None for the whole field, or the requested
+# fields of a nested model ("picks.player_id"). None means every field.
+FieldSet = Optional[Dict[str, Optional[Set[str]]]]
+
+
+def _nested_schema(schema: Type[BaseModel], name: str) -> Optional[Type[BaseModel]]:
+    """The model of a nested (or list of nested) field, if it is one"""
+    annotation = schema.model_fields[name].annotation
+    for candidate in (annotation, *typing.get_args(annotation)):
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+def parse_fields(schema: Type[BaseModel], value: Optional[str]) -> FieldSet:
+    """Parse a comma-separated `fields` value against a response schema"""
+    if not value:
+        return None
+    fields: Dict[str, Optional[Set[str]]] = {}
+    unknown = []
+    for item in value.split(","):
+        name, _, nested = item.strip().partition(".")
+        if not name:
+            continue
+        if name not in schema.model_fields:
+            unknown.append(item.strip())
+        elif not nested:
+            fields[name] = None
+        else:
+            nested_schema = _nested_schema(schema, name)
+            if nested_schema is None or nested not in nested_schema.model_fields:
+                unknown.append(item.strip())
+            elif name not in fields:
+                fields[name] = {nested}
+            elif fields[name] is not None:
+                fields[name].add(nested)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    return fields or None
+
+
+def field_selector(schema: Type[BaseModel]):
+    """Dependency reading the `fields` query parameter of routes returning `schema`"""
+    def select_fields(
+        fields: Optional[str] = Query(
+            None, description="Comma-separated fields to return (nested fields as parent.field); all by default"
+        )
+    ) -> FieldSet:
+        return parse_fields(schema, fields)
+    return select_fields
+
+
+def wants(fields: FieldSet, name: str) -> bool:
+    """Whether a field is part of the response"""
+    return fields is None or name in fields
+
+
+def load_columns(model, fields: Dict[str, Any]) -> List:
+    """The mapped columns of `model` among the requested fields, for load_only"""
+    columns = model.__mapper__.column_attrs
+    return [getattr(model, name) for name in fields if name in columns]
+
+
+def sparse_content(obj, schema: Type[BaseModel], fields: FieldSet) -> dict:
+    """The requested fields of an ORM object or dict as plain data, in schema order"""
+    content = {}
+    for name in schema.model_fields:
+        if not wants(fields, name):
+            continue
+        value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+        nested_schema = _nested_schema(schema, name)
+        if nested_schema is not None and value is not None:
+            nested = fields.get(name) if fields is not None else None
+            nested_fields = dict.fromkeys(nested) if nested else None
+            if isinstance(value, list):
+                value = [sparse_content(item, nested_schema, nested_fields) for item in value]
+            else:
+                value = sparse_content(value, nested_schema, nested_fields)
+        content[name] = value
+    return content
@@ -0,0 +1,161 @@
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from app.config import QUERY_BUDGET_MODE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestStats:
+    """SQL work done while serving one request"""
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Stats of the request being served; async sessions run their queries in a greenlet
+# that inherits this context, and threadpool work gets a copy pointing at the same object
+_current_stats: contextvars.ContextVar = contextvars.ContextVar("request_stats", default=None)
+
+
+def current_request_stats():
+    """Stats of the request in progress, or None outside of a request"""
+    return _current_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        if context is not None:
+            context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    started_at = getattr(context, "_query_started_at", None)
+    if stats is not None and started_at is not None:
+        stats.db_seconds += time.perf_counter() - started_at
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in assertion mode when a route runs more queries than its budget"""
+
+
+def query_budget(max_queries: int):
+    """Declare the most queries an endpoint may run per request"""
+    def decorator(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+
+class RouteQueryStats:
+    """Query count and DB time aggregated per route template"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route: str, stats: RequestStats):
+        with self._lock:
+            totals = self._routes.get(route)
+            if totals is None:
+                totals = self._routes[route] = {
+                    "requests": 0,
+                    "queries_total": 0,
+                    "queries_max": 0,
+                    "db_seconds_total": 0.0,
+                    "db_seconds_max": 0.0,
+                }
+            totals["requests"] += 1
+            totals["queries_total"] += stats.queries
+            totals["queries_max"] = max(totals["queries_max"], stats.queries)
+            totals["db_seconds_total"] += stats.db_seconds
+            totals["db_seconds_max"] = max(totals["db_seconds_max"], stats.db_seconds)
+
+    def snapshot(self) -> dict:
+        """Per-route totals, maxima and averages"""
+        with self._lock:
+            return {
+                route: {
+                    "requests": totals["requests"],
+                    "queries_avg": round(totals["queries_total"] / totals["requests"], 2),
+                    "queries_max": totals["queries_max"],
+                    "db_seconds_avg": round(totals["db_seconds_total"] / totals["requests"], 6),
+                    "db_seconds_max": round(totals["db_seconds_max"], 6),
+                }
+                for route, totals in self._routes.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_query_stats = RouteQueryStats()
+
+
+def route_name(scope) -> str:
+    """"METHOD /path/{template}" for a routed request, None when no route matched"""
+    route = scope.get("route")
+    if route is None:
+        return None
+    return f"{scope['method']} {route.path}"
+
+
+class QueryStatsMiddleware:
+    """Counts queries and DB time per request.
+
+    Totals are sent as a `Server-Timing` header and aggregated per route. When
+    an endpoint declares a `query_budget`, going over it is logged ("warn") or
+    raises QueryBudgetExceeded ("raise", used by the test suite).
+    """
+
+    def __init__(self, app, mode: str = QUERY_BUDGET_MODE):
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        started_at = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                self.check_budget(scope, stats)
+                total_ms = (time.perf_counter() - started_at) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", app;dur={total_ms:.2f}',
+                )
+            await send(message)
+
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            route = route_name(scope)
+            if route is not None:
+                route_query_stats.record(route, stats)
+
+    def check_budget(self, scope, stats: RequestStats):
+        budget = getattr(scope.get("endpoint"), "query_budget", None)
+        if budget is None or stats.queries <= budget or self.mode == "off":
+            return
+        message = f"{route_name(scope)} ran {stats.queries} queries, over its budget of {budget}"
+        if self.mode == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -7,6 +7,7 @@ from app.models.entry import Entry, PaymentStatus
 from app.models.team import Team
 from app.models.team_pick import TeamPick
 from app.models.leaderboard import Leaderboard
+from app.models.webhook_event import WebhookEvent, WebhookEventStatus
 
 __all__ = [
     "User",
@@ -21,4 +22,6 @@ __all__ = [
     "Team",
     "TeamPick",
     "Leaderboard",
+    "WebhookEvent",
+    "WebhookEventStatus",
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Enum, Float, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Float, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -20,12 +20,16 @@ class Entry(Base):
     payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
     amount_paid = Column(Float, default=0.0)  # Actual amount received after Stripe fees
     total_score = Column(Float, default=0.0)  # Accumulated points
+    # Stripe ids, so payment events find their entry without asking Stripe
+    stripe_checkout_session_id = Column(String, index=True)
+    stripe_payment_intent_id = Column(String, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # A user can only have one entry per league
+    # A user can only have one entry per league (also serves lookups by user_id)
     __table_args__ = (
         UniqueConstraint('user_id', 'league_id', name='_user_league_uc'),
+        Index('ix_entries_league_id_total_score', 'league_id', 'total_score'),
     )
 
     # Relationships
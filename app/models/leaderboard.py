@@ -1,16 +1,22 @@
 from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 from app.database import Base
 
 
+def round_money(value: float) -> float:
+    """Round to cents, half up, the way SQL ROUND on NUMERIC does (pools are also adjusted in SQL)"""
+    return float(Decimal(f"{value:.15g}").quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
 class Leaderboard(Base):
     __tablename__ = "leaderboards"
 
     id = Column(Integer, primary_key=True, index=True)
     league_id = Column(Integer, ForeignKey("leagues.id"), nullable=False, unique=True)
     rankings = Column(JSON)  # Store rankings as JSON: [{"entry_id": 1, "position": 1, "score": 150.5, "prize": 600}, ...]
-    prize_pool = Column(Float, default=0.0)  # Total prize pool (entry_fee * num_entries)
+    prize_pool = Column(Float, default=0.0)  # Running total of amount_paid over the league's entries
     first_place_prize = Column(Float, default=0.0)  # 60% of pool
     second_place_prize = Column(Float, default=0.0)  # 30% of pool
     third_place_prize = Column(Float, default=0.0)  # 10% of pool
@@ -20,8 +26,40 @@ class Leaderboard(Base):
     league = relationship("League", back_populates="leaderboard")
 
     def calculate_prizes(self, entries):
-        """Calculate prize distribution based on actual amounts received after Stripe fees"""
-        self.prize_pool = round(sum(e.amount_paid for e in entries), 2)
-        self.first_place_prize = round(self.prize_pool * 0.60, 2)
-        self.second_place_prize = round(self.prize_pool * 0.30, 2)
-        self.third_place_prize = round(self.prize_pool * 0.10, 2)
+        """Recompute the prize pool from scratch from the amounts received after Stripe fees.
+
+        The stored pool is kept up to date incrementally by payment processing
+        (see adjust_prize_pools); this full recomputation is for repairs.
+        """
+        self.prize_pool = round_money(sum(e.amount_paid for e in entries))
+        self.first_place_prize = round_money(self.prize_pool * 0.60)
+        self.second_place_prize = round_money(self.prize_pool * 0.30)
+        self.third_place_prize = round_money(self.prize_pool * 0.10)
+
+    def prize_for_position(self, position):
+        """Get the prize for a finishing position (only the top 3 are paid)"""
+        if position == 1:
+            return self.first_place_prize
+        if position == 2:
+            return self.second_place_prize
+        if position == 3:
+            return self.third_place_prize
+        return 0.0
+
+    def build_rankings(self, entries, usernames):
+        """Rank entries by score (descending) and attach the prize for each position.
+
+        Ties go to the earlier entry (lower id); entries without a score come last.
+        """
+        sorted_entries = sorted(entries, key=lambda e: (e.total_score is None, -(e.total_score or 0.0), e.id))
+        return [
+            {
+                "entry_id": entry.id,
+                "user_id": entry.user_id,
+                "username": usernames[entry.user_id],
+                "position": position,
+                "score": entry.total_score,
+                "prize": self.prize_for_position(position),
+            }
+            for position, entry in enumerate(sorted_entries, start=1)
+        ]
@@ -18,7 +18,7 @@ class League(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    creator_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     tournament_id = Column(Integer, ForeignKey("tournaments.id"), nullable=False)
     entry_fee = Column(Float, nullable=False)  # Price to join
     invitation_code = Column(String, unique=True, index=True, nullable=False)
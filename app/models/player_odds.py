@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -18,6 +18,7 @@ class PlayerOdds(Base):
     # Ensure a player has only one odds entry per tournament
     __table_args__ = (
         UniqueConstraint('player_id', 'tournament_id', name='_player_tournament_uc'),
+        Index('ix_player_odds_tournament_id_category', 'tournament_id', 'category'),
     )
 
     # Relationships
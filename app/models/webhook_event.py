@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, Index
+from datetime import datetime
+from app.database import Base
+import enum
+
+
+class WebhookEventStatus(str, enum.Enum):
+    PENDING = "pending"  # Waiting for a worker (first attempt or retry)
+    PROCESSING = "processing"  # Claimed by a worker
+    DONE = "done"
+    FAILED = "failed"  # Gave up after the maximum number of attempts
+
+
+class WebhookEvent(Base):
+    """Outbox of verified Stripe webhook events, processed by background workers"""
+    __tablename__ = "webhook_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(String, nullable=False, unique=True, index=True)  # Stripe event id (evt_...), stored once
+    event_type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # Raw JSON body as received
+    status = Column(Enum(WebhookEventStatus), default=WebhookEventStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_at = Column(DateTime)  # When a worker claimed it; stale claims are retried
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime)
+
+    # Workers look for due events by status and retry time
+    __table_args__ = (
+        Index('ix_webhook_events_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from app.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_TIMEOUT_SECONDS
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool with a bounded queue.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without the pickling cost of a process pool. Keeping the work off the
+    event loop and off the shared request threadpool means a login burst only
+    queues behind other logins. When the queue is full, or a hash waits longer
+    than `timeout`, the request fails fast with 503 instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None  # Started on first use, so idle workers cost nothing at boot
+        self._lock = threading.Lock()
+        self._pending = 0  # Queued + running
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._hash_seconds_total = 0.0
+        self._hash_seconds_max = 0.0
+        self._wait_seconds_total = 0.0
+
+    def _run(self, fn, args, submitted_at):
+        started_at = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._wait_seconds_total += started_at - submitted_at
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._hash_seconds_total += elapsed
+                self._hash_seconds_max = max(self._hash_seconds_max, elapsed)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args):
+        """Run `fn(*args)` on the hashing pool, enforcing the queue bound and timeout"""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service is busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+            executor = self._executor
+
+        future = executor.submit(self._run, fn, args, time.perf_counter())
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service timed out, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+    def metrics(self) -> dict:
+        """Snapshot of queue depth and hash latency counters"""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self._pending - self._running,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "hash_seconds_total": round(self._hash_seconds_total, 6),
+                "hash_seconds_max": round(self._hash_seconds_max, 6),
+                "hash_seconds_avg": round(self._hash_seconds_total / self._completed, 6) if self._completed else 0.0,
+                "wait_seconds_total": round(self._wait_seconds_total, 6),
+            }
+
+    def shutdown(self):
+        """Wait for running hashes to finish and release the pool; the next `run` starts a new one"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_queue=PASSWORD_HASH_QUEUE_SIZE,
+    timeout=PASSWORD_HASH_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
+from app.auth import UserPrincipal, get_current_user
+from app.config import BATCH_MAX_CONCURRENCY
+from app.database import get_read_db
+from app.instrumentation import query_budget
+from app.responses import dumps
+from app.schemas import BatchRequest, BatchResponse, BatchSubRequest
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# Connection-level scope keys a sub-request inherits from the batch request
+INHERITED_SCOPE_KEYS = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "state")
+
+# Request headers forwarded to sub-requests. Accept-Encoding is not: sub-responses
+# are embedded in the batch response, which is compressed as a whole.
+FORWARDED_HEADERS = (b"authorization", b"user-agent")
+
+
+def sub_request_scope(scope, sub_request: BatchSubRequest, principal: UserPrincipal, body: bytes) -> dict:
+    """ASGI scope of a sub-request, authenticated as the batch's principal"""
+    path, _, query_string = sub_request.path.partition("?")
+    headers = [(name, value) for name, value in scope["headers"] if name in FORWARDED_HEADERS]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    sub_scope = {key: scope[key] for key in INHERITED_SCOPE_KEYS if key in scope}
+    sub_scope.update(
+        method=sub_request.method,
+        path=path,
+        raw_path=path.encode(),
+        query_string=query_string.encode(),
+        headers=headers,
+        batch_principal=principal,
+    )
+    return sub_scope
+
+
+async def run_sub_request(app, scope: dict, body: bytes) -> Tuple[int, bytes, bytes]:
+    """Serve one sub-request through the application; returns (status, content type, body)"""
+    status_code: Optional[int] = None
+    content_type = b""
+    chunks = []
+    request_sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Nothing more to read: the client "disconnects" once the response is complete
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code, content_type
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        logger.exception(f"Batch sub-request {scope['method']} {scope['path']} failed")
+        if status_code is None or status_code < 500:
+            return 500, b"application/json", dumps({"detail": "Internal Server Error"})
+    finally:
+        finished.set()
+    return status_code, content_type, b"".join(chunks)
+
+
+def encode_sub_response(status_code: int, content_type: bytes, body: bytes) -> bytes:
+    """One element of the `responses` array; JSON bodies are embedded without re-parsing"""
+    if not body:
+        content = b"null"
+    elif content_type.startswith(b"application/json"):
+        content = body
+    else:
+        content = dumps(body.decode("utf-8", errors="replace"))
+    return b'{"status":%d,"body":%s}' % (status_code, content)
+
+
+@router.post("", response_model=BatchResponse)
+@query_budget(1)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Run several API calls in one round trip.
+
+    The caller is authenticated once and every sub-request runs as that user.
+    Sub-requests are applied in order, except that consecutive GETs run
+    concurrently (at most BATCH_MAX_CONCURRENCY at a time, each with its own
+    pooled database session). Each sub-response carries its own status.
+    """
+    # Release the connection used to authenticate (the same session as
+    # get_current_user's) so the batch itself holds none while sub-requests run
+    await db.close()
+
+    app = request.app
+    limit = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+    results: List[bytes] = [b""] * len(batch.requests)
+
+    async def run(index: int):
+        sub_request = batch.requests[index]
+        body = dumps(sub_request.body) if sub_request.body is not None else b""
+        scope = sub_request_scope(request.scope, sub_request, current_user, body)
+        async with limit:
+            results[index] = encode_sub_response(*await run_sub_request(app, scope, body))
+
+    index = 0
+    while index < len(batch.requests):
+        if batch.requests[index].method != "GET":
+            # Writes run alone, after everything before them
+            await run(index)
+            index += 1
+            continue
+        end = index
+        while end < len(batch.requests) and batch.requests[end].method == "GET":
+            end += 1
+        await asyncio.gather(*(run(i) for i in range(index, end)))
+        index = end
+
+    return Response(b'{"responses":[' + b",".join(results) + b"]}", media_type="application/json")
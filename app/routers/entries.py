@@ -1,33 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from typing import List
-from app.database import get_db
-from app.models import Entry, User
+from app.database import get_db, get_read_db
+from app.fieldsets import FieldSet, field_selector, load_columns, sparse_content
+from app.instrumentation import query_budget
+from app.responses import FastJSONResponse, rows_response, schema_columns
+from app.models import Entry
 from app.models.entry import PaymentStatus
 from app.schemas import EntryResponse, EntryUpdate
-from app.auth import get_current_user
+from app.services.leaderboard_service import invalidate_leaderboard
+from app.services.payment_events import set_amount_paid
+from app.auth import UserPrincipal, get_current_user
 
 router = APIRouter(prefix="/entries", tags=["entries"])
 
 
 @router.get("/my-entries", response_model=List[EntryResponse])
-def get_my_entries(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@query_budget(2)
+async def get_my_entries(
+    fields: FieldSet = Depends(field_selector(EntryResponse)),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all entries for the current user"""
-    entries = db.query(Entry).filter(Entry.user_id == current_user.id).all()
-    return entries
+    result = await db.execute(
+        select(*schema_columns(EntryResponse, Entry, fields)).where(Entry.user_id == current_user.id)
+    )
+    return rows_response(result.all())
 
 
 @router.get("/{entry_id}", response_model=EntryResponse)
-def get_entry(
+@query_budget(2)
+async def get_entry(
     entry_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: FieldSet = Depends(field_selector(EntryResponse)),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific entry by ID"""
-    entry = db.query(Entry).filter(Entry.id == entry_id).first()
+    query = select(Entry).where(Entry.id == entry_id)
+    if fields is not None:
+        # user_id is needed for the access check
+        query = query.options(load_only(*load_columns(Entry, fields), Entry.user_id))
+    result = await db.execute(query)
+    entry = result.scalars().first()
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,18 +59,21 @@ def get_entry(
             detail="You don't have access to this entry"
         )
 
+    if fields is not None:
+        return FastJSONResponse(sparse_content(entry, EntryResponse, fields))
     return entry
 
 
 @router.patch("/{entry_id}", response_model=EntryResponse)
-def update_entry(
+async def update_entry(
     entry_id: int,
     entry_update: EntryUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an entry (mainly for payment status)"""
-    entry = db.query(Entry).filter(Entry.id == entry_id).first()
+    result = await db.execute(select(Entry).where(Entry.id == entry_id))
+    entry = result.scalars().first()
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,24 +89,33 @@ def update_entry(
 
     # Update fields
     if entry_update.payment_status is not None:
+        refunding = (
+            entry_update.payment_status == PaymentStatus.REFUNDED
+            and entry.payment_status != PaymentStatus.REFUNDED
+        )
         entry.payment_status = entry_update.payment_status
+        if refunding:
+            # A refunded entry's payment leaves the prize pool
+            await set_amount_paid(db, entry, 0.0)
     if entry_update.total_score is not None:
         entry.total_score = entry_update.total_score
+        invalidate_leaderboard(db, entry.league_id)
 
-    db.commit()
-    db.refresh(entry)
+    await db.commit()
+    await db.refresh(entry)
 
     return entry
 
 
 @router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_entry(
+async def delete_entry(
     entry_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an entry (leave league)"""
-    entry = db.query(Entry).filter(Entry.id == entry_id).first()
+    result = await db.execute(select(Entry).where(Entry.id == entry_id))
+    entry = result.scalars().first()
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,13 +129,14 @@ def delete_entry(
             detail="You don't have access to this entry"
         )
 
-    # Check if payment was already made
-    if entry.payment_status == PaymentStatus.PAID:
+    # Check if payment was already made (and not refunded out of the prize pool)
+    if entry.payment_status == PaymentStatus.PAID or entry.amount_paid:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot leave league after payment has been made"
         )
 
-    db.delete(entry)
-    db.commit()
+    await db.delete(entry)
+    invalidate_leaderboard(db, entry.league_id)
+    await db.commit()
     return None
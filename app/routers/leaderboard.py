@@ -1,18 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Leaderboard, League, Entry, User
-from app.schemas import LeaderboardResponse, LeaderboardDetailed, RankingEntry
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db
+from app.fieldsets import FieldSet, field_selector, sparse_content, wants
+from app.instrumentation import query_budget
+from app.compression import CompressedPayload
+from app.responses import FastJSONResponse, dumps
+from app.models import Leaderboard, League
+from app.models.tournament import TournamentStatus
+from app.schemas import LeaderboardResponse, LeaderboardDetailed
 from app.mock_data import get_mock_tournament
+from app.services.leaderboard_service import (
+    cache_completed_leaderboard,
+    completed_leaderboards,
+    get_league_entries_with_usernames,
+    invalidate_leaderboard,
+    leaderboard_detailed_content,
+    leaderboard_generation,
+    recompute_prize_pool,
+)
 
 router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
 
 
 @router.get("/{league_id}", response_model=LeaderboardDetailed)
-def get_leaderboard(league_id: int, db: Session = Depends(get_db)):
+@query_budget(3)
+async def get_leaderboard(
+    league_id: int,
+    request: Request,
+    fields: FieldSet = Depends(field_selector(LeaderboardDetailed)),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get leaderboard for a specific league"""
+    # Only full leaderboards of completed tournaments are cached
+    cached = completed_leaderboards.get(league_id) if fields is None else None
+    if cached is not None:
+        return cached.response(request.headers.get("accept-encoding"))
+    generation = leaderboard_generation(league_id)
+
     # Get league
-    league = db.query(League).filter(League.id == league_id).first()
+    result = await db.execute(select(League).where(League.id == league_id))
+    league = result.scalars().first()
     if not league:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -20,80 +48,53 @@ def get_leaderboard(league_id: int, db: Session = Depends(get_db)):
         )
 
     # Get leaderboard
-    leaderboard = db.query(Leaderboard).filter(Leaderboard.league_id == league_id).first()
+    result = await db.execute(select(Leaderboard).where(Leaderboard.league_id == league_id))
+    leaderboard = result.scalars().first()
     if not leaderboard:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Leaderboard not found"
         )
 
-    # Get all entries for this league
-    entries = db.query(Entry).filter(Entry.league_id == league_id).all()
-
-    # Calculate prizes based on actual amounts received
-    leaderboard.calculate_prizes(entries)
-
-    # Sort entries by score (descending)
-    sorted_entries = sorted(entries, key=lambda e: e.total_score, reverse=True)
-
-    # Build rankings
-    rankings = []
-    for position, entry in enumerate(sorted_entries, start=1):
-        user = db.query(User).filter(User.id == entry.user_id).first()
-
-        # Determine prize
-        prize = 0.0
-        if position == 1:
-            prize = leaderboard.first_place_prize
-        elif position == 2:
-            prize = leaderboard.second_place_prize
-        elif position == 3:
-            prize = leaderboard.third_place_prize
-
-        rankings.append(RankingEntry(
-            entry_id=entry.id,
-            user_id=user.id,
-            username=user.username,
-            position=position,
-            score=entry.total_score,
-            prize=prize
-        ))
-
-    # Update leaderboard rankings
-    leaderboard.rankings = [
-        {
-            "entry_id": r.entry_id,
-            "user_id": r.user_id,
-            "username": r.username,
-            "position": r.position,
-            "score": r.score,
-            "prize": r.prize
-        }
-        for r in rankings
-    ]
-    db.commit()
+    # Get all entries for this league, unless rankings were left out
+    if wants(fields, "rankings"):
+        entries, usernames = await get_league_entries_with_usernames(db, league_id, ranking_only=True)
+    else:
+        entries, usernames = [], {}
 
     # Get tournament info
     tournament = get_mock_tournament(league.tournament_id)
 
-    return LeaderboardDetailed(
-        league_id=league.id,
-        league_name=league.name,
-        tournament_name=tournament["name"] if tournament else "Unknown",
-        prize_pool=leaderboard.prize_pool,
-        first_place_prize=leaderboard.first_place_prize,
-        second_place_prize=leaderboard.second_place_prize,
-        third_place_prize=leaderboard.third_place_prize,
-        rankings=rankings,
-        last_updated=leaderboard.last_updated
+    # Rankings are computed for display; refresh persists them. The content is
+    # built from database values, so it is encoded without response-model validation.
+    content = leaderboard_detailed_content(
+        league,
+        leaderboard,
+        entries,
+        usernames,
+        tournament["name"] if tournament else "Unknown",
     )
+    if fields is not None:
+        return FastJSONResponse(sparse_content(content, LeaderboardDetailed, fields))
+    if tournament and tournament["status"] == TournamentStatus.COMPLETED:
+        # Final standings: encode and compress once for every later request
+        payload = CompressedPayload(dumps(content))
+        cache_completed_leaderboard(league_id, generation, payload)
+        return payload.response(request.headers.get("accept-encoding"))
+    return FastJSONResponse(content)
 
 
 @router.post("/{league_id}/refresh", response_model=LeaderboardResponse)
-def refresh_leaderboard(league_id: int, db: Session = Depends(get_db)):
-    """Refresh/recalculate leaderboard for a league"""
+@query_budget(6)
+async def refresh_leaderboard(league_id: int, db: AsyncSession = Depends(get_db)):
+    """Refresh/recalculate leaderboard for a league.
+
+    Prize pools are running totals kept by payment processing; refresh also
+    recomputes them from amount_paid, repairing any drift.
+    """
     # Get league
-    league = db.query(League).filter(League.id == league_id).first()
+    result = await db.execute(select(League).where(League.id == league_id))
+    league = result.scalars().first()
     if not league:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -101,46 +102,23 @@ def refresh_leaderboard(league_id: int, db: Session = Depends(get_db)):
         )
 
     # Get leaderboard
-    leaderboard = db.query(Leaderboard).filter(Leaderboard.league_id == league_id).first()
+    result = await db.execute(select(Leaderboard).where(Leaderboard.league_id == league_id))
+    leaderboard = result.scalars().first()
     if not leaderboard:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Leaderboard not found"
         )
 
-    # Get all entries
-    entries = db.query(Entry).filter(Entry.league_id == league_id).all()
+    await recompute_prize_pool(db, league_id)
 
-    # Recalculate prizes based on actual amounts received
-    leaderboard.calculate_prizes(entries)
-
-    # Sort entries by score
-    sorted_entries = sorted(entries, key=lambda e: e.total_score, reverse=True)
+    # Get all entries
+    entries, usernames = await get_league_entries_with_usernames(db, league_id, ranking_only=True)
 
     # Update rankings
-    rankings = []
-    for position, entry in enumerate(sorted_entries, start=1):
-        user = db.query(User).filter(User.id == entry.user_id).first()
-
-        prize = 0.0
-        if position == 1:
-            prize = leaderboard.first_place_prize
-        elif position == 2:
-            prize = leaderboard.second_place_prize
-        elif position == 3:
-            prize = leaderboard.third_place_prize
-
-        rankings.append({
-            "entry_id": entry.id,
-            "user_id": user.id,
-            "username": user.username,
-            "position": position,
-            "score": entry.total_score,
-            "prize": prize
-        })
-
-    leaderboard.rankings = rankings
-    db.commit()
-    db.refresh(leaderboard)
+    leaderboard.rankings = leaderboard.build_rankings(entries, usernames)
+    invalidate_leaderboard(db, league_id)
+    await db.commit()
+    await db.refresh(leaderboard)
 
     return leaderboard
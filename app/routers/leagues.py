@@ -1,24 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.models import League, User, Entry, Leaderboard
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+import hashlib
+from app.database import get_db, get_read_db
+from app.fieldsets import FieldSet, field_selector
+from app.instrumentation import query_budget
+from app.responses import rows_response, schema_columns
+from app.models import League, Entry, Leaderboard, Team, TeamPick
 from app.models.entry import PaymentStatus
-from app.schemas import LeagueCreate, LeagueResponse, LeagueJoin, EntryResponse, LeagueCreateResponse, LeagueJoinResponse
-from app.auth import get_current_user
+from app.schemas import (
+    LeagueCreate,
+    LeagueResponse,
+    LeagueJoin,
+    EntryResponse,
+    LeagueCreateResponse,
+    LeagueJoinResponse,
+    LeagueDashboard,
+    TeamResponse,
+    TournamentResponse,
+)
+from app.auth import UserPrincipal, get_current_user
+from app.catalog import catalog
 from app.mock_data import get_mock_tournament
-from app.services.stripe_service import create_checkout_session
+from app.services.leaderboard_service import get_league_entries_with_usernames, build_leaderboard_detailed
+from app.services.stripe_service import StripeUnavailable, stripe_gateway
 
 router = APIRouter(prefix="/leagues", tags=["leagues"])
 
+# Order of the per-section versions inside a dashboard version token
+DASHBOARD_SECTIONS = ("league", "entries", "leaderboard", "team", "tournament")
+
+
+def _section_version(*parts) -> str:
+    """Short fingerprint of the values a dashboard section depends on"""
+    return hashlib.blake2s(repr(parts).encode(), digest_size=4).hexdigest()
+
+
+async def create_entry_checkout(db: AsyncSession, entry_id: int, league: League):
+    """Create the Checkout Session paying an entry's fee and remember its id on the entry"""
+    try:
+        checkout_session = await stripe_gateway.create_checkout_session(
+            entry_id=entry_id,
+            entry_fee=league.entry_fee,
+            league_name=league.name,
+            league_id=league.id,
+        )
+    except StripeUnavailable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payment provider unavailable, please try again shortly"
+        )
+    await db.execute(
+        update(Entry).where(Entry.id == entry_id).values(stripe_checkout_session_id=checkout_session["id"])
+    )
+    await db.commit()
+    return checkout_session
+
 
 @router.post("", response_model=LeagueCreateResponse, status_code=status.HTTP_201_CREATED)
-def create_league(
+async def create_league(
     league: LeagueCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db)
 ):
     """Create a new league"""
+    # The read session only authenticated the caller (get_current_user shares it)
+    await read_db.close()
+
     # Verify tournament exists (mock data)
     tournament = get_mock_tournament(league.tournament_id)
     if not tournament:
@@ -29,7 +80,7 @@ def create_league(
 
     # Generate unique invitation code
     invitation_code = League.generate_invitation_code()
-    while db.query(League).filter(League.invitation_code == invitation_code).first():
+    while await db.scalar(select(League.id).where(League.invitation_code == invitation_code)):
         invitation_code = League.generate_invitation_code()
 
     # Create league
@@ -42,8 +93,8 @@ def create_league(
         invitation_code=invitation_code
     )
     db.add(db_league)
-    db.commit()
-    db.refresh(db_league)
+    await db.commit()
+    await db.refresh(db_league)
 
     # Create entry for the league creator with PENDING payment
     creator_entry = Entry(
@@ -56,36 +107,37 @@ def create_league(
     # Create leaderboard for the league
     leaderboard = Leaderboard(league_id=db_league.id)
     db.add(leaderboard)
-    db.commit()
-    db.refresh(creator_entry)
-
-    # Create Stripe Checkout Session
-    checkout_url = create_checkout_session(
-        entry_id=creator_entry.id,
-        entry_fee=db_league.entry_fee,
-        league_name=db_league.name,
-        league_id=db_league.id,
-    )
+    await db.commit()
+    await db.refresh(creator_entry)
+
+    # Release the connection while Stripe creates the Checkout Session
+    await db.close()
+    checkout_session = await create_entry_checkout(db, creator_entry.id, db_league)
 
     return LeagueCreateResponse(
         league=LeagueResponse.model_validate(db_league),
-        checkout_url=checkout_url,
+        checkout_url=checkout_session["url"],
     )
 
 
 @router.get("", response_model=List[LeagueResponse])
-def get_user_leagues(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@query_budget(3)
+async def get_user_leagues(
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all leagues created by or joined by the current user"""
     # Leagues created by user
-    created_leagues = db.query(League).filter(League.creator_id == current_user.id).all()
+    result = await db.execute(select(League).where(League.creator_id == current_user.id))
+    created_leagues = result.scalars().all()
 
     # Leagues joined by user
-    entries = db.query(Entry).filter(Entry.user_id == current_user.id).all()
-    joined_league_ids = [entry.league_id for entry in entries]
-    joined_leagues = db.query(League).filter(League.id.in_(joined_league_ids)).all() if joined_league_ids else []
+    result = await db.execute(select(Entry.league_id).where(Entry.user_id == current_user.id))
+    joined_league_ids = result.scalars().all()
+    joined_leagues = []
+    if joined_league_ids:
+        result = await db.execute(select(League).where(League.id.in_(joined_league_ids)))
+        joined_leagues = result.scalars().all()
 
     # Combine and remove duplicates
     all_leagues = {league.id: league for league in created_leagues + joined_leagues}
@@ -93,9 +145,11 @@ def get_user_leagues(
 
 
 @router.get("/{league_id}", response_model=LeagueResponse)
-def get_league(league_id: int, db: Session = Depends(get_db)):
+@query_budget(1)
+async def get_league(league_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific league by ID"""
-    league = db.query(League).filter(League.id == league_id).first()
+    result = await db.execute(select(League).where(League.id == league_id))
+    league = result.scalars().first()
     if not league:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -105,14 +159,19 @@ def get_league(league_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/join", response_model=LeagueJoinResponse, status_code=status.HTTP_201_CREATED)
-def join_league(
+async def join_league(
     join_data: LeagueJoin,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db)
 ):
     """Join a league using invitation code"""
+    # The read session only authenticated the caller (get_current_user shares it)
+    await read_db.close()
+
     # Find league by invitation code
-    league = db.query(League).filter(League.invitation_code == join_data.invitation_code).first()
+    result = await db.execute(select(League).where(League.invitation_code == join_data.invitation_code))
+    league = result.scalars().first()
     if not league:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -127,10 +186,11 @@ def join_league(
         )
 
     # Check if user already joined
-    existing_entry = db.query(Entry).filter(
+    result = await db.execute(select(Entry).where(
         Entry.user_id == current_user.id,
         Entry.league_id == league.id
-    ).first()
+    ))
+    existing_entry = result.scalars().first()
     if existing_entry:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -138,7 +198,7 @@ def join_league(
         )
 
     # Check max participants
-    current_entries = db.query(Entry).filter(Entry.league_id == league.id).count()
+    current_entries = await db.scalar(select(func.count(Entry.id)).where(Entry.league_id == league.id))
     if current_entries >= league.max_participants:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -152,45 +212,143 @@ def join_league(
         payment_status=PaymentStatus.PENDING
     )
     db.add(entry)
-    db.commit()
-    db.refresh(entry)
+    await db.commit()
+    await db.refresh(entry)
 
-    # Create Stripe Checkout Session
-    checkout_url = create_checkout_session(
-        entry_id=entry.id,
-        entry_fee=league.entry_fee,
-        league_name=league.name,
-        league_id=league.id,
-    )
+    # Release the connection while Stripe creates the Checkout Session
+    await db.close()
+    checkout_session = await create_entry_checkout(db, entry.id, league)
 
     return LeagueJoinResponse(
         entry=EntryResponse.model_validate(entry),
-        checkout_url=checkout_url,
+        checkout_url=checkout_session["url"],
     )
 
 
 @router.get("/{league_id}/entries", response_model=List[EntryResponse])
-def get_league_entries(league_id: int, db: Session = Depends(get_db)):
+@query_budget(2)
+async def get_league_entries(
+    league_id: int,
+    fields: FieldSet = Depends(field_selector(EntryResponse)),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all entries for a specific league"""
-    league = db.query(League).filter(League.id == league_id).first()
+    result = await db.execute(select(League).where(League.id == league_id))
+    league = result.scalars().first()
     if not league:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="League not found"
         )
 
-    entries = db.query(Entry).filter(Entry.league_id == league_id).all()
-    return entries
+    result = await db.execute(
+        select(*schema_columns(EntryResponse, Entry, fields)).where(Entry.league_id == league_id)
+    )
+    return rows_response(result.all())
+
+
+@router.get("/{league_id}/dashboard", response_model=LeagueDashboard)
+@query_budget(7)
+async def get_league_dashboard(
+    league_id: int,
+    since: Optional[str] = Query(None, description="Version token from a previous dashboard response"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get league, entries, leaderboard, the user's team and the tournament in one call.
+
+    Cheap fingerprints are read first; only sections whose fingerprint differs
+    from the client's `since` token are loaded and serialized.
+    """
+    # League and leaderboard in one query
+    result = await db.execute(
+        select(League, Leaderboard)
+        .outerjoin(Leaderboard, Leaderboard.league_id == League.id)
+        .where(League.id == league_id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="League not found"
+        )
+    league, leaderboard = row
+
+    # Fingerprints for entries and the current user's team
+    result = await db.execute(
+        select(func.count(Entry.id), func.max(Entry.updated_at))
+        .where(Entry.league_id == league_id)
+    )
+    entry_count, entries_updated = result.one()
+    result = await db.execute(
+        select(Team.id, Team.updated_at, func.max(TeamPick.id))
+        .join(Entry, Entry.id == Team.entry_id)
+        .outerjoin(TeamPick, TeamPick.team_id == Team.id)
+        .where(Entry.league_id == league_id, Entry.user_id == current_user.id)
+        .group_by(Team.id, Team.updated_at)
+    )
+    team_row = result.first()
+
+    tournament = catalog.get_tournament(league.tournament_id)
+    versions = {
+        "league": _section_version(league.id, league.updated_at),
+        "entries": _section_version(entry_count, entries_updated),
+        "leaderboard": _section_version(
+            entry_count, entries_updated, leaderboard.last_updated if leaderboard else None
+        ),
+        "team": _section_version(tuple(team_row) if team_row else None),
+        "tournament": _section_version(league.tournament_id, catalog.version),
+    }
+    previous = dict(zip(DASHBOARD_SECTIONS, since.split("."))) if since else {}
+    stale = {section for section in DASHBOARD_SECTIONS if previous.get(section) != versions[section]}
+
+    dashboard = LeagueDashboard(
+        version=".".join(versions[section] for section in DASHBOARD_SECTIONS),
+        unchanged=[section for section in DASHBOARD_SECTIONS if section not in stale],
+    )
+
+    if "league" in stale:
+        dashboard.league = LeagueResponse.model_validate(league)
+
+    if "tournament" in stale and tournament:
+        dashboard.tournament = TournamentResponse.model_validate(tournament)
+
+    if stale & {"entries", "leaderboard"}:
+        entries, usernames = await get_league_entries_with_usernames(db, league_id)
+
+        if "entries" in stale:
+            dashboard.entries = [EntryResponse.model_validate(entry) for entry in entries]
+
+        if "leaderboard" in stale and leaderboard:
+            dashboard.leaderboard = build_leaderboard_detailed(
+                league,
+                leaderboard,
+                entries,
+                usernames,
+                tournament["name"] if tournament else "Unknown",
+            )
+
+    if "team" in stale and team_row:
+        result = await db.execute(
+            select(Team)
+            .options(selectinload(Team.picks))
+            .where(Team.id == team_row[0])
+        )
+        team = result.scalars().first()
+        dashboard.team = TeamResponse.model_validate(team)
+
+    return dashboard
 
 
 @router.delete("/{league_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_league(
+async def delete_league(
     league_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a league (only creator can delete)"""
-    league = db.query(League).filter(League.id == league_id).first()
+    result = await db.execute(select(League).where(League.id == league_id))
+    league = result.scalars().first()
     if not league:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -204,6 +362,6 @@ def delete_league(
             detail="Only the league creator can delete it"
         )
 
-    db.delete(league)
-    db.commit()
+    await db.delete(league)
+    await db.commit()
     return None
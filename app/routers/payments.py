@@ -1,62 +1,58 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
-from sqlalchemy.orm import Session
-import stripe
+from sqlalchemy.exc import IntegrityError
 import logging
-from app.config import STRIPE_SECRET_KEY, STRIPE_WEBHOOK_SECRET
-from app.database import get_db
-from app.models import Entry
-from app.models.entry import PaymentStatus
+from app.cache import TTLCache
+from app.config import WEBHOOK_SEEN_CACHE_SIZE, WEBHOOK_SEEN_CACHE_TTL_SECONDS
+from app.database import get_session_factory
+from app.models import WebhookEvent
+from app.services.stripe_service import construct_event, get_stripe
+from app.services.webhook_processor import webhook_processor
 
-stripe.api_key = STRIPE_SECRET_KEY
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
+# Event ids this process has already stored. The unique index on
+# webhook_events.event_id catches duplicates that miss this cache.
+seen_webhook_events = TTLCache(
+    maxsize=WEBHOOK_SEEN_CACHE_SIZE, ttl=WEBHOOK_SEEN_CACHE_TTL_SECONDS, name="webhook_event"
+)
+
 
 @router.post("/webhook")
-async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
-    """Handle Stripe webhook events."""
+async def stripe_webhook(request: Request, session_factory=Depends(get_session_factory)):
+    """Verify a Stripe webhook event and queue it for background processing.
+
+    The event is stored in the outbox and acknowledged right away; workers
+    apply it (and make any Stripe API calls) outside of the request.
+    Redeliveries of a stored event are acknowledged without storing it again,
+    and without a database connection when this process has seen them.
+    """
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
 
     try:
-        event = stripe.Webhook.construct_event(
-            payload, sig_header, STRIPE_WEBHOOK_SECRET
-        )
+        event = construct_event(payload, sig_header)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid payload")
-    except stripe.error.SignatureVerificationError:
+    except get_stripe().error.SignatureVerificationError:
         raise HTTPException(status_code=400, detail="Invalid signature")
 
-    event_type = event["type"]
-
-    if event_type == "checkout.session.completed":
-        session = event["data"]["object"]
-        entry_id = session.get("metadata", {}).get("entry_id")
-
-        if entry_id:
-            entry = db.query(Entry).filter(Entry.id == int(entry_id)).first()
-            if entry:
-                entry.payment_status = PaymentStatus.PAID
-                db.commit()
-                logger.info(f"Entry {entry_id}: payment_status set to PAID")
-
-    elif event_type == "charge.updated":
-        # balance_transaction is available at this point
-        charge = event["data"]["object"]
-        payment_intent_id = charge.get("payment_intent")
-
-        if payment_intent_id and charge.get("balance_transaction"):
-            # Find the entry via the checkout session metadata
-            sessions = stripe.checkout.Session.list(payment_intent=payment_intent_id, limit=1)
-            if sessions.data:
-                entry_id = sessions.data[0].metadata.get("entry_id")
-                if entry_id:
-                    entry = db.query(Entry).filter(Entry.id == int(entry_id)).first()
-                    if entry:
-                        bt = stripe.BalanceTransaction.retrieve(charge["balance_transaction"])
-                        entry.amount_paid = bt.net / 100
-                        db.commit()
-                        logger.info(f"Entry {entry_id}: amount_paid set to {entry.amount_paid}")
+    if seen_webhook_events.get(event["id"]):
+        return {"status": "duplicate"}
+
+    async with session_factory() as db:
+        db.add(WebhookEvent(event_id=event["id"], event_type=event["type"], payload=payload.decode()))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Stored earlier, by another process or before this one started
+            await db.rollback()
+            seen_webhook_events.set(event["id"], True)
+            return {"status": "duplicate"}
+
+    seen_webhook_events.set(event["id"], True)
+    webhook_processor.notify()
+    logger.info(f"Webhook event {event['id']} ({event['type']}) queued")
 
     return {"status": "ok"}
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, Request, status, Query
 from typing import List, Optional
+from app.cache import TTLCache
+from app.compression import CompressedPayload
+from app.config import ODDS_CACHE_TTL_SECONDS
+from app.responses import dumps
 from app.schemas import PlayerResponse, PlayerWithOdds
 from app.mock_data import (
     get_mock_players,
@@ -10,15 +14,18 @@ from app.mock_data import (
 
 router = APIRouter(prefix="/players", tags=["players"])
 
+# Precompressed odds boards by (tournament_id, category)
+odds_payloads = TTLCache(maxsize=1000, ttl=ODDS_CACHE_TTL_SECONDS, name="odds_payload")
+
 
 @router.get("")
-def get_players():
+async def get_players():
     """Get all players (mock data)"""
     return get_mock_players()
 
 
 @router.get("/{player_id}")
-def get_player_by_id(player_id: int):
+async def get_player_by_id(player_id: int):
     """Get a specific player by ID (mock data)"""
     player = get_mock_player(player_id)
     if not player:
@@ -30,11 +37,16 @@ def get_player_by_id(player_id: int):
 
 
 @router.get("/odds/{tournament_id}", response_model=List[PlayerWithOdds])
-def get_players_with_odds(
+async def get_players_with_odds(
     tournament_id: int,
+    request: Request,
     category: Optional[int] = Query(None, ge=1, le=5, description="Filter by category (1-5)")
 ):
     """Get players with their odds for a specific tournament (mock data)"""
+    payload = odds_payloads.get((tournament_id, category))
+    if payload is not None:
+        return payload.response(request.headers.get("accept-encoding"))
+
     # Get player odds for tournament
     if category:
         odds_list = get_mock_player_odds_by_category(tournament_id, category)
@@ -61,4 +73,8 @@ def get_players_with_odds(
                 "world_ranking": player["world_ranking"]
             })
 
-    return players_with_odds
+    # Built from trusted mock data, so skip response-model validation; encoded
+    # and compressed once, then served from the cache
+    payload = CompressedPayload(dumps(players_with_odds))
+    odds_payloads.set((tournament_id, category), payload)
+    return payload.response(request.headers.get("accept-encoding"))
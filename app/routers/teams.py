@@ -1,23 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Team, TeamPick, Entry, User, League
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+from app.database import get_db, get_read_db
+from app.fieldsets import FieldSet, field_selector, load_columns, sparse_content, wants
+from app.instrumentation import query_budget
+from app.responses import FastJSONResponse
+from app.models import Team, TeamPick, Entry, League
 from app.schemas import TeamCreate, TeamResponse, TeamUpdate
-from app.auth import get_current_user
+from app.auth import UserPrincipal, get_current_user
 from app.mock_data import get_mock_player
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
 
+def _team_load_options(fields: FieldSet):
+    """Loader options fetching only the requested team columns, and picks only when requested"""
+    if fields is None:
+        return [selectinload(Team.picks)]
+    options = [load_only(*load_columns(Team, fields), Team.id)]
+    if wants(fields, "picks"):
+        picks = selectinload(Team.picks)
+        if fields["picks"] is not None:
+            picks = picks.load_only(*load_columns(TeamPick, fields["picks"]), TeamPick.team_id)
+        options.append(picks)
+    return options
+
+
+def _team_response(team: Team, fields: FieldSet):
+    """The team itself (validated by the response model), or only its requested fields"""
+    if fields is None:
+        return team
+    return FastJSONResponse(sparse_content(team, TeamResponse, fields))
+
+
 @router.post("", response_model=TeamResponse, status_code=status.HTTP_201_CREATED)
-def create_team(
+async def create_team(
     team_data: TeamCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a team with 5 players for an entry"""
     # Verify entry exists and belongs to current user
-    entry = db.query(Entry).filter(Entry.id == team_data.entry_id).first()
+    result = await db.execute(select(Entry).where(Entry.id == team_data.entry_id))
+    entry = result.scalars().first()
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -31,7 +57,7 @@ def create_team(
         )
 
     # Check if team already exists for this entry
-    existing_team = db.query(Team).filter(Team.entry_id == team_data.entry_id).first()
+    existing_team = await db.scalar(select(Team.id).where(Team.entry_id == team_data.entry_id))
     if existing_team:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -39,7 +65,8 @@ def create_team(
         )
 
     # Verify league is still open
-    league = db.query(League).filter(League.id == entry.league_id).first()
+    result = await db.execute(select(League).where(League.id == entry.league_id))
+    league = result.scalars().first()
     if league.status != "open":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -58,7 +85,7 @@ def create_team(
     # Create team
     team = Team(entry_id=team_data.entry_id)
     db.add(team)
-    db.flush()  # Get team.id without committing
+    await db.flush()  # Get team.id without committing
 
     # Create team picks
     for pick in team_data.picks:
@@ -70,25 +97,27 @@ def create_team(
         db.add(team_pick)
 
     # Calculate validity
-    db.flush()
-    db.refresh(team)
+    await db.flush()
+    await db.refresh(team, ["picks"])
     team.calculate_validity()
 
-    db.commit()
-    db.refresh(team)
+    await db.commit()
 
     return team
 
 
 @router.get("/entry/{entry_id}", response_model=TeamResponse)
-def get_team_by_entry(
+@query_budget(4)
+async def get_team_by_entry(
     entry_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: FieldSet = Depends(field_selector(TeamResponse)),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get team for a specific entry"""
     # Verify entry exists
-    entry = db.query(Entry).filter(Entry.id == entry_id).first()
+    result = await db.execute(select(Entry).where(Entry.id == entry_id))
+    entry = result.scalars().first()
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -96,38 +125,48 @@ def get_team_by_entry(
         )
 
     # Get team
-    team = db.query(Team).filter(Team.entry_id == entry_id).first()
+    result = await db.execute(
+        select(Team).options(*_team_load_options(fields)).where(Team.entry_id == entry_id)
+    )
+    team = result.scalars().first()
     if not team:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Team not found for this entry"
         )
 
-    return team
+    return _team_response(team, fields)
 
 
 @router.get("/{team_id}", response_model=TeamResponse)
-def get_team(team_id: int, db: Session = Depends(get_db)):
+@query_budget(2)
+async def get_team(
+    team_id: int,
+    fields: FieldSet = Depends(field_selector(TeamResponse)),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get a specific team by ID"""
-    team = db.query(Team).filter(Team.id == team_id).first()
+    result = await db.execute(select(Team).options(*_team_load_options(fields)).where(Team.id == team_id))
+    team = result.scalars().first()
     if not team:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Team not found"
         )
-    return team
+    return _team_response(team, fields)
 
 
 @router.put("/{team_id}", response_model=TeamResponse)
-def update_team(
+async def update_team(
     team_id: int,
     team_update: TeamUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a team (replace all picks)"""
     # Get team
-    team = db.query(Team).filter(Team.id == team_id).first()
+    result = await db.execute(select(Team).options(selectinload(Team.picks)).where(Team.id == team_id))
+    team = result.scalars().first()
     if not team:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -135,7 +174,8 @@ def update_team(
         )
 
     # Verify ownership
-    entry = db.query(Entry).filter(Entry.id == team.entry_id).first()
+    result = await db.execute(select(Entry).where(Entry.id == team.entry_id))
+    entry = result.scalars().first()
     if entry.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -143,7 +183,8 @@ def update_team(
         )
 
     # Verify league is still open
-    league = db.query(League).filter(League.id == entry.league_id).first()
+    result = await db.execute(select(League).where(League.id == entry.league_id))
+    league = result.scalars().first()
     if league.status != "open":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -161,7 +202,7 @@ def update_team(
                 )
 
         # Delete old picks
-        db.query(TeamPick).filter(TeamPick.team_id == team_id).delete()
+        await db.execute(delete(TeamPick).where(TeamPick.team_id == team_id))
 
         # Create new picks
         for pick in team_update.picks:
@@ -173,24 +214,24 @@ def update_team(
             db.add(team_pick)
 
         # Recalculate validity
-        db.flush()
-        db.refresh(team)
+        await db.flush()
+        await db.refresh(team, ["picks"])
         team.calculate_validity()
 
-    db.commit()
-    db.refresh(team)
+    await db.commit()
 
     return team
 
 
 @router.delete("/{team_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_team(
+async def delete_team(
     team_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a team"""
-    team = db.query(Team).filter(Team.id == team_id).first()
+    result = await db.execute(select(Team).options(selectinload(Team.picks)).where(Team.id == team_id))
+    team = result.scalars().first()
     if not team:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -198,7 +239,8 @@ def delete_team(
         )
 
     # Verify ownership
-    entry = db.query(Entry).filter(Entry.id == team.entry_id).first()
+    result = await db.execute(select(Entry).where(Entry.id == team.entry_id))
+    entry = result.scalars().first()
     if entry.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -206,13 +248,14 @@ def delete_team(
         )
 
     # Verify league is still open
-    league = db.query(League).filter(League.id == entry.league_id).first()
+    result = await db.execute(select(League).where(League.id == entry.league_id))
+    league = result.scalars().first()
     if league.status != "open":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete team, league is no longer open"
         )
 
-    db.delete(team)
-    db.commit()
+    await db.delete(team)
+    await db.commit()
     return None
@@ -6,6 +6,9 @@ from app.schemas.league import LeagueCreate, LeagueUpdate, LeagueResponse, Leagu
 from app.schemas.entry import EntryCreate, EntryUpdate, EntryResponse
 from app.schemas.team import TeamCreate, TeamUpdate, TeamResponse, TeamPickResponse
 from app.schemas.leaderboard import LeaderboardResponse, LeaderboardDetailed, RankingEntry
+from app.schemas.dashboard import LeagueDashboard
+from app.schemas.home import HomeEntry, UserHome
+from app.schemas.batch import BatchRequest, BatchSubRequest, BatchResponse, BatchSubResponse
 
 __all__ = [
     # User
@@ -46,4 +49,14 @@ __all__ = [
     "LeaderboardResponse",
     "LeaderboardDetailed",
     "RankingEntry",
+    # Dashboard
+    "LeagueDashboard",
+    # Home
+    "HomeEntry",
+    "UserHome",
+    # Batch
+    "BatchRequest",
+    "BatchSubRequest",
+    "BatchResponse",
+    "BatchSubResponse",
 ]
\ No newline at end of file
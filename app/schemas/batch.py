@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, List, Literal, Optional
+from app.config import BATCH_MAX_REQUESTS
+
+
+class BatchSubRequest(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str = Field(..., description="API path with an optional query string, e.g. /api/entries/my-entries?fields=id")
+    body: Optional[Any] = None
+
+    @field_validator('path')
+    @classmethod
+    def validate_path(cls, v):
+        if not v.startswith('/api/'):
+            raise ValueError('Sub-request paths must start with /api/')
+        if v.split('?')[0].rstrip('/') == '/api/batch':
+            raise ValueError('Batches cannot be nested')
+        return v
+
+
+class BatchRequest(BaseModel):
+    """Sub-requests run in order; consecutive GETs run concurrently"""
+    requests: List[BatchSubRequest] = Field(..., min_length=1, max_length=BATCH_MAX_REQUESTS)
+
+
+class BatchSubResponse(BaseModel):
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Sub-responses in the order of the sub-requests"""
+    responses: List[BatchSubResponse]
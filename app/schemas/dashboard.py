@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from app.schemas.league import LeagueResponse
+from app.schemas.entry import EntryResponse
+from app.schemas.leaderboard import LeaderboardDetailed
+from app.schemas.team import TeamResponse
+from app.schemas.tournament import TournamentResponse
+
+
+class LeagueDashboard(BaseModel):
+    """Everything needed to render a league page in one response.
+
+    `version` is an opaque token the client sends back as `since` on the next
+    request. Sections that did not change since that version are returned as
+    null and listed in `unchanged`.
+    """
+    version: str
+    unchanged: List[str] = []
+    league: Optional[LeagueResponse] = None
+    entries: Optional[List[EntryResponse]] = None
+    leaderboard: Optional[LeaderboardDetailed] = None
+    team: Optional[TeamResponse] = None
+    tournament: Optional[TournamentResponse] = None
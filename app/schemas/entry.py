@@ -22,7 +22,7 @@ class EntryResponse(EntryBase):
     id: int
     payment_status: PaymentStatus
     amount_paid: float
-    total_score: float
+    total_score: Optional[float]  # None until the entry is scored
     created_at: datetime
     updated_at: datetime
 
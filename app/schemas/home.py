@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from app.models.entry import PaymentStatus
+from app.models.league import LeagueStatus
+
+
+class HomeEntry(BaseModel):
+    """One of the user's entries with its league and current standing"""
+    entry_id: int
+    league_id: int
+    league_name: str
+    league_status: LeagueStatus
+    tournament_id: int
+    tournament_name: str
+    payment_status: PaymentStatus
+    total_score: Optional[float]  # None until the entry is scored
+    team_id: Optional[int] = None
+    team_valid: bool
+    rank: int  # Leaderboard position: ties go to the earlier entry
+    field_size: int
+    projected_prize: float  # Prize for the current rank if the league ended now
+
+
+class UserHome(BaseModel):
+    """Everything the app's home screen shows, in one response"""
+    entries: List[HomeEntry]
@@ -8,7 +8,7 @@ class RankingEntry(BaseModel):
     user_id: int
     username: str
     position: int
-    score: float
+    score: Optional[float]  # Unscored entries rank last
     prize: float
 
 
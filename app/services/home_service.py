@@ -0,0 +1,78 @@
+from typing import List
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.mock_data import get_mock_tournament
+from app.models import Entry, Leaderboard, League, Team
+
+
+def home_entries_query(user_id: int):
+    """The user's entries with league, team, prizes, rank and field size, in one statement.
+
+    ROW_NUMBER() runs only over the leagues the user entered, reading each
+    league's entries in score order from the (league_id, total_score) index.
+    Ranks match leaderboard positions: ties go to the earlier entry, and
+    entries without a score come last.
+    """
+    ranked = (
+        select(
+            Entry.id,
+            Entry.user_id,
+            Entry.league_id,
+            Entry.payment_status,
+            Entry.total_score,
+            func.row_number().over(
+                partition_by=Entry.league_id, order_by=(Entry.total_score.desc().nulls_last(), Entry.id)
+            ).label("rank"),
+            func.count().over(partition_by=Entry.league_id).label("field_size"),
+        )
+        .where(Entry.league_id.in_(select(Entry.league_id).where(Entry.user_id == user_id)))
+        .subquery()
+    )
+    return (
+        select(
+            ranked.c.id.label("entry_id"),
+            ranked.c.league_id,
+            League.name.label("league_name"),
+            League.status.label("league_status"),
+            League.tournament_id,
+            ranked.c.payment_status,
+            ranked.c.total_score,
+            Team.id.label("team_id"),
+            Team.is_valid.label("team_valid"),
+            ranked.c.rank,
+            ranked.c.field_size,
+            Leaderboard.first_place_prize,
+            Leaderboard.second_place_prize,
+            Leaderboard.third_place_prize,
+        )
+        .join(League, League.id == ranked.c.league_id)
+        .outerjoin(Team, Team.entry_id == ranked.c.id)
+        .outerjoin(Leaderboard, Leaderboard.league_id == ranked.c.league_id)
+        .where(ranked.c.user_id == user_id)
+        .order_by(ranked.c.id)
+    )
+
+
+async def get_home_entries(db: AsyncSession, user_id: int) -> List[dict]:
+    """Every entry of a user with its league, tournament, team validity, rank and projected prize"""
+    result = await db.execute(home_entries_query(user_id))
+    entries = []
+    for row in result:
+        prizes = (row.first_place_prize, row.second_place_prize, row.third_place_prize)
+        tournament = get_mock_tournament(row.tournament_id)
+        entries.append({
+            "entry_id": row.entry_id,
+            "league_id": row.league_id,
+            "league_name": row.league_name,
+            "league_status": row.league_status,
+            "tournament_id": row.tournament_id,
+            "tournament_name": tournament["name"] if tournament else "Unknown",
+            "payment_status": row.payment_status,
+            "total_score": row.total_score,
+            "team_id": row.team_id,
+            "team_valid": bool(row.team_valid),
+            "rank": row.rank,
+            "field_size": row.field_size,
+            "projected_prize": (prizes[row.rank - 1] or 0.0) if row.rank <= 3 else 0.0,
+        })
+    return entries
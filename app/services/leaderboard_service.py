@@ -0,0 +1,152 @@
+from typing import Dict
+from sqlalchemy import Numeric, bindparam, cast, event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from app.cache import TTLCache
+from app.config import LEADERBOARD_CACHE_SIZE, LEADERBOARD_CACHE_TTL_SECONDS
+from app.models import Entry, Leaderboard, League, User
+from app.schemas import LeaderboardDetailed
+
+# Precompressed leaderboards of completed tournaments (league_id -> CompressedPayload).
+# Their rankings no longer change; refreshes, score edits and prize pool changes
+# evict them once committed. The cache is per process: other workers keep their
+# copy until LEADERBOARD_CACHE_TTL_SECONDS, the only bound across processes.
+completed_leaderboards = TTLCache(
+    maxsize=LEADERBOARD_CACHE_SIZE, ttl=LEADERBOARD_CACHE_TTL_SECONDS, name="completed_leaderboard"
+)
+
+# Evictions per league (league_id -> count). A read caches its standings only if
+# no eviction happened since it started, so a read that overlapped a commit
+# cannot put the old standings back after the eviction.
+leaderboard_generations: Dict[int, int] = {}
+
+
+def leaderboard_generation(league_id: int) -> int:
+    """Current eviction count of a league, to record before reading its standings"""
+    return leaderboard_generations.get(league_id, 0)
+
+
+def cache_completed_leaderboard(league_id: int, generation: int, payload):
+    """Cache a league's final standings unless they were evicted since `generation` was read"""
+    if leaderboard_generations.get(league_id, 0) == generation:
+        completed_leaderboards.set(league_id, payload)
+
+
+def invalidate_leaderboard(db: AsyncSession, league_id: int):
+    """Evict a league's cached leaderboard when the caller's transaction commits"""
+    db.info.setdefault("changed_leaderboards", set()).add(league_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_changed_leaderboards(session):
+    # After the commit; reads that started before it see the new generation and skip caching
+    for league_id in session.info.pop("changed_leaderboards", ()):
+        leaderboard_generations[league_id] = leaderboard_generations.get(league_id, 0) + 1
+        completed_leaderboards.pop(league_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_leaderboards(session):
+    session.info.pop("changed_leaderboards", None)
+
+
+# Entry columns Leaderboard.build_rankings reads
+RANKING_COLUMNS = (Entry.id, Entry.user_id, Entry.total_score)
+
+
+async def get_league_entries_with_usernames(db: AsyncSession, league_id: int, ranking_only: bool = False):
+    """Get all entries of a league plus a user_id -> username map in a single query.
+
+    With `ranking_only`, entries are loaded with just the columns rankings need.
+    """
+    query = (
+        select(Entry, User.username)
+        .join(User, User.id == Entry.user_id)
+        .where(Entry.league_id == league_id)
+    )
+    if ranking_only:
+        query = query.options(load_only(*RANKING_COLUMNS))
+    result = await db.execute(query)
+    rows = result.all()
+    entries = [entry for entry, _ in rows]
+    usernames = {entry.user_id: username for entry, username in rows}
+    return entries, usernames
+
+
+def _split(pool, share: float):
+    return func.round(cast(pool * share, Numeric), 2)
+
+
+def _prize_values(pool) -> dict:
+    """SET clause storing a prize pool and its 60/30/10 split"""
+    return {
+        "prize_pool": pool,
+        "first_place_prize": _split(pool, 0.60),
+        "second_place_prize": _split(pool, 0.30),
+        "third_place_prize": _split(pool, 0.10),
+    }
+
+
+# Adds :pool_delta to a league's prize pool and re-splits it 60/30/10 in the
+# same statement, so concurrent payment events never lose an update. Every SET
+# expression reads the row's old prize_pool.
+_leaderboards = Leaderboard.__table__
+_new_pool = func.round(cast(_leaderboards.c.prize_pool + bindparam("pool_delta"), Numeric), 2)
+PRIZE_POOL_ADJUSTMENT = (
+    update(_leaderboards)
+    .where(_leaderboards.c.league_id == bindparam("pool_league_id"))
+    .values(**_prize_values(_new_pool))
+)
+
+# Sets a league's prize pool to the sum of its entries' amount_paid. This is the
+# repair path for running totals that drifted (e.g. rows edited by hand).
+_amount_received = (
+    select(func.coalesce(func.sum(Entry.amount_paid), 0.0))
+    .where(Entry.league_id == _leaderboards.c.league_id)
+    .scalar_subquery()
+)
+PRIZE_POOL_RECOMPUTATION = (
+    update(_leaderboards)
+    .where(_leaderboards.c.league_id == bindparam("pool_league_id"))
+    .values(**_prize_values(func.round(cast(_amount_received, Numeric), 2)))
+)
+
+
+async def adjust_prize_pools(db: AsyncSession, deltas: Dict[int, float]):
+    """Apply changes in amount received (league_id -> delta) to the prize pools, in the caller's transaction"""
+    params = [{"pool_league_id": league_id, "pool_delta": delta} for league_id, delta in deltas.items() if delta]
+    if params:
+        await db.execute(PRIZE_POOL_ADJUSTMENT, params)
+        for param in params:
+            invalidate_leaderboard(db, param["pool_league_id"])
+
+
+async def recompute_prize_pool(db: AsyncSession, league_id: int):
+    """Rebuild a league's prize pool from amount_paid, in the caller's transaction"""
+    await db.execute(PRIZE_POOL_RECOMPUTATION, {"pool_league_id": league_id})
+
+
+def leaderboard_detailed_content(league: League, leaderboard: Leaderboard, entries, usernames, tournament_name: str) -> dict:
+    """Rank entries for display with the stored prizes, without modifying the leaderboard.
+
+    Prizes are running totals maintained by payment processing, so nothing is
+    aggregated here; POST /leaderboard/{id}/refresh is what persists rankings
+    and recomputes the pool from amount_paid.
+    Returns plain data in the shape of LeaderboardDetailed, ready to encode.
+    """
+    return {
+        "league_id": league.id,
+        "league_name": league.name,
+        "tournament_name": tournament_name,
+        "prize_pool": leaderboard.prize_pool,
+        "first_place_prize": leaderboard.first_place_prize,
+        "second_place_prize": leaderboard.second_place_prize,
+        "third_place_prize": leaderboard.third_place_prize,
+        "rankings": leaderboard.build_rankings(entries, usernames),
+        "last_updated": leaderboard.last_updated,
+    }
+
+
+def build_leaderboard_detailed(league: League, leaderboard: Leaderboard, entries, usernames, tournament_name: str) -> LeaderboardDetailed:
+    """The detailed leaderboard as a model, for responses that embed it"""
+    return LeaderboardDetailed(**leaderboard_detailed_content(league, leaderboard, entries, usernames, tournament_name))
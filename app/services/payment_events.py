@@ -0,0 +1,119 @@
+import logging
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Entry
+from app.models.entry import PaymentStatus
+from app.services.leaderboard_service import adjust_prize_pools
+
+logger = logging.getLogger(__name__)
+
+
+async def handle_checkout_completed(db: AsyncSession, session: dict, gateway):
+    """Mark the entry paid once its checkout session completes and remember its Stripe ids"""
+    entry_id = session.get("metadata", {}).get("entry_id")
+    if not entry_id:
+        return
+
+    entry = await db.get(Entry, int(entry_id))
+    if entry and entry.payment_status == PaymentStatus.REFUNDED:
+        # A replayed or late event must not bring a refunded entry back
+        logger.info(f"Entry {entry_id}: already refunded, checkout completion ignored")
+    elif entry:
+        entry.payment_status = PaymentStatus.PAID
+        entry.stripe_checkout_session_id = session.get("id")
+        entry.stripe_payment_intent_id = session.get("payment_intent")
+        logger.info(f"Entry {entry_id}: payment_status set to PAID")
+
+
+async def find_entry_for_payment_intent(db: AsyncSession, payment_intent_id: str, gateway) -> Optional[Entry]:
+    """The entry paid by a payment intent.
+
+    Resolved from the stored id; Stripe is only asked when the charge arrives
+    before its checkout.session.completed event (or for entries created before
+    ids were stored), and the ids are saved for later events.
+    """
+    entry = await db.scalar(select(Entry).where(Entry.stripe_payment_intent_id == payment_intent_id))
+    if entry is not None:
+        return entry
+
+    session = await gateway.find_checkout_session(payment_intent_id)
+    entry_id = session["metadata"].get("entry_id") if session else None
+    if not entry_id:
+        return None
+
+    entry = await db.get(Entry, int(entry_id))
+    if entry:
+        entry.stripe_checkout_session_id = session["id"]
+        entry.stripe_payment_intent_id = payment_intent_id
+    return entry
+
+
+async def set_amount_paid(db: AsyncSession, entry: Entry, amount: float, *conditions) -> bool:
+    """Change what an entry paid and move the difference into its league's prize pool.
+
+    The amount is compare-and-set against the value last read, so when two
+    workers change the same entry at once only the winner's difference reaches
+    the pool; the other retries from the amount now stored. Returns False (and
+    changes nothing) once the entry no longer matches the extra `conditions`.
+    """
+    expected = entry.amount_paid
+    while expected != amount:
+        result = await db.execute(
+            update(Entry)
+            .where(Entry.id == entry.id, Entry.amount_paid == expected, *conditions)
+            .values(amount_paid=amount)
+        )
+        if result.rowcount == 1:
+            await adjust_prize_pools(db, {entry.league_id: round(amount - (expected or 0.0), 2)})
+            return True
+        # Changed by someone else since it was read
+        row = (await db.execute(select(Entry.amount_paid).where(Entry.id == entry.id, *conditions))).first()
+        if row is None:
+            return False
+        expected = row.amount_paid
+    return True
+
+
+async def handle_charge_updated(db: AsyncSession, charge: dict, gateway):
+    """Record the net amount received once the charge's balance transaction exists"""
+    payment_intent_id = charge.get("payment_intent")
+    if not payment_intent_id or not charge.get("balance_transaction"):
+        return
+
+    entry = await find_entry_for_payment_intent(db, payment_intent_id, gateway)
+    if entry and entry.payment_status != PaymentStatus.REFUNDED:
+        bt = await gateway.retrieve_balance_transaction(charge["balance_transaction"])
+        # The refund may have landed while Stripe was being asked
+        if await set_amount_paid(db, entry, bt["net"] / 100, Entry.payment_status != PaymentStatus.REFUNDED):
+            logger.info(f"Entry {entry.id}: amount_paid set to {bt['net'] / 100}")
+
+
+async def handle_charge_refunded(db: AsyncSession, charge: dict, gateway):
+    """Take a fully refunded entry's payment out of the prize pool"""
+    payment_intent_id = charge.get("payment_intent")
+    if not payment_intent_id:
+        return
+    if not charge.get("refunded"):
+        logger.warning(f"Partial refund on {payment_intent_id} left for manual review")
+        return
+
+    entry = await find_entry_for_payment_intent(db, payment_intent_id, gateway)
+    if entry and entry.payment_status != PaymentStatus.REFUNDED:
+        entry.payment_status = PaymentStatus.REFUNDED
+        await set_amount_paid(db, entry, 0.0)
+        logger.info(f"Entry {entry.id}: payment_status set to REFUNDED")
+
+
+EVENT_HANDLERS = {
+    "checkout.session.completed": handle_checkout_completed,
+    "charge.updated": handle_charge_updated,
+    "charge.refunded": handle_charge_refunded,
+}
+
+
+async def apply_event(db: AsyncSession, event: dict, gateway):
+    """Apply a Stripe event to the database; the caller commits"""
+    handler = EVENT_HANDLERS.get(event["type"])
+    if handler is not None:
+        await handler(db, event["data"]["object"], gateway)
@@ -0,0 +1,218 @@
+import argparse
+import asyncio
+import calendar
+import logging
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import case, select, update
+from app.database import AsyncSessionLocal, async_engine
+from app.models import Entry
+from app.models.entry import PaymentStatus
+from app.services.leaderboard_service import adjust_prize_pools
+from app.services.stripe_service import stripe_gateway
+
+logger = logging.getLogger(__name__)
+
+# Largest page the Stripe list endpoints return
+STRIPE_PAGE_SIZE = 100
+
+
+@dataclass
+class ReconciliationReport:
+    checkout_sessions: int = 0
+    balance_transactions: int = 0
+    pages: int = 0
+    marked_paid: int = 0  # Entries still pending although their checkout completed
+    ids_backfilled: int = 0  # Paid entries missing their Stripe ids
+    amounts_corrected: int = 0  # Entries whose amount_paid differed from the net received
+    unmatched: int = 0  # Stripe objects with no matching entry
+    seconds: float = 0.0
+
+    @property
+    def objects_per_second(self) -> float:
+        scanned = self.checkout_sessions + self.balance_transactions
+        return round(scanned / self.seconds, 1) if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "objects_per_second": self.objects_per_second}
+
+
+async def _pages(list_page, page_size: int, created_gte: Optional[int]):
+    """Walk a Stripe list endpoint page by page"""
+    starting_after = None
+    while True:
+        items, has_more = await list_page(limit=page_size, starting_after=starting_after, created_gte=created_gte)
+        if items:
+            yield items
+        if not has_more or not items:
+            return
+        starting_after = items[-1]["id"]
+
+
+def _per_entry(values: dict):
+    """SQL expression picking each matched entry's own value (entry id -> value)"""
+    return case(values, value=Entry.id)
+
+
+async def _apply(db, ids, conditions, values: dict) -> set:
+    """One batched UPDATE of the given entries that still match `conditions`; returns the ids it changed.
+
+    The conditions re-check what was read, so rows a webhook worker changed in
+    the meantime are left alone.
+    """
+    result = await db.execute(
+        update(Entry)
+        .where(Entry.id.in_(ids), *conditions)
+        .values(**values)
+        .returning(Entry.id)
+        .execution_options(synchronize_session=False)
+    )
+    return set(result.scalars())
+
+
+async def _reconcile_checkout_sessions(db, sessions, report: ReconciliationReport, dry_run: bool):
+    paid = {}
+    for session in sessions:
+        entry_id = (session.get("metadata") or {}).get("entry_id")
+        if session.get("payment_status") == "paid" and entry_id:
+            paid[int(entry_id)] = session
+
+    rows = (await db.execute(
+        select(Entry.id, Entry.payment_status, Entry.stripe_payment_intent_id).where(Entry.id.in_(paid))
+    )).all()
+    report.unmatched += len(paid) - len(rows)
+
+    pending = [row.id for row in rows if row.payment_status == PaymentStatus.PENDING]
+    missing_ids = [
+        row.id for row in rows
+        if row.payment_status != PaymentStatus.PENDING and row.stripe_payment_intent_id is None
+    ]
+    if dry_run:
+        report.marked_paid += len(pending)
+        report.ids_backfilled += len(missing_ids)
+        return
+
+    def stripe_ids(ids):
+        return {
+            "stripe_checkout_session_id": _per_entry({id: paid[id]["id"] for id in ids}),
+            "stripe_payment_intent_id": _per_entry({id: paid[id]["payment_intent"] for id in ids}),
+            "updated_at": datetime.utcnow(),
+        }
+
+    if pending:
+        # Only entries still pending: a refund in the meantime must not be flipped back to paid
+        marked = await _apply(
+            db, pending, [Entry.payment_status == PaymentStatus.PENDING],
+            {"payment_status": PaymentStatus.PAID, **stripe_ids(pending)},
+        )
+        report.marked_paid += len(marked)
+    if missing_ids:
+        backfilled = await _apply(db, missing_ids, [Entry.stripe_payment_intent_id.is_(None)], stripe_ids(missing_ids))
+        report.ids_backfilled += len(backfilled)
+
+
+async def _reconcile_balance_transactions(db, transactions, report: ReconciliationReport, dry_run: bool):
+    by_intent = {}
+    for transaction in transactions:
+        source = transaction.get("source")
+        payment_intent = source.get("payment_intent") if isinstance(source, dict) else None
+        if payment_intent:
+            by_intent[payment_intent] = transaction
+
+    rows = (await db.execute(
+        select(Entry.id, Entry.league_id, Entry.payment_status, Entry.amount_paid, Entry.stripe_payment_intent_id)
+        .where(Entry.stripe_payment_intent_id.in_(by_intent))
+    )).all()
+    report.unmatched += len(by_intent) - len(rows)
+
+    corrections = {}
+    for row in rows:
+        net = by_intent[row.stripe_payment_intent_id]["net"] / 100
+        if row.payment_status != PaymentStatus.REFUNDED and row.amount_paid != net:
+            corrections[row.id] = (row, net)
+    if dry_run or not corrections:
+        report.amounts_corrected += len(corrections)
+        return
+
+    # Compare-and-set against the amounts read, as set_amount_paid does, so only
+    # rows no worker changed since are corrected and counted into the pools
+    corrected = await _apply(
+        db,
+        list(corrections),
+        [
+            Entry.payment_status != PaymentStatus.REFUNDED,
+            Entry.amount_paid.is_not_distinct_from(_per_entry({id: row.amount_paid for id, (row, _) in corrections.items()})),
+        ],
+        {"amount_paid": _per_entry({id: net for id, (_, net) in corrections.items()}), "updated_at": datetime.utcnow()},
+    )
+    report.amounts_corrected += len(corrected)
+
+    pool_deltas = defaultdict(float)
+    for entry_id in corrected:
+        row, net = corrections[entry_id]
+        pool_deltas[row.league_id] += net - (row.amount_paid or 0.0)
+    await adjust_prize_pools(db, {league_id: round(delta, 2) for league_id, delta in pool_deltas.items()})
+
+
+async def reconcile(
+    session_factory=AsyncSessionLocal,
+    gateway=stripe_gateway,
+    since: Optional[datetime] = None,
+    page_size: int = STRIPE_PAGE_SIZE,
+    dry_run: bool = False,
+) -> ReconciliationReport:
+    """Bring entries in line with Stripe for payments whose webhooks were lost.
+
+    Completed checkout sessions mark their entries paid (and store the Stripe
+    ids); charge balance transactions then set amount_paid to the net
+    received and move the difference into the prize pools. Each page costs
+    one indexed query and batched UPDATEs, committed per page. The UPDATEs
+    re-check the values read, so entries a webhook worker changed meanwhile
+    (paid, re-priced or refunded) are skipped rather than counted twice.
+    `since` is a naive UTC datetime.
+    """
+    report = ReconciliationReport()
+    created_gte = calendar.timegm(since.utctimetuple()) if since is not None else None
+    started_at = time.perf_counter()
+
+    async with session_factory() as db:
+        # Sessions first: they store the payment intent ids balance transactions are matched on
+        async for sessions in _pages(gateway.list_checkout_sessions, page_size, created_gte):
+            report.pages += 1
+            report.checkout_sessions += len(sessions)
+            await _reconcile_checkout_sessions(db, sessions, report, dry_run)
+            await db.commit()
+
+        async for transactions in _pages(gateway.list_balance_transactions, page_size, created_gte):
+            report.pages += 1
+            report.balance_transactions += len(transactions)
+            await _reconcile_balance_transactions(db, transactions, report, dry_run)
+            await db.commit()
+
+    report.seconds = round(time.perf_counter() - started_at, 3)
+    logger.info(f"Payment reconciliation{' (dry run)' if dry_run else ''}: {report.as_dict()}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconcile entry payments with Stripe")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only Stripe objects created since (UTC, ISO 8601)")
+    parser.add_argument("--page-size", type=int, default=STRIPE_PAGE_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Report mismatches without correcting them")
+    args = parser.parse_args(argv)
+
+    async def run():
+        report = await reconcile(since=args.since, page_size=args.page_size, dry_run=args.dry_run)
+        await async_engine.dispose()
+        return report
+
+    report = asyncio.run(run())
+    for name, value in report.as_dict().items():
+        print(f"{name:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
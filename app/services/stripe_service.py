@@ -1,15 +1,92 @@
-import stripe
-from app.config import STRIPE_SECRET_KEY, FRONTEND_URL
+import asyncio
+import time
+from typing import List, Optional, Tuple
+from app.config import (
+    STRIPE_SECRET_KEY,
+    STRIPE_WEBHOOK_SECRET,
+    STRIPE_BACKEND,
+    STRIPE_TIMEOUT_SECONDS,
+    STRIPE_CONNECT_TIMEOUT_SECONDS,
+    STRIPE_MAX_NETWORK_RETRIES,
+    STRIPE_BREAKER_FAILURES,
+    STRIPE_BREAKER_RESET_SECONDS,
+    FRONTEND_URL,
+)
+from app.metrics import STRIPE_LATENCY
+from app.services.stripe_standin import LocalStripe
 
-stripe.api_key = STRIPE_SECRET_KEY
+_stripe = None
 
 
-def create_checkout_session(entry_id: int, entry_fee: float, league_name: str, league_id: int) -> str:
-    """Create a Stripe Checkout Session and return the checkout URL."""
-    session = stripe.checkout.Session.create(
-        mode="payment",
-        payment_method_types=["card"],
-        line_items=[
+def get_stripe():
+    """Import and configure the Stripe SDK on first use; importing it dominates worker boot time"""
+    global _stripe
+    if _stripe is None:
+        import stripe
+        stripe.api_key = STRIPE_SECRET_KEY
+        _stripe = stripe
+    return _stripe
+
+
+class StripeUnavailable(Exception):
+    """Stripe could not be reached, timed out, or the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive failures.
+
+    Once open, calls are refused for `reset_timeout` seconds; then a single
+    trial call is let through, which closes the circuit on success or opens
+    it again on failure.
+    """
+
+    def __init__(self, failure_threshold: int = STRIPE_BREAKER_FAILURES, reset_timeout: float = STRIPE_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """Whether a call may go through now"""
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            # Half-open: this caller makes the trial call, others keep failing fast
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+async def stripe_call(operation: str, fn, *args, **kwargs):
+    """Await a Stripe API call, recording the request latency under `operation`"""
+    with STRIPE_LATENCY.labels(operation).time():
+        return await fn(*args, **kwargs)
+
+
+def construct_event(payload: bytes, sig_header: Optional[str]):
+    """Verify a webhook signature and parse the event (raises ValueError or SignatureVerificationError)"""
+    return get_stripe().Webhook.construct_event(payload, sig_header, STRIPE_WEBHOOK_SECRET)
+
+
+def checkout_session_params(entry_id: int, entry_fee: float, league_name: str, league_id: int) -> dict:
+    """Parameters of the Checkout Session that pays an entry fee"""
+    return {
+        "mode": "payment",
+        "payment_method_types": ["card"],
+        "line_items": [
             {
                 "price_data": {
                     "currency": "eur",
@@ -21,8 +98,114 @@ def create_checkout_session(entry_id: int, entry_fee: float, league_name: str, l
                 "quantity": 1,
             }
         ],
-        metadata={"entry_id": str(entry_id)},
-        success_url=f"{FRONTEND_URL}/your-leagues/{league_id}",
-        cancel_url=f"{FRONTEND_URL}/payment/cancel",
-    )
-    return session.url
+        "metadata": {"entry_id": str(entry_id)},
+        "success_url": f"{FRONTEND_URL}/your-leagues/{league_id}",
+        "cancel_url": f"{FRONTEND_URL}/payment/cancel",
+    }
+
+
+class StripeGateway:
+    """Async Stripe API client.
+
+    Requests go through one pooled httpx client per process (keep-alive
+    connections, strict connect/read timeouts). Connection errors, timeouts,
+    rate limits and Stripe server errors (APIError) count towards the circuit
+    breaker and are raised as StripeUnavailable; while the circuit is open,
+    calls fail immediately. LocalStripe offers the same methods without network access.
+    """
+
+    def __init__(self, breaker: Optional[CircuitBreaker] = None):
+        self.breaker = breaker or CircuitBreaker()
+        self._client = None
+        self._http_client = None
+
+    def client(self):
+        """The StripeClient, created on first use"""
+        if self._client is None:
+            import httpx
+            stripe = get_stripe()
+            timeout = httpx.Timeout(STRIPE_TIMEOUT_SECONDS, connect=STRIPE_CONNECT_TIMEOUT_SECONDS)
+            self._http_client = stripe.HTTPXClient(timeout=timeout)
+            self._client = stripe.StripeClient(
+                STRIPE_SECRET_KEY or "",
+                http_client=self._http_client,
+                max_network_retries=STRIPE_MAX_NETWORK_RETRIES,
+            )
+        return self._client
+
+    async def close(self):
+        """Close pooled connections; the next call opens a new client"""
+        http_client, self._http_client, self._client = self._http_client, None, None
+        if http_client is not None:
+            await http_client.close_async()
+
+    async def _request(self, operation: str, fn, *args, **kwargs):
+        if not self.breaker.allow():
+            raise StripeUnavailable(f"Stripe circuit open, {operation} not attempted")
+        stripe = get_stripe()
+        try:
+            result = await stripe_call(operation, fn, *args, **kwargs)
+        except (stripe.APIConnectionError, stripe.RateLimitError, stripe.APIError, asyncio.TimeoutError) as exc:
+            self.breaker.record_failure()
+            raise StripeUnavailable(f"{operation} failed: {exc}") from exc
+        except Exception:
+            # Stripe answered (e.g. an invalid request), so it is reachable
+            self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def create_checkout_session(self, entry_id: int, entry_fee: float, league_name: str, league_id: int):
+        """Create a Checkout Session for an entry fee and return it (its `id` and checkout `url`)"""
+        return await self._request(
+            "checkout.Session.create",
+            self.client().checkout.sessions.create_async,
+            params=checkout_session_params(entry_id, entry_fee, league_name, league_id),
+        )
+
+    async def find_checkout_session(self, payment_intent_id: str) -> Optional[dict]:
+        """The checkout session that created a payment intent, if any"""
+        sessions = await self._request(
+            "checkout.Session.list",
+            self.client().checkout.sessions.list_async,
+            params={"payment_intent": payment_intent_id, "limit": 1},
+        )
+        return sessions.data[0] if sessions.data else None
+
+    async def list_checkout_sessions(
+        self, limit: int, starting_after: Optional[str] = None, created_gte: Optional[int] = None
+    ) -> Tuple[List[dict], bool]:
+        """One page of completed checkout sessions and whether more follow"""
+        params = {"limit": limit, "status": "complete"}
+        if starting_after is not None:
+            params["starting_after"] = starting_after
+        if created_gte is not None:
+            params["created"] = {"gte": created_gte}
+        page = await self._request("checkout.Session.list", self.client().checkout.sessions.list_async, params=params)
+        return page.data, page.has_more
+
+    async def list_balance_transactions(
+        self, limit: int, starting_after: Optional[str] = None, created_gte: Optional[int] = None
+    ) -> Tuple[List[dict], bool]:
+        """One page of charge balance transactions (with their charge) and whether more follow"""
+        params = {"limit": limit, "type": "charge", "expand": ["data.source"]}
+        if starting_after is not None:
+            params["starting_after"] = starting_after
+        if created_gte is not None:
+            params["created"] = {"gte": created_gte}
+        page = await self._request(
+            "BalanceTransaction.list", self.client().balance_transactions.list_async, params=params
+        )
+        return page.data, page.has_more
+
+    async def retrieve_balance_transaction(self, balance_transaction_id: str) -> dict:
+        """A balance transaction, whose `net` is the amount received after fees (in cents)"""
+        return await self._request(
+            "BalanceTransaction.retrieve",
+            self.client().balance_transactions.retrieve_async,
+            balance_transaction_id,
+        )
+
+
+# Gateway used by the league routes and payment event workers; STRIPE_BACKEND=local swaps in the stand-in
+stripe_gateway = LocalStripe() if STRIPE_BACKEND == "local" else StripeGateway()
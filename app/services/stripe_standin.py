@@ -0,0 +1,106 @@
+import hashlib
+import hmac
+import itertools
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+def sign_webhook_payload(payload: bytes, secret: str, timestamp: Optional[int] = None) -> str:
+    """Stripe-Signature header for a payload, computed the way Stripe signs webhooks"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signature = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+class LocalStripe:
+    """In-process stand-in for the Stripe API.
+
+    Holds checkout sessions and balance transactions in memory and serves the
+    same calls as StripeGateway, so payment processing can run in tests, load
+    tests and offline development. `calls` counts the requests served.
+    """
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self.checkout_sessions: Dict[str, dict] = {}
+        self.balance_transactions: Dict[str, dict] = {}
+        self.calls: Counter = Counter()
+
+    def add_checkout_session(
+        self, entry_id: int, amount_total: int, payment_intent: Optional[str] = None, payment_status: str = "paid"
+    ) -> dict:
+        """Record a checkout session for an entry (amounts in cents), completed by default"""
+        number = next(self._ids)
+        session = {
+            "id": f"cs_local_{number}",
+            "object": "checkout.session",
+            "created": int(time.time()),
+            "status": "complete" if payment_status == "paid" else "open",
+            "url": f"https://checkout.stripe.local/c/pay/cs_local_{number}",
+            "amount_total": amount_total,
+            "payment_intent": payment_intent or f"pi_local_{number}",
+            "payment_status": payment_status,
+            "metadata": {"entry_id": str(entry_id)},
+        }
+        self.checkout_sessions[session["id"]] = session
+        return session
+
+    def add_balance_transaction(self, amount: int, fee: int, payment_intent: Optional[str] = None) -> dict:
+        """Record a settled charge; `net` is what reaches the account (cents)"""
+        number = next(self._ids)
+        transaction = {
+            "id": f"txn_local_{number}",
+            "object": "balance_transaction",
+            "created": int(time.time()),
+            "type": "charge",
+            "amount": amount,
+            "fee": fee,
+            "net": amount - fee,
+            "source": {"id": f"ch_local_{number}", "object": "charge", "payment_intent": payment_intent},
+        }
+        self.balance_transactions[transaction["id"]] = transaction
+        return transaction
+
+    async def create_checkout_session(self, entry_id: int, entry_fee: float, league_name: str, league_id: int) -> dict:
+        self.calls["checkout.Session.create"] += 1
+        return self.add_checkout_session(entry_id, int(entry_fee * 100), payment_status="unpaid")
+
+    async def close(self):
+        pass
+
+    async def find_checkout_session(self, payment_intent_id: str) -> Optional[dict]:
+        self.calls["checkout.Session.list"] += 1
+        for session in self.checkout_sessions.values():
+            if session["payment_intent"] == payment_intent_id:
+                return session
+        return None
+
+    async def list_checkout_sessions(
+        self, limit: int, starting_after: Optional[str] = None, created_gte: Optional[int] = None
+    ) -> Tuple[List[dict], bool]:
+        self.calls["checkout.Session.list"] += 1
+        completed = [session for session in self.checkout_sessions.values() if session["status"] == "complete"]
+        return self._page(completed, limit, starting_after, created_gte)
+
+    async def list_balance_transactions(
+        self, limit: int, starting_after: Optional[str] = None, created_gte: Optional[int] = None
+    ) -> Tuple[List[dict], bool]:
+        self.calls["BalanceTransaction.list"] += 1
+        return self._page(list(self.balance_transactions.values()), limit, starting_after, created_gte)
+
+    @staticmethod
+    def _page(objects: List[dict], limit: int, starting_after: Optional[str], created_gte: Optional[int]):
+        """One page of a list, paginated the way the Stripe API does it"""
+        if created_gte is not None:
+            objects = [obj for obj in objects if obj["created"] >= created_gte]
+        if starting_after is not None:
+            position = next(i for i, obj in enumerate(objects) if obj["id"] == starting_after)
+            objects = objects[position + 1:]
+        return objects[:limit], len(objects) > limit
+
+    async def retrieve_balance_transaction(self, balance_transaction_id: str) -> dict:
+        self.calls["BalanceTransaction.retrieve"] += 1
+        if balance_transaction_id not in self.balance_transactions:
+            raise LookupError(f"No such balance transaction: {balance_transaction_id}")
+        return self.balance_transactions[balance_transaction_id]
@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import and_, or_, select, update
+from app.config import (
+    WEBHOOK_WORKERS,
+    WEBHOOK_MAX_ATTEMPTS,
+    WEBHOOK_RETRY_BASE_SECONDS,
+    WEBHOOK_RETRY_MAX_SECONDS,
+    WEBHOOK_POLL_SECONDS,
+    WEBHOOK_LEASE_SECONDS,
+)
+from app.database import AsyncSessionLocal, async_engine
+from app.metrics import WEBHOOK_EVENTS
+from app.models import WebhookEvent, WebhookEventStatus
+from app.services.payment_events import apply_event
+from app.services.stripe_service import stripe_gateway
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts: int, base: float = WEBHOOK_RETRY_BASE_SECONDS, cap: float = WEBHOOK_RETRY_MAX_SECONDS) -> float:
+    """Exponential backoff before the next attempt, after `attempts` failures"""
+    return min(cap, base * 2 ** (attempts - 1))
+
+
+class WebhookProcessor:
+    """Drains the webhook outbox with a fixed number of concurrent workers.
+
+    Events are claimed with a conditional UPDATE, so several processes can
+    share one outbox. A failed event is retried with exponential backoff until
+    `max_attempts`, then marked FAILED. Claims older than `lease` seconds
+    (a worker died mid-event) are picked up again.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        gateway=stripe_gateway,
+        workers: int = WEBHOOK_WORKERS,
+        max_attempts: int = WEBHOOK_MAX_ATTEMPTS,
+        poll_interval: float = WEBHOOK_POLL_SECONDS,
+        lease: float = WEBHOOK_LEASE_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.gateway = gateway
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def notify(self):
+        """Wake the workers after a new event was stored"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        """Start the worker tasks on the running event loop"""
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; claimed events are retried once their lease expires"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _work(self):
+        while True:
+            try:
+                processed = await self.process_next()
+            except Exception:
+                logger.exception("Webhook worker failed to reach the outbox")
+                processed = False
+            if not processed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def claim(self) -> Optional[int]:
+        """Claim the oldest due event for this worker, or return None"""
+        now = datetime.utcnow()
+        due = or_(
+            and_(WebhookEvent.status == WebhookEventStatus.PENDING, WebhookEvent.next_attempt_at <= now),
+            and_(
+                WebhookEvent.status == WebhookEventStatus.PROCESSING,
+                WebhookEvent.locked_at <= now - timedelta(seconds=self.lease),
+            ),
+        )
+        async with self.session_factory() as db:
+            while True:
+                event_id = await db.scalar(select(WebhookEvent.id).where(due).order_by(WebhookEvent.id).limit(1))
+                if event_id is None:
+                    return None
+                result = await db.execute(
+                    update(WebhookEvent)
+                    .where(WebhookEvent.id == event_id, due)
+                    .values(status=WebhookEventStatus.PROCESSING, locked_at=now)
+                )
+                await db.commit()
+                if result.rowcount:
+                    return event_id
+                # Another worker claimed it first
+
+    async def process_next(self) -> bool:
+        """Claim and process one due event; False when there was nothing to do"""
+        event_id = await self.claim()
+        if event_id is None:
+            return False
+        await self.process(event_id)
+        return True
+
+    async def process(self, event_id: int):
+        """Apply a claimed event, recording success or scheduling a retry"""
+        async with self.session_factory() as db:
+            event = await db.get(WebhookEvent, event_id)
+            try:
+                await apply_event(db, json.loads(event.payload), self.gateway)
+                event.status = WebhookEventStatus.DONE
+                event.processed_at = datetime.utcnow()
+                event.last_error = None
+                await db.commit()
+                WEBHOOK_EVENTS.labels(event.event_type, "processed").inc()
+            except Exception as exc:
+                await db.rollback()
+                await db.refresh(event)
+                event.attempts += 1
+                event.last_error = repr(exc)[:1000]
+                if event.attempts >= self.max_attempts:
+                    event.status = WebhookEventStatus.FAILED
+                    WEBHOOK_EVENTS.labels(event.event_type, "failed").inc()
+                    logger.error(f"Webhook event {event.event_id} failed after {event.attempts} attempts: {exc!r}")
+                else:
+                    event.status = WebhookEventStatus.PENDING
+                    event.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(event.attempts))
+                    WEBHOOK_EVENTS.labels(event.event_type, "retried").inc()
+                    logger.warning(f"Webhook event {event.event_id} failed (attempt {event.attempts}), retrying: {exc!r}")
+                await db.commit()
+
+    async def drain(self) -> int:
+        """Process due events until none are left and return how many were processed"""
+        processed = 0
+        while await self.process_next():
+            processed += 1
+        return processed
+
+    async def replay(
+        self,
+        since: datetime,
+        until: datetime,
+        event_type: Optional[str] = None,
+        status: Optional[WebhookEventStatus] = None,
+    ) -> int:
+        """Reschedule events received in [since, until) for immediate processing.
+
+        Handlers are idempotent, so replaying already processed events is safe.
+        Returns the number of events rescheduled.
+        """
+        conditions = [WebhookEvent.created_at >= since, WebhookEvent.created_at < until]
+        if event_type is not None:
+            conditions.append(WebhookEvent.event_type == event_type)
+        if status is not None:
+            conditions.append(WebhookEvent.status == status)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(WebhookEvent)
+                .where(*conditions)
+                .values(
+                    status=WebhookEventStatus.PENDING,
+                    attempts=0,
+                    next_attempt_at=datetime.utcnow(),
+                    locked_at=None,
+                    last_error=None,
+                    processed_at=None,
+                )
+            )
+            await db.commit()
+        self.notify()
+        return result.rowcount
+
+
+webhook_processor = WebhookProcessor()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay stored Stripe webhook events received in a time range")
+    parser.add_argument("--since", type=datetime.fromisoformat, required=True, help="Start (UTC, ISO 8601, inclusive)")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, help="End (UTC, exclusive; default now)")
+    parser.add_argument("--type", dest="event_type", help="Only events of this type, e.g. charge.updated")
+    parser.add_argument(
+        "--status", type=lambda value: WebhookEventStatus(value.lower()), help="Only events in this status, e.g. failed"
+    )
+    parser.add_argument("--process", action="store_true", help="Process them now instead of leaving them to the workers")
+    args = parser.parse_args(argv)
+
+    async def replay():
+        until = args.until or datetime.utcnow()
+        count = await webhook_processor.replay(args.since, until, args.event_type, args.status)
+        print(f"{count} events rescheduled")
+        if args.process:
+            print(f"{await webhook_processor.drain()} events processed")
+        await async_engine.dispose()
+
+    asyncio.run(replay())
+
+
+if __name__ == "__main__":
+    main()
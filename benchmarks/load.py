@@ -0,0 +1,266 @@
+"""End-to-end HTTP load benchmarks against the in-process ASGI app.
+
+Concurrent httpx clients drive the app through ASGITransport, so the full
+middleware, routing, validation, database and serialization path is measured
+without network noise. The app uses the configured DATABASE_URL; seed it
+first (`python -m benchmarks.seed`), otherwise a small dataset is seeded.
+
+    python -m benchmarks.load --concurrency 32
+    python -m benchmarks.load --scenarios odds_board leaderboard_polling --requests 5000
+    python -m benchmarks.load --compare results/load-a.json results/load-b.json
+"""
+import os
+
+# Webhook bursts are signed with this secret unless one is configured
+BENCHMARK_WEBHOOK_SECRET = "whsec_benchmark"
+os.environ.setdefault("STRIPE_WEBHOOK_SECRET", BENCHMARK_WEBHOOK_SECRET)
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+import httpx
+from sqlalchemy import func, select
+from app.auth import create_access_token
+from app.config import DATABASE_URL, STRIPE_WEBHOOK_SECRET
+from app.database import Base, engine
+from app.mock_data import MOCK_PLAYER_ODDS, get_mock_player_odds
+from app.models import Entry, League, Team, User
+from app.services.stripe_standin import sign_webhook_payload
+from app.models.entry import PaymentStatus
+from app.models.league import LeagueStatus
+from benchmarks.report import compare_results, latency_summary, write_results
+from benchmarks.seed import SEED_PASSWORD, seed
+
+# (method, url, httpx request kwargs)
+Request = Tuple[str, str, dict]
+
+
+@dataclass
+class Dataset:
+    """Existing rows the scenarios act on"""
+    users: List[Tuple[int, str]] = field(default_factory=list)  # (id, email)
+    teams: List[Tuple[int, int, int, int]] = field(default_factory=list)  # (team_id, entry_id, user_id, league_id)
+    open_entries: List[Tuple[int, int]] = field(default_factory=list)  # (entry_id, user_id) without a team
+    pending_entries: List[int] = field(default_factory=list)
+
+
+def load_dataset(sample: int = 1000) -> Dataset:
+    """Sample rows for the scenarios, seeding a small dataset into an empty database"""
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        has_users = conn.execute(select(func.count()).select_from(User).where(User.email.like("seed%"))).scalar()
+    if not has_users:
+        seed(engine, users=2000, leagues=200, entries=4000)
+
+    dataset = Dataset()
+    with engine.connect() as conn:
+        dataset.users = [tuple(row) for row in conn.execute(
+            select(User.id, User.email).where(User.email.like("seed%")).order_by(User.id).limit(sample)
+        )]
+        dataset.teams = [tuple(row) for row in conn.execute(
+            select(Team.id, Entry.id, Entry.user_id, Entry.league_id)
+            .join(Entry, Entry.id == Team.entry_id)
+            .join(League, League.id == Entry.league_id)
+            .where(League.status == LeagueStatus.OPEN)
+            .order_by(Team.id)
+            .limit(sample)
+        )]
+        dataset.open_entries = [tuple(row) for row in conn.execute(
+            select(Entry.id, Entry.user_id)
+            .outerjoin(Team, Team.entry_id == Entry.id)
+            .where(Team.id.is_(None))
+            .order_by(Entry.id)
+            .limit(sample)
+        )]
+        dataset.pending_entries = list(conn.execute(
+            select(Entry.id).where(Entry.payment_status == PaymentStatus.PENDING).order_by(Entry.id).limit(sample)
+        ).scalars())
+    return dataset
+
+
+class TokenBook:
+    """Access tokens minted directly, so only the scenario under test pays for logins"""
+
+    def __init__(self):
+        self._headers: Dict[int, dict] = {}
+
+    def headers(self, user_id: int) -> dict:
+        if user_id not in self._headers:
+            token = create_access_token(data={"sub": str(user_id)})
+            self._headers[user_id] = {"Authorization": f"Bearer {token}"}
+        return self._headers[user_id]
+
+
+def random_picks(rng: random.Random, tournament_id: int) -> List[dict]:
+    """Five distinct players from the odds board whose categories sum to at least 13"""
+    board = get_mock_player_odds(tournament_id)
+    while True:
+        picks = rng.sample(board, 5)
+        if sum(odds["category"] for odds in picks) >= 13:
+            return [{"player_id": odds["player_id"], "player_category": odds["category"]} for odds in picks]
+
+
+def signed_webhook(payload: dict, secret: str) -> Tuple[bytes, dict]:
+    """Body and Stripe-Signature header for a webhook event, as Stripe would send them"""
+    body = json.dumps(payload).encode()
+    return body, {"stripe-signature": sign_webhook_payload(body, secret), "content-type": "application/json"}
+
+
+def login_storm(dataset: Dataset, tokens: TokenBook, rng: random.Random) -> Callable[[int], Request]:
+    """Many users logging in at once (bcrypt bound)"""
+    def make(i):
+        _, email = dataset.users[i % len(dataset.users)]
+        return "POST", "/api/users/login", {"json": {"email": email, "password": SEED_PASSWORD}}
+    return make
+
+
+def odds_board(dataset: Dataset, tokens: TokenBook, rng: random.Random) -> Callable[[int], Request]:
+    """Browsing tournaments, players and the odds board before picking a team"""
+    tournament_ids = sorted({odds["tournament_id"] for odds in MOCK_PLAYER_ODDS})
+
+    def make(i):
+        if i % 4 == 0:
+            return "GET", "/api/tournaments/future", {}
+        if i % 4 == 1:
+            return "GET", "/api/players", {}
+        if i % 4 == 2:
+            return "GET", f"/api/players/odds/{rng.choice(tournament_ids)}", {"params": {"category": rng.randint(1, 5)}}
+        return "GET", f"/api/players/odds/{rng.choice(tournament_ids)}", {}
+    return make
+
+
+def team_lock(dataset: Dataset, tokens: TokenBook, rng: random.Random) -> Callable[[int], Request]:
+    """Last-minute team creation and pick changes just before the lock"""
+    unused = iter(dataset.open_entries)
+
+    def make(i):
+        if i % 4 == 0:
+            entry = next(unused, None)
+            if entry is not None:
+                entry_id, user_id = entry
+                body = {"entry_id": entry_id, "picks": random_picks(rng, 1)}
+                return "POST", "/api/teams", {"json": body, "headers": tokens.headers(user_id)}
+        team_id, _, user_id, _ = rng.choice(dataset.teams)
+        body = {"picks": random_picks(rng, 1)}
+        return "PUT", f"/api/teams/{team_id}", {"json": body, "headers": tokens.headers(user_id)}
+    return make
+
+
+def leaderboard_polling(dataset: Dataset, tokens: TokenBook, rng: random.Random) -> Callable[[int], Request]:
+    """Members refreshing leaderboards and league dashboards during a round"""
+    def make(i):
+        _, _, user_id, league_id = rng.choice(dataset.teams)
+        if i % 2:
+            return "GET", f"/api/leagues/{league_id}/dashboard", {"headers": tokens.headers(user_id)}
+        return "GET", f"/api/leaderboard/{league_id}", {}
+    return make
+
+
+def webhook_burst(dataset: Dataset, tokens: TokenBook, rng: random.Random) -> Callable[[int], Request]:
+    """Stripe delivering a burst of checkout completions"""
+    def make(i):
+        entry_id = dataset.pending_entries[i % len(dataset.pending_entries)]
+        event = {
+            "id": f"evt_bench_{i}",
+            "object": "event",
+            "type": "checkout.session.completed",
+            "data": {"object": {"id": f"cs_bench_{i}", "metadata": {"entry_id": str(entry_id)}}},
+        }
+        body, headers = signed_webhook(event, STRIPE_WEBHOOK_SECRET)
+        return "POST", "/api/payments/webhook", {"content": body, "headers": headers}
+    return make
+
+
+# Scenario name -> (request factory, default number of requests)
+SCENARIOS = {
+    "login_storm": (login_storm, 200),
+    "odds_board": (odds_board, 2000),
+    "team_lock": (team_lock, 1000),
+    "leaderboard_polling": (leaderboard_polling, 2000),
+    "webhook_burst": (webhook_burst, 1000),
+}
+
+
+async def run_scenario(client: httpx.AsyncClient, make_request: Callable[[int], Request], requests: int, concurrency: int) -> dict:
+    """Send `requests` requests from `concurrency` concurrent clients and summarize them"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = itertools.count()
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            method, url, kwargs = make_request(i)
+            started_at = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started_at)
+            statuses[response.status_code] += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = latency_summary(latencies, time.perf_counter() - started_at)
+    summary["statuses"] = {str(status): count for status, count in sorted(statuses.items())}
+    summary["errors"] = sum(count for status, count in statuses.items() if status >= 500)
+    return summary
+
+
+async def run(app, scenarios: List[str], dataset: Dataset, concurrency: int, requests: int = None, seed_value: int = 42) -> dict:
+    """Run the scenarios in order against `app`, with its lifespan active"""
+    tokens = TokenBook()
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in scenarios:
+                factory, default_requests = SCENARIOS[name]
+                make_request = factory(dataset, tokens, random.Random(seed_value))
+                results[name] = await run_scenario(client, make_request, requests or default_requests, concurrency)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP load benchmarks against the in-process app")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, help="Requests per scenario (default: per-scenario)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default=None, help="Where to write the JSON results")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        print("\n".join(compare_results(*args.compare, metrics=("rps", "p50_ms", "p95_ms", "p99_ms"))))
+        return
+
+    from main import app
+
+    dataset = load_dataset()
+    results = asyncio.run(run(app, args.scenarios, dataset, args.concurrency, args.requests, args.seed))
+
+    print(f"{'scenario':<22}{'requests':>9}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+    for name, summary in results.items():
+        print(
+            f"{name:<22}{summary['requests']:>9}{summary['rps']:>10}{summary['p50_ms']:>10}"
+            f"{summary['p95_ms']:>10}{summary['p99_ms']:>10}  {summary['statuses']}"
+        )
+
+    config = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "seed": args.seed,
+        "database": DATABASE_URL.split("://")[0],
+    }
+    kwargs = {"output_dir": args.output_dir} if args.output_dir else {}
+    print(f"Results written to {write_results('load', results, config, **kwargs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Micro-benchmarks of domain hot functions with complexity curves.
+
+Each benchmark runs at growing input sizes (10 to 1M by default) and reports
+the time per item and the fitted exponent k of time ~ n^k over the larger
+sizes: ~1 means linear, ~1.1 is n log n, 2 is quadratic. An algorithmic
+regression shows up as a jump in k rather than as an incident.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --only build_rankings calculate_prizes --max-size 100000
+    python -m benchmarks.micro --compare results/micro-a.json results/micro-b.json
+
+The leaderboard benchmarks build real ORM entries (about 1 GB at 1M); use
+--max-size to cap the sizes on small machines.
+"""
+import argparse
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+from fastapi.utils import create_model_field
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from starlette.responses import JSONResponse
+from app.auth import create_access_token, decode_token, token_cache
+from app.catalog import catalog
+from app.database import Base
+from app.mock_data import MOCK_PLAYER_ODDS, get_mock_player
+from app.models import Entry, League, Leaderboard, Team, TeamPick
+from app.models.entry import PaymentStatus
+from app.responses import FastJSONResponse, rows_response, schema_columns
+from app.schemas import EntryResponse, LeaderboardDetailed, RankingEntry, TeamCreate
+from app.services.leaderboard_service import leaderboard_detailed_content
+from benchmarks.report import compare_results, write_results
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+# Exponents are fitted on sizes where fixed per-call overhead no longer dominates
+FIT_MIN_SIZE = 1_000
+
+# Per-item inputs are cycled from a pool so large sizes do not need millions of objects
+POOL_SIZE = 1_000
+
+
+@dataclass
+class Benchmark:
+    """`setup(n)` builds inputs outside the timing; `run(inputs)` is the timed work"""
+    name: str
+    setup: Callable[[int], object]
+    run: Callable[[object], object]
+    max_size: int = DEFAULT_SIZES[-1]
+
+
+def build_entries(n: int) -> List[Entry]:
+    rng = random.Random(n)
+    return [
+        Entry(id=i, user_id=i, league_id=1, amount_paid=9.71, total_score=round(rng.uniform(0, 300), 1))
+        for i in range(1, n + 1)
+    ]
+
+
+_entries: List[Entry] = []
+
+
+def entries_of_size(n: int) -> List[Entry]:
+    """Shared entries, built once at the largest requested size and sliced"""
+    global _entries
+    if len(_entries) < n:
+        _entries = build_entries(n)
+    return _entries[:n]
+
+
+def valid_picks(rng: random.Random) -> List[dict]:
+    board = [odds for odds in MOCK_PLAYER_ODDS if odds["tournament_id"] == 1]
+    while True:
+        picks = rng.sample(board, 5)
+        if sum(odds["category"] for odds in picks) >= 13:
+            return [{"player_id": odds["player_id"], "player_category": odds["category"]} for odds in picks]
+
+
+def setup_teams(n: int):
+    rng = random.Random(0)
+    teams = []
+    for _ in range(min(n, POOL_SIZE)):
+        team = Team(picks=[TeamPick(player_id=p["player_id"], player_category=p["player_category"]) for p in valid_picks(rng)])
+        teams.append(team)
+    return n, teams
+
+
+def run_calculate_validity(inputs):
+    n, teams = inputs
+    pool = len(teams)
+    for i in range(n):
+        teams[i % pool].calculate_validity()
+
+
+def setup_rankings(n: int):
+    entries = entries_of_size(n)
+    leaderboard = Leaderboard(league_id=1)
+    leaderboard.calculate_prizes(entries)
+    return leaderboard, entries, {entry.user_id: f"user{entry.user_id}" for entry in entries}
+
+
+def run_build_rankings(inputs):
+    leaderboard, entries, usernames = inputs
+    leaderboard.build_rankings(entries, usernames)
+
+
+def setup_prizes(n: int):
+    return Leaderboard(league_id=1), entries_of_size(n)
+
+
+def run_calculate_prizes(inputs):
+    leaderboard, entries = inputs
+    leaderboard.calculate_prizes(entries)
+
+
+def setup_team_payloads(n: int):
+    rng = random.Random(0)
+    return n, [{"entry_id": i, "picks": valid_picks(rng)} for i in range(min(n, POOL_SIZE))]
+
+
+def run_validate_picks(inputs):
+    n, payloads = inputs
+    pool = len(payloads)
+    for i in range(n):
+        TeamCreate.model_validate(payloads[i % pool])
+
+
+def setup_player_ids(n: int):
+    rng = random.Random(0)
+    return [rng.randint(1, 30) for _ in range(n)]  # Includes some unknown ids
+
+
+def run_get_mock_player(player_ids):
+    for player_id in player_ids:
+        get_mock_player(player_id)
+
+
+def run_catalog_get_player(player_ids):
+    for player_id in player_ids:
+        catalog.get_player(player_id)
+
+
+def setup_tokens(n: int):
+    token_cache.clear()
+    return n
+
+
+def run_token_pair(n):
+    # A distinct subject per token, so every decode verifies the signature once
+    for i in range(n):
+        decode_token(create_access_token(data={"sub": str(i)}))
+
+
+def fastapi_default_response(field, content) -> bytes:
+    """FastAPI's default handling of a route result: validate against the response model, serialize, json.dumps"""
+    value, errors = field.validate(content, {}, loc=("response",))
+    assert not errors, errors
+    return JSONResponse(field.serialize(value, mode="json")).body
+
+
+ENTRIES_FIELD = create_model_field(name="Response_entries", type_=List[EntryResponse], mode="serialization")
+LEADERBOARD_FIELD = create_model_field(name="Response_leaderboard", type_=LeaderboardDetailed, mode="serialization")
+
+
+def setup_entry_results(n: int):
+    """Entries in an in-memory database, loaded as ORM objects and as rows of the response columns"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    now = datetime(2026, 4, 10, 12, 0)
+    with engine.begin() as conn:
+        conn.execute(insert(Entry), [
+            {"id": i, "user_id": i, "league_id": 1, "payment_status": PaymentStatus.PAID, "amount_paid": 9.71,
+             "total_score": float(i % 300), "created_at": now, "updated_at": now}
+            for i in range(1, n + 1)
+        ])
+    with Session(engine) as session:
+        entries = session.scalars(select(Entry)).all()
+        session.expunge_all()
+    with engine.connect() as conn:
+        rows = conn.execute(select(*schema_columns(EntryResponse, Entry))).all()
+    engine.dispose()
+    return entries, rows
+
+
+def run_entries_response_default(inputs):
+    entries, _ = inputs
+    fastapi_default_response(ENTRIES_FIELD, entries)
+
+
+def run_entries_response_orjson(inputs):
+    entries, _ = inputs
+    value, _ = ENTRIES_FIELD.validate(entries, {}, loc=("response",))
+    FastJSONResponse(ENTRIES_FIELD.serialize(value, mode="json"))
+
+
+def run_entries_response_trusted(inputs):
+    _, rows = inputs
+    rows_response(rows)
+
+
+def setup_leaderboard_response(n: int):
+    league = League(id=1, name="Bench League")
+    leaderboard = Leaderboard(league_id=1, last_updated=datetime(2026, 4, 10, 12, 0))
+    leaderboard.calculate_prizes(entries_of_size(n))
+    entries = entries_of_size(n)
+    return league, leaderboard, entries, {entry.user_id: f"user{entry.user_id}" for entry in entries}
+
+
+def run_leaderboard_response_default(inputs):
+    league, leaderboard, entries, usernames = inputs
+    detailed = LeaderboardDetailed(
+        league_id=league.id,
+        league_name=league.name,
+        tournament_name="Masters Tournament",
+        prize_pool=leaderboard.prize_pool,
+        first_place_prize=leaderboard.first_place_prize,
+        second_place_prize=leaderboard.second_place_prize,
+        third_place_prize=leaderboard.third_place_prize,
+        rankings=[RankingEntry(**r) for r in leaderboard.build_rankings(entries, usernames)],
+        last_updated=leaderboard.last_updated,
+    )
+    fastapi_default_response(LEADERBOARD_FIELD, detailed)
+
+
+def run_leaderboard_response_trusted(inputs):
+    league, leaderboard, entries, usernames = inputs
+    FastJSONResponse(leaderboard_detailed_content(league, leaderboard, entries, usernames, "Masters Tournament"))
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    benchmark.name: benchmark
+    for benchmark in (
+        Benchmark("calculate_validity", setup_teams, run_calculate_validity),
+        Benchmark("calculate_prizes", setup_prizes, run_calculate_prizes),
+        Benchmark("build_rankings", setup_rankings, run_build_rankings),
+        Benchmark("validate_picks", setup_team_payloads, run_validate_picks),
+        Benchmark("get_mock_player", setup_player_ids, run_get_mock_player),
+        Benchmark("catalog_get_player", setup_player_ids, run_catalog_get_player),
+        # JWT signing dominates; 1M pairs would take minutes without telling us more
+        Benchmark("token_encode_decode", setup_tokens, run_token_pair, max_size=100_000),
+        # Response serialization: FastAPI's default path (validate, serialize, json.dumps), the
+        # app-wide orjson response class, and the trusted path hot routes take
+        Benchmark("entries_response_default", setup_entry_results, run_entries_response_default, max_size=100_000),
+        Benchmark("entries_response_orjson", setup_entry_results, run_entries_response_orjson, max_size=100_000),
+        Benchmark("entries_response_trusted", setup_entry_results, run_entries_response_trusted, max_size=100_000),
+        Benchmark("leaderboard_response_default", setup_leaderboard_response, run_leaderboard_response_default),
+        Benchmark("leaderboard_response_trusted", setup_leaderboard_response, run_leaderboard_response_trusted),
+    )
+}
+
+
+def fit_exponent(points: Sequence[tuple]) -> Optional[float]:
+    """Least-squares slope of log(seconds) against log(n), i.e. k in time ~ n^k"""
+    points = [(math.log(n), math.log(seconds)) for n, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if not variance:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / variance, 3)
+
+
+def measure(benchmark: Benchmark, sizes: Sequence[int], repeat: int) -> dict:
+    """Best-of-`repeat` time at each size, the per-item cost and the fitted exponent"""
+    result = {}
+    points = []
+    for n in sizes:
+        if n > benchmark.max_size:
+            continue
+        best = math.inf
+        for _ in range(repeat):
+            inputs = benchmark.setup(n)
+            started_at = time.perf_counter()
+            benchmark.run(inputs)
+            best = min(best, time.perf_counter() - started_at)
+        result[f"n{n}_ns_per_item"] = round(best / n * 1e9, 1)
+        if n >= FIT_MIN_SIZE:
+            points.append((n, best))
+    result["exponent"] = fit_exponent(points)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of domain hot functions")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--max-size", type=int, default=None, help="Skip sizes above this")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs per size")
+    parser.add_argument("--output-dir", default=None, help="Where to write the JSON results")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        print("\n".join(compare_results(*args.compare)))
+        return
+
+    sizes = [n for n in args.sizes if args.max_size is None or n <= args.max_size]
+    results = {}
+    for name in args.only:
+        results[name] = measure(BENCHMARKS[name], sizes, args.repeat)
+        per_item = "  ".join(
+            f"{key[1:].split('_')[0]}: {value}ns" for key, value in results[name].items() if key != "exponent"
+        )
+        print(f"{name:<22} k={results[name]['exponent']}  {per_item}", flush=True)
+
+    config = {"sizes": sizes, "repeat": args.repeat}
+    kwargs = {"output_dir": args.output_dir} if args.output_dir else {}
+    print(f"Results written to {write_results('micro', results, config, **kwargs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Summaries and machine-readable results shared by the benchmark suites."""
+import json
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles (ms) of a batch of timed operations"""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+    }
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, so results can be compared across commits"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(kind: str, results: dict, config: dict, output_dir: Path = RESULTS_DIR) -> Path:
+    """Save results as `<kind>-<commit>-<timestamp>.json` and return the path"""
+    created_at = datetime.now()
+    commit = git_commit()
+    document = {
+        "kind": kind,
+        "commit": commit,
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": config,
+        "results": results,
+    }
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"{kind}-{commit}-{created_at:%Y%m%d-%H%M%S}.json"
+    path.write_text(json.dumps(document, indent=2, sort_keys=True))
+    return path
+
+
+def compare_results(old_path, new_path, metrics: Optional[Sequence[str]] = None) -> List[str]:
+    """Side-by-side lines for the metrics shared by two result files, with the relative change.
+
+    Without `metrics`, every numeric metric present in both files is compared.
+    """
+    old = json.loads(Path(old_path).read_text())
+    new = json.loads(Path(new_path).read_text())
+    lines = [f"{old['commit']} -> {new['commit']}"]
+    for name in sorted(set(old["results"]) & set(new["results"])):
+        shared = [
+            metric for metric, value in new["results"][name].items()
+            if isinstance(value, (int, float)) and metric in old["results"][name]
+        ]
+        for metric in metrics or shared:
+            before = old["results"][name].get(metric)
+            after = new["results"][name].get(metric)
+            if before is None or after is None:
+                continue
+            change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+            lines.append(f"{name:<28} {metric:<22} {before:>12} {after:>12} {change:>8}")
+    return lines
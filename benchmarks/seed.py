@@ -0,0 +1,334 @@
+"""Deterministic bulk data generator for load tests and query plans.
+
+Writes users, leagues (with leaderboards), paid/pending entries, teams with
+five picks each and a 156-player field with odds for every tournament, in
+Core `executemany` batches. The same arguments always produce the same rows.
+
+    python -m benchmarks.seed --users 1000000 --leagues 100000 --entries 2000000
+
+Reference data (tournaments, players, odds) is only written into empty
+tables; generated rows get ids after the current maximum, so the tool can
+also top up an existing database. Every seeded user's password is
+`SEED_PASSWORD`, so load tests can log in as `seed<id>@example.com`.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine, func, insert, select
+from app.config import DATABASE_URL
+from app.database import Base, configure_engine
+from app.mock_data import MOCK_PLAYERS, MOCK_TOURNAMENTS
+from app.models import Entry, League, Leaderboard, Player, PlayerOdds, Team, TeamPick, Tournament, User
+from app.models.entry import PaymentStatus
+from app.models.leaderboard import round_money
+from app.models.league import LeagueStatus
+
+SEED_PASSWORD = "seedpassword123"
+SEED_PASSWORD_SALT = "SeedSaltForLoadTestsue"  # Fixed so the hash, like every other row, is reproducible
+FIELD_SIZE = 156
+PICKS_PER_TEAM = 5
+ENTRY_FEES = (5.0, 10.0, 20.0, 50.0, 100.0)
+STRIPE_FEE_RATE = 0.029
+PAID_RATIO = 0.9
+
+# Every generated timestamp is relative to this, so reruns produce identical rows
+BASE_TIME = datetime(2026, 1, 1)
+
+# Field rank (1-based) at which each category ends: 1 = favourites, 5 = longshots
+CATEGORY_BOUNDS = ((10, 1), (30, 2), (60, 3), (100, 4), (FIELD_SIZE, 5))
+
+
+def player_category(rank: int) -> int:
+    """Category of the player ranked `rank` in the field"""
+    for last_rank, category in CATEGORY_BOUNDS:
+        if rank <= last_rank:
+            return category
+    return CATEGORY_BOUNDS[-1][1]
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    """Group rows into lists of at most `size`"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def insert_rows(conn, model, rows: Iterable[dict], batch_size: int) -> int:
+    """Insert rows with one executemany per batch and return how many were written"""
+    written = 0
+    for batch in batched(rows, batch_size):
+        conn.execute(insert(model.__table__), batch)
+        written += len(batch)
+    return written
+
+
+def next_id(conn, model) -> int:
+    """First free primary key of a table"""
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def table_is_empty(conn, model) -> bool:
+    return conn.execute(select(model.id).limit(1)).first() is None
+
+
+def field_rows(rng: random.Random):
+    """Players of the field and their odds for every mock tournament"""
+    known = {player["id"]: player for player in MOCK_PLAYERS}
+    players = []
+    for rank in range(1, FIELD_SIZE + 1):
+        player = known.get(rank, {})
+        players.append({
+            "id": rank,
+            "name": player.get("name", f"Field Player {rank:03d}"),
+            "country": player.get("country", rng.choice(("USA", "England", "Spain", "Japan", "Australia"))),
+            "world_ranking": rank,
+            "created_at": BASE_TIME,
+            "updated_at": BASE_TIME,
+        })
+
+    odds = []
+    for tournament in MOCK_TOURNAMENTS:
+        for rank in range(1, FIELD_SIZE + 1):
+            odds.append({
+                "player_id": rank,
+                "tournament_id": tournament["id"],
+                "category": player_category(rank),
+                "odds": round(4.0 + rank * rank * 0.08 * rng.uniform(0.8, 1.2), 1),
+                "created_at": BASE_TIME,
+                "updated_at": BASE_TIME,
+            })
+    return players, odds
+
+
+def seed_reference_data(conn, rng: random.Random, batch_size: int) -> Dict[str, int]:
+    """Write tournaments, the field and its odds into empty tables"""
+    counts = {"tournaments": 0, "players": 0, "player_odds": 0}
+    if table_is_empty(conn, Tournament):
+        counts["tournaments"] = insert_rows(conn, Tournament, (
+            {
+                "id": tournament["id"],
+                "name": tournament["name"],
+                "location": tournament["location"],
+                "start_date": tournament["start_date"],
+                "end_date": tournament["end_date"],
+                "status": tournament["status"],
+                "created_at": BASE_TIME,
+                "updated_at": BASE_TIME,
+            }
+            for tournament in MOCK_TOURNAMENTS
+        ), batch_size)
+
+    players, odds = field_rows(rng)
+    if table_is_empty(conn, Player):
+        counts["players"] = insert_rows(conn, Player, players, batch_size)
+    if table_is_empty(conn, PlayerOdds):
+        counts["player_odds"] = insert_rows(conn, PlayerOdds, odds, batch_size)
+    return counts
+
+
+def user_rows(first_id: int, count: int, hashed_password: str) -> Iterator[dict]:
+    for user_id in range(first_id, first_id + count):
+        created_at = BASE_TIME + timedelta(seconds=user_id)
+        yield {
+            "id": user_id,
+            "email": f"seed{user_id}@example.com",
+            "username": f"seed{user_id}",
+            "hashed_password": hashed_password,
+            "full_name": f"Seed User {user_id}",
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+class LeagueChunk:
+    """Rows for a run of consecutive leagues, generated parents first"""
+
+    def __init__(self):
+        self.leagues: List[dict] = []
+        self.leaderboards: List[dict] = []
+        self.entries: List[dict] = []
+        self.teams: List[dict] = []
+        self.picks: List[dict] = []
+
+
+def generate_league_chunk(rng, league_ids, ids: Dict[str, int], user_ids: range, entries_per_league) -> LeagueChunk:
+    """Generate leagues with their leaderboard, members' entries, teams and picks"""
+    chunk = LeagueChunk()
+    tournament_ids = [tournament["id"] for tournament in MOCK_TOURNAMENTS]
+    field = [(rank, player_category(rank)) for rank in range(1, FIELD_SIZE + 1)]
+
+    for league_id in league_ids:
+        size = entries_per_league(league_id)
+        members = rng.sample(user_ids, size) if size else [rng.choice(user_ids)]
+        entry_fee = rng.choice(ENTRY_FEES)
+        created_at = BASE_TIME + timedelta(minutes=league_id)
+        chunk.leagues.append({
+            "id": league_id,
+            "name": f"Seed League {league_id}",
+            "creator_id": members[0],
+            "tournament_id": rng.choice(tournament_ids),
+            "entry_fee": entry_fee,
+            "invitation_code": f"S{league_id:07d}",
+            "status": LeagueStatus.OPEN,
+            "max_participants": max(50, size),
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+
+        prize_pool = 0.0
+        for user_id in members[:size]:
+            paid = rng.random() < PAID_RATIO
+            amount_paid = round(entry_fee * (1 - STRIPE_FEE_RATE), 2) if paid else 0.0
+            prize_pool += amount_paid
+            entry_id = ids["entries"]
+            ids["entries"] += 1
+            chunk.entries.append({
+                "id": entry_id,
+                "user_id": user_id,
+                "league_id": league_id,
+                "payment_status": PaymentStatus.PAID if paid else PaymentStatus.PENDING,
+                "amount_paid": amount_paid,
+                "total_score": round(rng.uniform(0, 300), 1),
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            if not paid:
+                continue
+
+            team_id = ids["teams"]
+            ids["teams"] += 1
+            picks = rng.sample(field, PICKS_PER_TEAM)
+            total = sum(category for _, category in picks)
+            chunk.teams.append({
+                "id": team_id,
+                "entry_id": entry_id,
+                "is_valid": total >= 13,
+                "total_category_points": total,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            for player_id, category in picks:
+                chunk.picks.append({
+                    "id": ids["picks"],
+                    "team_id": team_id,
+                    "player_id": player_id,
+                    "player_category": category,
+                    "player_score": 0.0,
+                    "created_at": created_at,
+                })
+                ids["picks"] += 1
+
+        prize_pool = round_money(prize_pool)
+        chunk.leaderboards.append({
+            "id": ids["leaderboards"],
+            "league_id": league_id,
+            "rankings": None,
+            "prize_pool": prize_pool,
+            "first_place_prize": round_money(prize_pool * 0.60),
+            "second_place_prize": round_money(prize_pool * 0.30),
+            "third_place_prize": round_money(prize_pool * 0.10),
+            "last_updated": created_at,
+        })
+        ids["leaderboards"] += 1
+    return chunk
+
+
+def seed(
+    engine,
+    users: int,
+    leagues: int,
+    entries: int,
+    seed_value: int = 42,
+    batch_size: int = 10000,
+    leagues_per_chunk: int = 1000,
+    progress=None,
+) -> Dict[str, int]:
+    """Write a deterministic dataset and return the number of rows per table"""
+    if leagues and entries and entries // leagues + (entries % leagues > 0) > users:
+        raise ValueError("Not enough users for the requested entries per league")
+
+    rng = random.Random(seed_value)
+    counts: Dict[str, int] = {}
+    with engine.begin() as conn:
+        counts.update(seed_reference_data(conn, rng, batch_size))
+        first_user = next_id(conn, User)
+        first_league = next_id(conn, League)
+        ids = {
+            "entries": next_id(conn, Entry),
+            "teams": next_id(conn, Team),
+            "picks": next_id(conn, TeamPick),
+            "leaderboards": next_id(conn, Leaderboard),
+        }
+
+    # One bcrypt hash shared by every seeded user; hashing millions would take days
+    hashed_password = bcrypt.using(salt=SEED_PASSWORD_SALT, rounds=12).hash(SEED_PASSWORD)
+    counts["users"] = 0
+    for batch in batched(user_rows(first_user, users, hashed_password), batch_size * 10):
+        with engine.begin() as conn:
+            counts["users"] += insert_rows(conn, User, batch, batch_size)
+        if progress:
+            progress("users", counts["users"])
+
+    # Spread entries evenly; the first `remainder` leagues get one extra member
+    per_league, remainder = divmod(entries, leagues) if leagues else (0, 0)
+    user_ids = range(first_user, first_user + users)
+
+    def entries_per_league(league_id):
+        return per_league + (league_id - first_league < remainder)
+
+    for name in ("leagues", "leaderboards", "entries", "teams", "team_picks"):
+        counts[name] = 0
+    for start in range(first_league, first_league + leagues, leagues_per_chunk):
+        league_ids = range(start, min(start + leagues_per_chunk, first_league + leagues))
+        chunk = generate_league_chunk(rng, league_ids, ids, user_ids, entries_per_league)
+        with engine.begin() as conn:
+            counts["leagues"] += insert_rows(conn, League, chunk.leagues, batch_size)
+            counts["leaderboards"] += insert_rows(conn, Leaderboard, chunk.leaderboards, batch_size)
+            counts["entries"] += insert_rows(conn, Entry, chunk.entries, batch_size)
+            counts["teams"] += insert_rows(conn, Team, chunk.teams, batch_size)
+            counts["team_picks"] += insert_rows(conn, TeamPick, chunk.picks, batch_size)
+        if progress:
+            progress("leagues", counts["leagues"])
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the database with a deterministic synthetic dataset")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--leagues", type=int, default=100_000)
+    parser.add_argument("--entries", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same rows")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per executemany")
+    parser.add_argument("--create-schema", action="store_true", help="Create missing tables first")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    configure_engine(engine)
+    if args.create_schema:
+        Base.metadata.create_all(bind=engine)
+
+    started_at = time.perf_counter()
+
+    def progress(table, written):
+        print(f"\r{table}: {written:,} rows ({time.perf_counter() - started_at:.0f}s)", end="", flush=True)
+
+    counts = seed(engine, args.users, args.leagues, args.entries, args.seed, args.batch_size, progress=progress)
+    elapsed = time.perf_counter() - started_at
+    total = sum(counts.values())
+    print()
+    for table, written in counts.items():
+        print(f"{table:>14}: {written:,}")
+    print(f"{total:,} rows in {elapsed:.1f}s ({total / elapsed * 60:,.0f} rows/min)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,115 @@
+import time
+
+BOOT_STARTED_AT = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import engine, Base
-from app.routers import users, tournaments, players, leagues, entries, teams, leaderboard, payments
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Initialize FastAPI app
-app = FastAPI(
-    title="Fantasy Golf API",
-    description="API for Fantasy Golf application",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],  # React default port
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(users.router, prefix="/api")
-app.include_router(tournaments.router, prefix="/api")
-app.include_router(players.router, prefix="/api")
-app.include_router(leagues.router, prefix="/api")
-app.include_router(entries.router, prefix="/api")
-app.include_router(teams.router, prefix="/api")
-app.include_router(leaderboard.router, prefix="/api")
-app.include_router(payments.router, prefix="/api")
-
-@app.get("/")
-async def root():
-    return {"message": "Welcome to Fantasy Golf API"}
-
-@app.get("/api/health")
-async def health_check():
-    return {"status": "healthy"}
+from app.compression import CompressionMiddleware
+from app.config import CREATE_SCHEMA_ON_STARTUP, STARTUP_BUDGET_SECONDS
+from app.database import async_engine, read_async_engine, engine, Base
+from app.instrumentation import QueryStatsMiddleware, route_query_stats
+from app.metrics import MetricsMiddleware, mark_process_dead, metrics_endpoint
+from app.password_hasher import password_hasher
+from app.responses import FastJSONResponse
+from app.services.stripe_service import stripe_gateway
+from app.services.webhook_processor import webhook_processor
+from app.routers import users, tournaments, players, leagues, entries, teams, leaderboard, payments, batch
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize resources when the worker starts serving and release them on shutdown"""
+    if CREATE_SCHEMA_ON_STARTUP:
+        # Create database tables (production schemas are managed with `alembic upgrade head`)
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    if app.state.startup_seconds is None:
+        app.state.startup_seconds = round(time.perf_counter() - app.state.started_at, 4)
+        if app.state.startup_seconds > STARTUP_BUDGET_SECONDS:
+            logger.warning(
+                f"Startup took {app.state.startup_seconds}s, over the {STARTUP_BUDGET_SECONDS}s budget"
+            )
+        else:
+            logger.info(f"Startup took {app.state.startup_seconds}s")
+
+    # Background workers draining the webhook outbox
+    await webhook_processor.start()
+
+    yield
+
+    await webhook_processor.stop()
+    await stripe_gateway.close()
+    password_hasher.shutdown()
+    mark_process_dead()
+    await async_engine.dispose()
+    await read_async_engine.dispose()
+    engine.dispose()
+
+
+def create_app(started_at: Optional[float] = None) -> FastAPI:
+    """Build the FastAPI application; startup time is measured from `started_at`"""
+    app = FastAPI(
+        title="Fantasy Golf API",
+        description="API for Fantasy Golf application",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
+    app.state.started_at = time.perf_counter() if started_at is None else started_at
+    app.state.startup_seconds = None
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],  # React default port
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["Server-Timing"],
+    )
+
+    # gzip (or brotli/zstd when installed) for JSON and text above COMPRESSION_MIN_SIZE_BYTES
+    app.add_middleware(CompressionMiddleware)
+
+    # Query count and DB time per request
+    app.add_middleware(QueryStatsMiddleware)
+
+    # Prometheus metrics, scraped from /metrics
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+    # Include routers
+    app.include_router(users.router, prefix="/api")
+    app.include_router(tournaments.router, prefix="/api")
+    app.include_router(players.router, prefix="/api")
+    app.include_router(leagues.router, prefix="/api")
+    app.include_router(entries.router, prefix="/api")
+    app.include_router(teams.router, prefix="/api")
+    app.include_router(leaderboard.router, prefix="/api")
+    app.include_router(payments.router, prefix="/api")
+    app.include_router(batch.router, prefix="/api")
+
+    @app.get("/")
+    async def root():
+        return {"message": "Welcome to Fantasy Golf API"}
+
+    @app.get("/api/health")
+    async def health_check():
+        return {
+            "status": "healthy",
+            "startup_seconds": app.state.startup_seconds,
+            "password_hasher": password_hasher.metrics(),
+            "queries": route_query_stats.snapshot(),
+        }
+
+    return app
+
+
+# Startup is measured from the first import of this module, so it includes loading the app
+app = create_app(started_at=BOOT_STARTED_AT)
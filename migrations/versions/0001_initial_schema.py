@@ -0,0 +1,177 @@
+"""Initial schema
+
+Matches the tables previously created by Base.metadata.create_all. Databases
+created that way can be adopted with `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+tournament_status = sa.Enum("UPCOMING", "IN_PROGRESS", "COMPLETED", name="tournamentstatus")
+league_status = sa.Enum("OPEN", "CLOSED", "IN_PROGRESS", "COMPLETED", name="leaguestatus")
+payment_status = sa.Enum("PENDING", "PAID", "REFUNDED", name="paymentstatus")
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "tournaments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("location", sa.String(), nullable=True),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("end_date", sa.DateTime(), nullable=False),
+        sa.Column("status", tournament_status, nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_tournaments_id", "tournaments", ["id"])
+
+    op.create_table(
+        "players",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("country", sa.String(), nullable=True),
+        sa.Column("world_ranking", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_players_id", "players", ["id"])
+    op.create_index("ix_players_name", "players", ["name"])
+
+    op.create_table(
+        "player_odds",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("tournament_id", sa.Integer(), nullable=False),
+        sa.Column("category", sa.Integer(), nullable=False),
+        sa.Column("odds", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["player_id"], ["players.id"]),
+        sa.ForeignKeyConstraint(["tournament_id"], ["tournaments.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("player_id", "tournament_id", name="_player_tournament_uc"),
+    )
+    op.create_index("ix_player_odds_id", "player_odds", ["id"])
+
+    op.create_table(
+        "leagues",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("creator_id", sa.Integer(), nullable=False),
+        sa.Column("tournament_id", sa.Integer(), nullable=False),
+        sa.Column("entry_fee", sa.Float(), nullable=False),
+        sa.Column("invitation_code", sa.String(), nullable=False),
+        sa.Column("status", league_status, nullable=True),
+        sa.Column("max_participants", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["creator_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["tournament_id"], ["tournaments.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_leagues_id", "leagues", ["id"])
+    op.create_index("ix_leagues_invitation_code", "leagues", ["invitation_code"], unique=True)
+
+    op.create_table(
+        "entries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("league_id", sa.Integer(), nullable=False),
+        sa.Column("payment_status", payment_status, nullable=True),
+        sa.Column("amount_paid", sa.Float(), nullable=True),
+        sa.Column("total_score", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["league_id"], ["leagues.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "league_id", name="_user_league_uc"),
+    )
+    op.create_index("ix_entries_id", "entries", ["id"])
+
+    op.create_table(
+        "leaderboards",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("league_id", sa.Integer(), nullable=False),
+        sa.Column("rankings", sa.JSON(), nullable=True),
+        sa.Column("prize_pool", sa.Float(), nullable=True),
+        sa.Column("first_place_prize", sa.Float(), nullable=True),
+        sa.Column("second_place_prize", sa.Float(), nullable=True),
+        sa.Column("third_place_prize", sa.Float(), nullable=True),
+        sa.Column("last_updated", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["league_id"], ["leagues.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("league_id"),
+    )
+    op.create_index("ix_leaderboards_id", "leaderboards", ["id"])
+
+    op.create_table(
+        "teams",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("entry_id", sa.Integer(), nullable=False),
+        sa.Column("is_valid", sa.Boolean(), nullable=True),
+        sa.Column("total_category_points", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["entry_id"], ["entries.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("entry_id"),
+    )
+    op.create_index("ix_teams_id", "teams", ["id"])
+
+    op.create_table(
+        "team_picks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("team_id", sa.Integer(), nullable=False),
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("player_category", sa.Integer(), nullable=False),
+        sa.Column("player_score", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["player_id"], ["players.id"]),
+        sa.ForeignKeyConstraint(["team_id"], ["teams.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("team_id", "player_id", name="_team_player_uc"),
+    )
+    op.create_index("ix_team_picks_id", "team_picks", ["id"])
+
+
+def downgrade():
+    op.drop_table("team_picks")
+    op.drop_table("teams")
+    op.drop_table("leaderboards")
+    op.drop_table("entries")
+    op.drop_table("leagues")
+    op.drop_table("player_odds")
+    op.drop_table("players")
+    op.drop_table("tournaments")
+    op.drop_table("users")
+    payment_status.drop(op.get_bind(), checkfirst=True)
+    league_status.drop(op.get_bind(), checkfirst=True)
+    tournament_status.drop(op.get_bind(), checkfirst=True)
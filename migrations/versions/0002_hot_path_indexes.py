@@ -0,0 +1,33 @@
+"""Hot-path indexes
+
+- entries(league_id, total_score): league entry lists, leaderboards and the
+  dashboard fingerprint search by league and read scores from the index.
+- player_odds(tournament_id, category): the odds board filters on both.
+- leagues(creator_id): "my leagues" looks up leagues by creator.
+
+entries.user_id, teams.entry_id and team_picks.team_id are already the leading
+columns of their unique constraints, so they need no extra index.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_entries_league_id_total_score", "entries", ["league_id", "total_score"])
+    op.create_index("ix_player_odds_tournament_id_category", "player_odds", ["tournament_id", "category"])
+    op.create_index("ix_leagues_creator_id", "leagues", ["creator_id"])
+
+
+def downgrade():
+    op.drop_index("ix_leagues_creator_id", table_name="leagues")
+    op.drop_index("ix_player_odds_tournament_id_category", table_name="player_odds")
+    op.drop_index("ix_entries_league_id_total_score", table_name="entries")
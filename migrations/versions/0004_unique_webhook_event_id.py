@@ -0,0 +1,31 @@
+"""Unique webhook event ids
+
+Stripe retries deliveries, so the same event can reach the webhook several
+times. A unique index on event_id makes storing an event idempotent;
+duplicates already stored by 0003 are removed first, keeping the oldest copy.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "DELETE FROM webhook_events WHERE id NOT IN "
+        "(SELECT MIN(id) FROM webhook_events GROUP BY event_id)"
+    )
+    op.drop_index("ix_webhook_events_event_id", table_name="webhook_events")
+    op.create_index("ix_webhook_events_event_id", "webhook_events", ["event_id"], unique=True)
+
+
+def downgrade():
+    op.drop_index("ix_webhook_events_event_id", table_name="webhook_events")
+    op.create_index("ix_webhook_events_event_id", "webhook_events", ["event_id"])
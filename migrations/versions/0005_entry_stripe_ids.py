@@ -0,0 +1,34 @@
+"""Stripe ids on entries
+
+Entries keep their checkout session and payment intent ids, so webhook events
+(charge.updated in particular) find their entry with an index lookup instead
+of a Stripe API call.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("entries") as batch_op:
+        batch_op.add_column(sa.Column("stripe_checkout_session_id", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("stripe_payment_intent_id", sa.String(), nullable=True))
+    op.create_index("ix_entries_stripe_checkout_session_id", "entries", ["stripe_checkout_session_id"])
+    op.create_index("ix_entries_stripe_payment_intent_id", "entries", ["stripe_payment_intent_id"])
+
+
+def downgrade():
+    op.drop_index("ix_entries_stripe_payment_intent_id", table_name="entries")
+    op.drop_index("ix_entries_stripe_checkout_session_id", table_name="entries")
+    with op.batch_alter_table("entries") as batch_op:
+        batch_op.drop_column("stripe_payment_intent_id")
+        batch_op.drop_column("stripe_checkout_session_id")
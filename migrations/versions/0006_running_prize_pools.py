@@ -0,0 +1,36 @@
+"""Running prize pools
+
+Prize pools become running totals, adjusted by payment processing whenever an
+entry's amount_paid changes, instead of being re-summed on every leaderboard
+read. This recomputes every pool once so the running totals start out right.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "UPDATE leaderboards SET prize_pool = ROUND(CAST(("
+        "SELECT COALESCE(SUM(entries.amount_paid), 0) FROM entries "
+        "WHERE entries.league_id = leaderboards.league_id) AS NUMERIC), 2)"
+    )
+    op.execute(
+        "UPDATE leaderboards SET "
+        "first_place_prize = ROUND(CAST(prize_pool * 0.6 AS NUMERIC), 2), "
+        "second_place_prize = ROUND(CAST(prize_pool * 0.3 AS NUMERIC), 2), "
+        "third_place_prize = ROUND(CAST(prize_pool * 0.1 AS NUMERIC), 2)"
+    )
+
+
+def downgrade():
+    # Pools were recomputed in place; there is nothing to undo
+    pass
@@ -1,10 +1,29 @@
+import os
+
+# Tests build their own schema; keep the app from creating tables in the dev database
+os.environ["CREATE_SCHEMA_ON_STARTUP"] = "false"
+# Fail any request that runs more queries than its route's budget
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+# Webhooks are verified for real; tests drain the outbox explicitly instead of running workers
+os.environ["STRIPE_WEBHOOK_SECRET"] = "whsec_test"
+os.environ["WEBHOOK_WORKERS"] = "0"
+# Stripe API calls are served by the in-memory stand-in
+os.environ["STRIPE_BACKEND"] = "local"
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from sqlalchemy.pool import NullPool
+from app.database import Base, get_db, get_read_db, get_session_factory
 from app.models import User, League, Entry, Team, Leaderboard
-from app.auth import get_password_hash, create_access_token
+from app.auth import get_password_hash, create_access_token, principal_cache, token_cache, revoked_tokens
+from app.routers.payments import seen_webhook_events
+from app.routers.players import odds_payloads
+from app.services.leaderboard_service import completed_leaderboards
+from app.services.stripe_standin import LocalStripe
+from app.services.webhook_processor import WebhookProcessor
 from main import app
 
 # Create test database
@@ -15,6 +34,35 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The app talks to the same file through the async driver. NullPool keeps
+# connections from outliving the event loop of each TestClient.
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Ids are reused across tests, so cached principals, payloads and seen webhook events must not leak between them"""
+    principal_cache.clear()
+    token_cache.clear()
+    revoked_tokens.clear()
+    seen_webhook_events.clear()
+    odds_payloads.clear()
+    completed_leaderboards.clear()
+    yield
+    principal_cache.clear()
+    token_cache.clear()
+    revoked_tokens.clear()
+    seen_webhook_events.clear()
+    odds_payloads.clear()
+    completed_leaderboards.clear()
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -31,18 +79,69 @@ def db_session():
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with test database"""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingAsyncSessionLocal
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def async_session_factory(db_session):
+    """Async sessions on the test database, for code that runs outside a request"""
+    return TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def local_stripe():
+    """In-memory Stripe stand-in for payment processing"""
+    return LocalStripe()
+
+
+@pytest.fixture
+def webhook_processor(db_session, local_stripe):
+    """Outbox processor bound to the test database and the Stripe stand-in"""
+    return WebhookProcessor(session_factory=TestingAsyncSessionLocal, gateway=local_stripe, workers=2, poll_interval=0.05)
+
+
+@pytest.fixture
+def app_statements():
+    """Collect the SQL statements the app runs while the fixture is active"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def app_connections():
+    """Number of connections the app currently has checked out of the test engine"""
+    in_use = 0
+
+    def checkout(*args):
+        nonlocal in_use
+        in_use += 1
+
+    def checkin(*args):
+        nonlocal in_use
+        in_use -= 1
+
+    event.listen(async_engine.sync_engine, "checkout", checkout)
+    event.listen(async_engine.sync_engine, "checkin", checkin)
+    yield lambda: in_use
+    event.remove(async_engine.sync_engine, "checkout", checkout)
+    event.remove(async_engine.sync_engine, "checkin", checkin)
+
+
 @pytest.fixture
 def test_user(db_session):
     """Create a test user"""
@@ -0,0 +1,56 @@
+import asyncio
+import subprocess
+import sys
+import typing
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+from main import create_app
+
+
+def sync_session_parameters(dependant) -> list:
+    """Parameters annotated with a sync Session, in a dependant and its sub-dependencies"""
+    found = []
+    if dependant.call is not None:
+        name = getattr(dependant.call, "__qualname__", repr(dependant.call))
+        for parameter, hint in typing.get_type_hints(dependant.call).items():
+            if isinstance(hint, type) and issubclass(hint, Session):
+                found.append(f"{name}({parameter})")
+    for dependency in dependant.dependencies:
+        found += sync_session_parameters(dependency)
+    return found
+
+
+class TestAppStartup:
+    def test_import_does_not_load_stripe(self):
+        """Test that importing the app leaves the Stripe SDK unloaded until first use"""
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, main; print('stripe' in sys.modules)"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == "False"
+
+    def test_startup_time_recorded(self, client):
+        """Test that the lifespan records how long the worker took to start"""
+        response = client.get("/api/health")
+        assert response.status_code == 200
+        assert response.json()["startup_seconds"] >= 0
+
+    def test_create_app_returns_independent_apps(self):
+        """Test that the factory builds a fresh application on each call"""
+        first = create_app()
+        second = create_app()
+        assert first is not second
+        assert first.state.startup_seconds is None
+        assert any(route.path == "/api/health" for route in first.routes)
+
+
+class TestRouteSessions:
+    def test_async_routes_do_not_use_sync_session(self):
+        """Test that no coroutine route depends on a blocking sync Session (it would stall the event loop)"""
+        offending = []
+        for route in create_app().routes:
+            if isinstance(route, APIRoute) and asyncio.iscoroutinefunction(route.endpoint):
+                offending += [f"{route.path}: {name}" for name in sync_session_parameters(route.dependant)]
+        assert offending == []
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
+import pytest
+from fastapi import HTTPException
+from app.auth import (
+    create_access_token,
+    decode_token,
+    get_password_hash_async,
+    revoke_token,
+    revoked_tokens,
+    token_cache,
+    verify_password_async,
+)
+from app.password_hasher import PasswordHasher
+
+
+class TestPasswordHasher:
+    def test_hash_and_verify_off_loop(self):
+        """Test hashing and verifying a password through the dedicated pool"""
+        async def roundtrip():
+            hashed = await get_password_hash_async("secret123")
+            return await verify_password_async("secret123", hashed), await verify_password_async("wrong", hashed)
+
+        assert asyncio.run(roundtrip()) == (True, False)
+
+    def test_metrics_track_completed_hashes(self):
+        """Test that completed hashes and latency are recorded"""
+        hasher = PasswordHasher(max_workers=1, max_queue=1, timeout=5)
+        try:
+            asyncio.run(hasher.run(sum, [1, 2]))
+            metrics = hasher.metrics()
+            assert metrics["completed"] == 1
+            assert metrics["queue_depth"] == 0
+            assert metrics["running"] == 0
+        finally:
+            hasher.shutdown()
+
+    def test_rejects_when_queue_full(self):
+        """Test that requests beyond workers + queue fail fast with 503"""
+        hasher = PasswordHasher(max_workers=1, max_queue=1, timeout=5)
+        release = threading.Event()
+
+        async def burst():
+            running = asyncio.ensure_future(hasher.run(release.wait))
+            queued = asyncio.ensure_future(hasher.run(release.wait))
+            await asyncio.sleep(0.05)
+            assert hasher.metrics()["queue_depth"] == 1
+            with pytest.raises(HTTPException) as exc_info:
+                await hasher.run(release.wait)
+            release.set()
+            await asyncio.gather(running, queued)
+            return exc_info.value
+
+        try:
+            error = asyncio.run(burst())
+            assert error.status_code == 503
+            assert hasher.metrics()["rejected"] == 1
+        finally:
+            release.set()
+            hasher.shutdown()
+
+    def test_times_out_slow_hash(self):
+        """Test that a hash waiting longer than the timeout fails with 503"""
+        hasher = PasswordHasher(max_workers=1, max_queue=1, timeout=0.05)
+        release = threading.Event()
+        try:
+            with pytest.raises(HTTPException) as exc_info:
+                asyncio.run(hasher.run(release.wait))
+            assert exc_info.value.status_code == 503
+            assert hasher.metrics()["timeouts"] == 1
+        finally:
+            release.set()
+            hasher.shutdown()
+
+
+class TestTokenCache:
+    def test_decode_caches_verified_payload(self, test_user):
+        """Test that a decoded token is served from the cache on reuse"""
+        token = create_access_token(data={"sub": str(test_user.id)})
+        first = decode_token(token)
+        hits = token_cache.hits
+
+        with patch("app.auth.jwt.decode") as jwt_decode:
+            second = decode_token(token)
+            jwt_decode.assert_not_called()
+
+        assert second == first
+        assert token_cache.hits == hits + 1
+
+    def test_invalid_token_not_cached(self):
+        """Test that tokens failing verification are never cached"""
+        with pytest.raises(HTTPException):
+            decode_token("invalid_token")
+        assert len(token_cache) == 0
+
+    def test_cached_token_expires_with_exp(self, test_user):
+        """Test that a cached payload is kept only until the token's exp"""
+        token = create_access_token(data={"sub": str(test_user.id)}, expires_delta=timedelta(seconds=1))
+        decode_token(token)
+        assert token_cache.get(token) is not None
+
+        # exp has one-second resolution, so wait until it has certainly passed
+        time.sleep(2.1)
+        assert token_cache.get(token) is None
+        with pytest.raises(HTTPException):
+            decode_token(token)
+
+    def test_revoked_token_rejected_on_cache_hit(self, client, auth_token, auth_headers):
+        """Test that revocation applies even when the payload is cached"""
+        assert client.get("/api/users/me", headers=auth_headers).status_code == 200
+        decode_token(auth_token)
+
+        revoke_token(auth_token)
+        with pytest.raises(HTTPException) as exc_info:
+            decode_token(auth_token)
+        assert exc_info.value.status_code == 401
+        assert client.get("/api/users/me", headers=auth_headers).status_code == 401
+
+    def test_revocation_kept_until_exp(self, test_user):
+        """Test that a revoked token is tracked only until its exp"""
+        token = create_access_token(data={"sub": str(test_user.id)}, expires_delta=timedelta(seconds=1))
+        revoke_token(token)
+        assert revoked_tokens.get(token) is not None
+
+        time.sleep(2.1)
+        assert revoked_tokens.get(token) is None
+        assert len(revoked_tokens) == 0
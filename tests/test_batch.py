@@ -0,0 +1,125 @@
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app import auth
+from app.database import get_db, get_read_db
+from app.routers import batch as batch_router
+from main import app
+
+
+class TestBatch:
+    def test_app_open_calls(self, client, test_user, test_entry, test_league, auth_headers):
+        """Test that a batch returns every sub-response in request order"""
+        response = client.post("/api/batch", headers=auth_headers, json={"requests": [
+            {"path": "/api/users/me"},
+            {"path": "/api/entries/my-entries?fields=id"},
+            {"path": "/api/leagues"},
+            {"path": f"/api/leaderboard/{test_league.id}?fields=league_id"},
+        ]})
+        assert response.status_code == 200
+        responses = response.json()["responses"]
+        assert [r["status"] for r in responses] == [200, 200, 200, 200]
+        assert responses[0]["body"]["id"] == test_user.id
+        assert responses[1]["body"] == [{"id": test_entry.id}]
+        assert responses[3]["body"] == {"league_id": test_league.id}
+
+    def test_sub_request_errors_are_per_item(self, client, auth_headers):
+        """Test that failing sub-requests report their own status without failing the batch"""
+        response = client.post("/api/batch", headers=auth_headers, json={"requests": [
+            {"path": "/api/entries/99999"},
+            {"path": "/api/unknown"},
+            {"path": "/api/tournaments"},
+        ]})
+        assert response.status_code == 200
+        statuses = [r["status"] for r in response.json()["responses"]]
+        assert statuses == [404, 404, 200]
+
+    def test_writes_run_in_order(self, client, test_entry, auth_headers):
+        """Test that a write is applied before the GETs that follow it"""
+        response = client.post("/api/batch", headers=auth_headers, json={"requests": [
+            {"method": "PATCH", "path": f"/api/entries/{test_entry.id}", "body": {"total_score": 71.5}},
+            {"path": f"/api/entries/{test_entry.id}?fields=total_score"},
+        ]})
+        responses = response.json()["responses"]
+        assert responses[0]["status"] == 200
+        assert responses[1]["body"] == {"total_score": 71.5}
+
+    def test_sub_requests_use_batch_principal(self, client, auth_headers, monkeypatch):
+        """Test that the caller is authenticated once for the whole batch"""
+        decoded = []
+        original = auth.decode_token
+
+        def counting_decode(token):
+            decoded.append(token)
+            return original(token)
+
+        monkeypatch.setattr(auth, "decode_token", counting_decode)
+        response = client.post("/api/batch", headers=auth_headers, json={"requests": [
+            {"path": "/api/users/me"},
+            {"path": "/api/entries/my-entries"},
+            {"path": "/api/leagues"},
+        ]})
+        assert response.status_code == 200
+        assert len(decoded) == 1
+
+    def test_gets_run_concurrently(self, client, auth_headers, monkeypatch):
+        """Test that consecutive GETs overlap, bounded by the concurrency limit"""
+        running = 0
+        peak = 0
+        original = batch_router.run_sub_request
+
+        async def tracking_run(app, scope, body):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            try:
+                return await original(app, scope, body)
+            finally:
+                running -= 1
+
+        monkeypatch.setattr(batch_router, "run_sub_request", tracking_run)
+        monkeypatch.setattr(batch_router, "BATCH_MAX_CONCURRENCY", 2)
+        response = client.post("/api/batch", headers=auth_headers, json={"requests": [
+            {"path": "/api/tournaments"} for _ in range(5)
+        ]})
+        assert response.status_code == 200
+        assert peak == 2
+
+    def test_pool_smaller_than_concurrency(self, client, test_entry, auth_headers, monkeypatch):
+        """Test that a batch does not hold a connection of its own while sub-requests wait for one"""
+        engine = create_async_engine(
+            "sqlite+aiosqlite:///./test.db",
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=2,
+        )
+        session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def single_connection_db():
+            async with session_factory() as session:
+                yield session
+
+        monkeypatch.setitem(app.dependency_overrides, get_db, single_connection_db)
+        monkeypatch.setitem(app.dependency_overrides, get_read_db, single_connection_db)
+        monkeypatch.setattr(batch_router, "BATCH_MAX_CONCURRENCY", 4)
+        try:
+            response = client.post("/api/batch", headers=auth_headers, json={"requests": [
+                {"path": f"/api/entries/{test_entry.id}"} for _ in range(4)
+            ]})
+        finally:
+            asyncio.run(engine.dispose())
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()["responses"]] == [200] * 4
+
+    def test_requires_authentication(self, client):
+        """Test that batches need a bearer token"""
+        response = client.post("/api/batch", json={"requests": [{"path": "/api/tournaments"}]})
+        assert response.status_code == 403
+
+    def test_invalid_batches_rejected(self, client, auth_headers):
+        """Test that nested batches, foreign paths and empty batches are rejected"""
+        for requests in ([{"path": "/api/batch"}], [{"path": "http://example.com/"}], []):
+            response = client.post("/api/batch", headers=auth_headers, json={"requests": requests})
+            assert response.status_code == 422
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from benchmarks.load import Dataset, run
+from benchmarks.micro import BENCHMARKS, fit_exponent, measure
+from benchmarks.report import compare_results, latency_summary, percentile, write_results
+from main import app
+
+
+class TestReport:
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles on a sorted sample"""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+        assert percentile([], 50) == 0.0
+
+    def test_latency_summary(self):
+        """Test throughput and millisecond percentiles of timed operations"""
+        summary = latency_summary([0.001] * 98 + [0.5, 1.0], elapsed=2.0)
+        assert summary["requests"] == 100
+        assert summary["rps"] == 50.0
+        assert summary["p50_ms"] == 1.0
+        assert summary["p99_ms"] == 500.0
+        assert summary["max_ms"] == 1000.0
+
+    def test_results_round_trip_and_compare(self, tmp_path):
+        """Test that saved results are JSON and can be compared across runs"""
+        old = write_results("load", {"odds_board": {"rps": 100.0}}, {"concurrency": 4}, output_dir=tmp_path / "a")
+        new = write_results("load", {"odds_board": {"rps": 150.0}}, {"concurrency": 4}, output_dir=tmp_path / "b")
+
+        document = json.loads(new.read_text())
+        assert document["kind"] == "load"
+        assert document["config"] == {"concurrency": 4}
+
+        lines = compare_results(old, new, metrics=("rps",))
+        assert "+50.0%" in lines[1]
+
+
+class TestLoadHarness:
+    def test_runs_catalog_scenario(self, client):
+        """Test that the harness drives the app concurrently and reports every request"""
+        results = asyncio.run(run(app, ["odds_board"], Dataset(), concurrency=4, requests=40))
+
+        summary = results["odds_board"]
+        assert summary["requests"] == 40
+        assert summary["statuses"] == {"200": 40}
+        assert summary["errors"] == 0
+        assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+
+    def test_runs_leaderboard_polling(self, client, test_user, test_league, test_team):
+        """Test the authenticated polling scenario against fixture data"""
+        dataset = Dataset(teams=[(test_team.id, test_team.entry_id, test_user.id, test_league.id)])
+        results = asyncio.run(run(app, ["leaderboard_polling"], dataset, concurrency=2, requests=10))
+        assert results["leaderboard_polling"]["statuses"] == {"200": 10}
+
+
+class TestMicroBenchmarks:
+    def test_fit_exponent(self):
+        """Test that the fitted exponent recovers linear and quadratic growth"""
+        sizes = (1_000, 10_000, 100_000)
+        assert fit_exponent([(n, n * 1e-7) for n in sizes]) == 1.0
+        assert fit_exponent([(n, n * n * 1e-9) for n in sizes]) == 2.0
+        assert fit_exponent([(1_000, 0.1)]) is None
+
+    def test_every_benchmark_runs_at_small_sizes(self):
+        """Test that each hot-function benchmark runs and reports per-item cost"""
+        for name, benchmark in BENCHMARKS.items():
+            result = measure(benchmark, sizes=(10, 100), repeat=1)
+            assert result["n10_ns_per_item"] > 0, name
+            assert result["n100_ns_per_item"] > 0, name
+            assert result["exponent"] is None  # Too small to fit
@@ -0,0 +1,173 @@
+import asyncio
+import gzip
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse, StreamingResponse
+from app.compression import CompressedPayload, CompressionMiddleware, choose_encoding
+from app.models.tournament import TournamentStatus
+from app.routers.players import odds_payloads
+from app.routers import leaderboard as leaderboard_router
+from app.services.leaderboard_service import adjust_prize_pools, completed_leaderboards, invalidate_leaderboard
+
+
+def compressed_app(minimum_size: int = 100) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/large")
+    def large():
+        return {"rows": [{"player": "Scottie Scheffler", "odds": 4.5}] * 50}
+
+    @app.get("/binary")
+    def binary():
+        return PlainTextResponse("x" * 1000, media_type="application/octet-stream")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"{}"] * 200), media_type="application/json")
+
+    return TestClient(app)
+
+
+class TestChooseEncoding:
+    def test_prefers_available_codings_in_order(self):
+        """Test that the first accepted coding in preference order wins"""
+        assert choose_encoding("gzip, br, zstd", ["zstd", "br", "gzip"]) == "zstd"
+        assert choose_encoding("gzip, deflate", ["zstd", "br", "gzip"]) == "gzip"
+
+    def test_honours_q_values(self):
+        """Test that q-values rank codings and q=0 refuses one"""
+        assert choose_encoding("zstd;q=0.5, gzip", ["zstd", "gzip"]) == "gzip"
+        assert choose_encoding("gzip;q=0", ["gzip"]) is None
+        assert choose_encoding("*", ["gzip"]) == "gzip"
+
+    def test_no_acceptable_coding(self):
+        """Test that missing or unsupported Accept-Encoding means no compression"""
+        assert choose_encoding(None) is None
+        assert choose_encoding("identity") is None
+
+
+class TestCompressionMiddleware:
+    def test_large_json_is_compressed(self):
+        """Test that JSON above the threshold is gzipped with a Vary header"""
+        response = compressed_app().get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert len(response.json()["rows"]) == 50
+
+    def test_small_responses_skip_compression(self):
+        """Test that bodies under the threshold are sent as is"""
+        response = compressed_app().get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+
+    def test_uncompressible_types_and_streams_pass_through(self):
+        """Test that binary and streaming responses are not compressed"""
+        client = compressed_app()
+        assert "content-encoding" not in client.get("/binary", headers={"Accept-Encoding": "gzip"}).headers
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content == b"{}" * 200
+
+    def test_client_without_accept_encoding(self):
+        """Test that clients not accepting gzip get plain responses"""
+        response = compressed_app().get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+
+class TestCompressedPayload:
+    def test_serves_accepted_coding(self):
+        """Test that the precompressed variant matching Accept-Encoding is served"""
+        body = json.dumps([{"player_id": i, "odds": 12.5} for i in range(100)]).encode()
+        payload = CompressedPayload(body, minimum_size=100)
+        response = payload.response("gzip, deflate")
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(response.body) == body
+        assert payload.response(None).body == body
+
+    def test_small_payloads_are_not_compressed(self):
+        """Test that bodies under the threshold keep no compressed variants"""
+        payload = CompressedPayload(b'{"ok":true}', minimum_size=100)
+        assert payload.encoded == {}
+        assert "content-encoding" not in payload.response("gzip").headers
+
+
+class TestPrecompressedRoutes:
+    def test_odds_board_is_compressed_once(self, client):
+        """Test that the odds board is cached compressed and served identically afterwards"""
+        first = client.get("/api/players/odds/1", headers={"Accept-Encoding": "gzip"})
+        assert first.headers["content-encoding"] == "gzip"
+        assert len(odds_payloads) == 1
+        plain = client.get("/api/players/odds/1", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.json() == first.json()
+
+    def test_completed_leaderboard_is_cached(self, client, test_league, test_entry, auth_headers, monkeypatch):
+        """Test that leaderboards of completed tournaments are cached until refreshed"""
+        tournament = {"name": "Masters Tournament", "status": TournamentStatus.COMPLETED}
+        monkeypatch.setattr("app.routers.leaderboard.get_mock_tournament", lambda tournament_id: tournament)
+
+        first = client.get(f"/api/leaderboard/{test_league.id}")
+        assert completed_leaderboards.get(test_league.id) is not None
+        second = client.get(f"/api/leaderboard/{test_league.id}")
+        assert second.json() == first.json()
+        assert 'desc="0 queries"' in second.headers["server-timing"]
+
+        client.post(f"/api/leaderboard/{test_league.id}/refresh", headers=auth_headers)
+        assert completed_leaderboards.get(test_league.id) is None
+
+    def test_score_update_evicts_completed_leaderboard(self, client, test_league, test_entry, auth_headers, monkeypatch):
+        """Test that a score correction is served instead of the cached final standings"""
+        tournament = {"name": "Masters Tournament", "status": TournamentStatus.COMPLETED}
+        monkeypatch.setattr("app.routers.leaderboard.get_mock_tournament", lambda tournament_id: tournament)
+
+        client.get(f"/api/leaderboard/{test_league.id}")
+        client.patch(f"/api/entries/{test_entry.id}", json={"total_score": 88.5}, headers=auth_headers)
+        assert completed_leaderboards.get(test_league.id) is None
+        rankings = client.get(f"/api/leaderboard/{test_league.id}").json()["rankings"]
+        assert rankings[0]["score"] == 88.5
+
+    def test_prize_pool_change_evicts_after_commit(self, test_league, async_session_factory):
+        """Test that a prize pool change evicts the cached leaderboard only once committed"""
+        async def change_pool(commit: bool):
+            async with async_session_factory() as db:
+                await adjust_prize_pools(db, {test_league.id: 10.0})
+                assert completed_leaderboards.get(test_league.id) == "cached"
+                if commit:
+                    await db.commit()
+                else:
+                    await db.rollback()
+
+        completed_leaderboards.set(test_league.id, "cached")
+        asyncio.run(change_pool(commit=False))
+        assert completed_leaderboards.get(test_league.id) == "cached"
+        asyncio.run(change_pool(commit=True))
+        assert completed_leaderboards.get(test_league.id) is None
+
+    def test_read_overlapping_a_commit_is_not_cached(self, client, test_league, test_entry, async_session_factory, monkeypatch):
+        """Test that standings read before a change committed are served but not cached"""
+        tournament = {"name": "Masters Tournament", "status": TournamentStatus.COMPLETED}
+        monkeypatch.setattr("app.routers.leaderboard.get_mock_tournament", lambda tournament_id: tournament)
+        original = leaderboard_router.get_league_entries_with_usernames
+
+        async def read_then_concurrent_commit(db, league_id, ranking_only=False):
+            result = await original(db, league_id, ranking_only=ranking_only)
+            async with async_session_factory() as writer:
+                invalidate_leaderboard(writer, league_id)
+                await writer.commit()
+            return result
+
+        monkeypatch.setattr(leaderboard_router, "get_league_entries_with_usernames", read_then_concurrent_commit)
+        assert client.get(f"/api/leaderboard/{test_league.id}").status_code == 200
+        assert completed_leaderboards.get(test_league.id) is None
+
+    def test_upcoming_leaderboard_is_not_cached(self, client, test_league, test_entry):
+        """Test that leaderboards of tournaments still in play are computed per request"""
+        client.get(f"/api/leaderboard/{test_league.id}")
+        assert len(completed_leaderboards) == 0
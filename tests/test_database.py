@@ -0,0 +1,161 @@
+import asyncio
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.database import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    Base,
+    PrimarySession,
+    configure_engine,
+    engine_options,
+    get_read_db,
+    read_session_factory,
+    recent_writers,
+    to_async_url,
+)
+from app.models import User
+
+
+class TestEngineConfiguration:
+    def test_async_url_for_sqlite(self):
+        """Test that SQLite URLs map to the aiosqlite driver"""
+        url = to_async_url("sqlite:///./fantasy_golf.db")
+        assert url.drivername == "sqlite+aiosqlite"
+        assert url.database == "./fantasy_golf.db"
+
+    def test_async_url_for_postgres(self):
+        """Test that Postgres URLs map to asyncpg, keeping credentials and host"""
+        url = to_async_url("postgresql+psycopg2://golf:secret@db:5432/green_draft")
+        assert url.drivername == "postgresql+asyncpg"
+        assert url.username == "golf"
+        assert url.password == "secret"
+        assert url.host == "db"
+        assert url.database == "green_draft"
+
+    def test_async_url_unsupported_backend(self):
+        """Test that unknown backends are rejected"""
+        with pytest.raises(ValueError):
+            to_async_url("mysql://user@localhost/db")
+
+    def test_engine_options_for_postgres(self):
+        """Test that server databases get pool sizing and pre-ping"""
+        options = engine_options("postgresql://golf@db/green_draft")
+        assert "connect_args" not in options
+        assert options["pool_pre_ping"] is True
+        assert {"pool_size", "max_overflow", "pool_timeout"} <= set(options)
+
+    def test_engine_options_for_sqlite_memory(self):
+        """Test that in-memory SQLite skips pool sizing"""
+        options = engine_options("sqlite://")
+        assert options == {"connect_args": {"check_same_thread": False}}
+
+    def test_named_pool_times_checkouts(self, tmp_path):
+        """Test that a named engine's pool records checkout wait per checkout, not per session"""
+        def checkouts():
+            return REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", {"engine": "timed-test"}) or 0.0
+
+        url = f"sqlite:///{tmp_path / 'timed.db'}"
+        engine = create_engine(url, **engine_options(url, name="timed-test"))
+        try:
+            before = checkouts()
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            assert checkouts() == before + 1
+        finally:
+            engine.dispose()
+
+    def test_session_dependency_does_not_check_out(self, monkeypatch):
+        """Test that opening a request session does not take a connection until it is used"""
+        checked_out = []
+
+        class RecordingSession(AsyncSession):
+            async def connection(self, *args, **kwargs):
+                checked_out.append(True)
+                return await super().connection(*args, **kwargs)
+
+        monkeypatch.setattr("app.database.read_session_factory", lambda caller: async_sessionmaker(class_=RecordingSession))
+
+        class FakeRequest:
+            headers = {}
+
+        async def open_and_close():
+            dependency = get_read_db(FakeRequest())
+            await dependency.__anext__()
+            await dependency.aclose()
+
+        asyncio.run(open_and_close())
+        assert checked_out == []
+
+    def test_sqlite_pragmas_applied_on_connect(self, tmp_path):
+        """Test that new SQLite connections use WAL and the tuned pragmas"""
+        url = f"sqlite:///{tmp_path / 'pragmas.db'}"
+        engine = create_engine(url, **engine_options(url))
+        configure_engine(engine)
+        try:
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+                assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+                assert conn.execute(text("PRAGMA cache_size")).scalar() < 0
+        finally:
+            engine.dispose()
+
+
+class TestReadRouting:
+    @pytest.fixture(autouse=True)
+    def clear_recent_writers(self):
+        recent_writers.clear()
+        yield
+        recent_writers.clear()
+
+    def test_reads_go_to_read_engine_by_default(self):
+        """Test that callers without recent writes use the read session"""
+        assert read_session_factory("Bearer abc") is AsyncReadSessionLocal
+        assert read_session_factory(None) is AsyncReadSessionLocal
+
+    def test_read_your_writes_after_commit(self, tmp_path):
+        """Test that a caller who committed a write reads from the primary"""
+        url = f"sqlite:///{tmp_path / 'primary.db'}"
+        sync_engine = create_engine(url)
+        Base.metadata.create_all(bind=sync_engine)
+        sync_engine.dispose()
+
+        engine = create_async_engine(to_async_url(url))
+        sessions = async_sessionmaker(bind=engine, class_=AsyncSession, sync_session_class=PrimarySession)
+
+        async def write_and_read():
+            async with sessions() as db:
+                db.info["caller"] = "Bearer writer"
+                await db.execute(text("SELECT 1"))
+                await db.commit()
+            assert read_session_factory("Bearer writer") is AsyncReadSessionLocal
+
+            async with sessions() as db:
+                db.info["caller"] = "Bearer writer"
+                db.add(User(email="w@example.com", username="writer", hashed_password="hash"))
+                await db.commit()
+            await engine.dispose()
+
+        asyncio.run(write_and_read())
+        assert read_session_factory("Bearer writer") is AsyncSessionLocal
+        assert read_session_factory("Bearer someone-else") is AsyncReadSessionLocal
+
+    def test_read_engine_rejects_writes(self, tmp_path):
+        """Test that connections of a read-only engine cannot write"""
+        url = f"sqlite:///{tmp_path / 'readonly.db'}"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+
+        read_engine = create_engine(url)
+        configure_engine(read_engine, read_only=True)
+        try:
+            with read_engine.connect() as conn:
+                assert conn.execute(text("SELECT count(*) FROM users")).scalar() == 0
+                with pytest.raises(OperationalError):
+                    conn.execute(text("INSERT INTO users (email, username, hashed_password) VALUES ('a', 'b', 'c')"))
+        finally:
+            read_engine.dispose()
@@ -1,4 +1,6 @@
 import pytest
+from app.models import Leaderboard
+from app.models.entry import PaymentStatus
 
 
 class TestGetMyEntries:
@@ -79,6 +81,24 @@ class TestUpdateEntry:
         data = response.json()
         assert data["total_score"] == 150.5
 
+    def test_update_to_refunded_leaves_prize_pool(self, client, test_entry, test_league, auth_headers, db_session):
+        """Test that refunding an entry through PATCH takes its payment out of the prize pool"""
+        test_entry.payment_status = PaymentStatus.PAID
+        test_entry.amount_paid = 100.0
+        leaderboard = db_session.query(Leaderboard).filter_by(league_id=test_league.id).one()
+        leaderboard.prize_pool = 100.0
+        db_session.commit()
+
+        response = client.patch(
+            f"/api/entries/{test_entry.id}",
+            json={"payment_status": "refunded"},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["amount_paid"] == 0.0
+        db_session.expire_all()
+        assert db_session.get(Leaderboard, leaderboard.id).prize_pool == 0.0
+
     def test_update_entry_not_owner(self, client, test_entry, test_user2):
         """Test updating entry by non-owner"""
         # Login as second user
@@ -161,3 +181,14 @@ class TestDeleteEntry:
         """Test deleting non-existent entry"""
         response = client.delete("/api/entries/99999", headers=auth_headers)
         assert response.status_code == 404
+
+    def test_delete_entry_with_amount_paid(self, client, test_entry, auth_headers, db_session):
+        """Test that an entry whose payment is still in the prize pool cannot be deleted"""
+        test_entry.amount_paid = 96.8
+        db_session.commit()
+
+        response = client.delete(
+            f"/api/entries/{test_entry.id}",
+            headers=auth_headers
+        )
+        assert response.status_code == 400
@@ -0,0 +1,94 @@
+import pytest
+from fastapi import HTTPException
+from app.fieldsets import parse_fields
+from app.schemas import EntryResponse, LeaderboardDetailed, TeamResponse
+
+
+class TestParseFields:
+    def test_no_fields_means_everything(self):
+        """Test that a missing or empty fields parameter selects every field"""
+        assert parse_fields(EntryResponse, None) is None
+        assert parse_fields(EntryResponse, "") is None
+
+    def test_top_level_and_nested_fields(self):
+        """Test that nested fields are grouped under their parent"""
+        fields = parse_fields(TeamResponse, "id, picks.player_id,picks.player_category")
+        assert fields == {"id": None, "picks": {"player_id", "player_category"}}
+
+    def test_whole_field_wins_over_nested(self):
+        """Test that asking for a whole nested field keeps all of its fields"""
+        assert parse_fields(LeaderboardDetailed, "rankings,rankings.score") == {"rankings": None}
+
+    def test_unknown_fields_rejected(self):
+        """Test that unknown or non-nested dotted fields are a 400"""
+        with pytest.raises(HTTPException) as exc_info:
+            parse_fields(EntryResponse, "id,password,id.value")
+        assert exc_info.value.status_code == 400
+        assert "password" in exc_info.value.detail
+        assert "id.value" in exc_info.value.detail
+
+
+class TestSparseEntries:
+    def test_my_entries_selects_requested_columns(self, client, test_entry, auth_headers, app_statements):
+        """Test that only the requested entry columns are selected and returned"""
+        response = client.get("/api/entries/my-entries?fields=id,total_score", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == [{"id": test_entry.id, "total_score": test_entry.total_score}]
+        select_entries = [s for s in app_statements if "FROM entries" in s][0]
+        assert "created_at" not in select_entries
+
+    def test_entry_detail_fields(self, client, test_entry, auth_headers):
+        """Test that the entry detail returns only the requested fields"""
+        response = client.get(f"/api/entries/{test_entry.id}?fields=payment_status", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == {"payment_status": "pending"}
+
+    def test_entry_detail_still_checks_ownership(self, client, test_entry, test_user2):
+        """Test that restricting fields does not skip the access check"""
+        login = client.post("/api/users/login", json={"email": test_user2.email, "password": "testpassword123"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        response = client.get(f"/api/entries/{test_entry.id}?fields=id", headers=headers)
+        assert response.status_code == 403
+
+    def test_league_entries_fields(self, client, test_league, test_entry):
+        """Test that the league entry list honours fields"""
+        response = client.get(f"/api/leagues/{test_league.id}/entries?fields=id,user_id")
+        assert response.json() == [{"id": test_entry.id, "user_id": test_entry.user_id}]
+
+    def test_unknown_field_is_400(self, client, auth_headers):
+        """Test that unknown fields are rejected with a 400"""
+        response = client.get("/api/entries/my-entries?fields=id,secret", headers=auth_headers)
+        assert response.status_code == 400
+
+
+class TestSparseTeams:
+    def test_team_without_picks_skips_picks_query(self, client, test_team, app_statements):
+        """Test that picks are not loaded when not requested"""
+        response = client.get(f"/api/teams/{test_team.id}?fields=id,is_valid")
+        assert response.status_code == 200
+        assert response.json() == {"id": test_team.id, "is_valid": True}
+        assert not any("FROM team_picks" in statement for statement in app_statements)
+
+    def test_team_nested_pick_fields(self, client, test_team, test_entry, auth_headers):
+        """Test that nested pick fields restrict the picks"""
+        response = client.get(
+            f"/api/teams/entry/{test_entry.id}?fields=picks.player_id", headers=auth_headers
+        )
+        assert response.status_code == 200
+        picks = response.json()["picks"]
+        assert len(picks) == 5
+        assert all(list(pick) == ["player_id"] for pick in picks)
+
+
+class TestSparseLeaderboard:
+    def test_prizes_only_skips_entries_query(self, client, test_league, test_entry, app_statements):
+        """Test that leaving out rankings skips loading the entries"""
+        response = client.get(f"/api/leaderboard/{test_league.id}?fields=prize_pool,first_place_prize")
+        assert response.status_code == 200
+        assert set(response.json()) == {"prize_pool", "first_place_prize"}
+        assert not any("FROM entries" in statement for statement in app_statements)
+
+    def test_ranking_fields(self, client, test_league, test_entry):
+        """Test that nested ranking fields restrict each ranking"""
+        response = client.get(f"/api/leaderboard/{test_league.id}?fields=rankings.entry_id,rankings.score")
+        assert response.json() == {"rankings": [{"entry_id": test_entry.id, "score": test_entry.total_score}]}
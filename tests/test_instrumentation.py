@@ -0,0 +1,89 @@
+import logging
+import re
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from app.instrumentation import QueryBudgetExceeded, QueryStatsMiddleware, query_budget, route_query_stats
+from app.models import Entry, User
+
+
+def query_count(response) -> int:
+    """Number of queries reported in a response's Server-Timing header"""
+    return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+
+def budget_app(mode: str) -> FastAPI:
+    """Small app whose endpoint runs two queries against a budget of one"""
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, mode=mode)
+
+    @app.get("/chatty")
+    @query_budget(1)
+    def chatty():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"ok": True}
+
+    return app
+
+
+class TestServerTiming:
+    def test_reports_queries_and_db_time(self, client, test_league):
+        """Test that responses carry the query count and DB time"""
+        response = client.get(f"/api/leagues/{test_league.id}")
+        assert response.status_code == 200
+        assert query_count(response) == 1
+        assert re.search(r"db;dur=[\d.]+", response.headers["server-timing"])
+        assert re.search(r"app;dur=[\d.]+", response.headers["server-timing"])
+
+    def test_no_queries_for_catalog_routes(self, client):
+        """Test that routes served from mock data report zero queries"""
+        response = client.get("/api/tournaments")
+        assert query_count(response) == 0
+
+    def test_leaderboard_queries_do_not_grow_with_entries(self, client, test_league, test_entry, db_session):
+        """Test that the leaderboard runs a fixed number of queries (no N+1)"""
+        baseline = query_count(client.get(f"/api/leaderboard/{test_league.id}"))
+
+        for i in range(5):
+            user = User(email=f"player{i}@example.com", username=f"player{i}", hashed_password="x")
+            db_session.add(user)
+            db_session.flush()
+            db_session.add(Entry(user_id=user.id, league_id=test_league.id, total_score=float(i)))
+        db_session.commit()
+
+        response = client.get(f"/api/leaderboard/{test_league.id}")
+        assert len(response.json()["rankings"]) == 6
+        assert query_count(response) == baseline
+
+
+class TestRouteQueryStats:
+    def test_aggregates_per_route_template(self, client, test_league):
+        """Test that requests are aggregated under their route template"""
+        route_query_stats.clear()
+        client.get(f"/api/leagues/{test_league.id}")
+        client.get("/api/leagues/999")
+
+        stats = route_query_stats.snapshot()["GET /api/leagues/{league_id}"]
+        assert stats["requests"] == 2
+        assert stats["queries_max"] == 1
+
+
+class TestQueryBudget:
+    def test_raise_mode_fails_request_over_budget(self):
+        """Test that assertion mode raises when a route exceeds its budget"""
+        with TestClient(budget_app("raise")) as client:
+            with pytest.raises(QueryBudgetExceeded):
+                client.get("/chatty")
+
+    def test_warn_mode_logs_and_serves(self, caplog):
+        """Test that warn mode serves the response and logs the overrun"""
+        with TestClient(budget_app("warn")) as client:
+            with caplog.at_level(logging.WARNING, logger="app.instrumentation"):
+                response = client.get("/chatty")
+        assert response.status_code == 200
+        assert query_count(response) == 2
+        assert "over its budget of 1" in caplog.text
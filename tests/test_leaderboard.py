@@ -1,5 +1,5 @@
 import pytest
-from app.models import Entry, User
+from app.models import Entry, Leaderboard, User
 
 
 class TestGetLeaderboard:
@@ -52,7 +52,8 @@ class TestGetLeaderboard:
         entry2 = Entry(
             user_id=test_user2.id,
             league_id=test_league.id,
-            total_score=150.0
+            total_score=150.0,
+            amount_paid=100.0
         )
         db_session.add(entry2)
 
@@ -68,19 +69,23 @@ class TestGetLeaderboard:
         entry3 = Entry(
             user_id=user3.id,
             league_id=test_league.id,
-            total_score=100.0
+            total_score=100.0,
+            amount_paid=100.0
         )
         db_session.add(entry3)
 
         # Set scores
         test_entry.total_score = 200.0
+        test_entry.amount_paid = 100.0
         db_session.commit()
 
+        # Prize pools come from amount received; refresh recomputes them
+        assert client.post(f"/api/leaderboard/{test_league.id}/refresh").status_code == 200
         response = client.get(f"/api/leaderboard/{test_league.id}")
         assert response.status_code == 200
         data = response.json()
 
-        # Check prize pool calculation (3 entries * 100.0 entry fee)
+        # Check prize pool calculation (3 entries paid 100.0 each)
         assert data["prize_pool"] == 300.0
         assert data["first_place_prize"] == 180.0  # 60%
         assert data["second_place_prize"] == 90.0   # 30%
@@ -104,6 +109,21 @@ class TestGetLeaderboard:
         data = response.json()
         assert data["prize_pool"] == 0.0
 
+    def test_get_leaderboard_reads_stored_prizes(self, client, test_league, test_entry, db_session, app_statements):
+        """Test that prizes come from the running totals, with no aggregation on read"""
+        leaderboard = db_session.query(Leaderboard).filter_by(league_id=test_league.id).one()
+        leaderboard.prize_pool = 193.6
+        leaderboard.first_place_prize = 116.16
+        leaderboard.second_place_prize = 58.08
+        leaderboard.third_place_prize = 19.36
+        db_session.commit()
+
+        data = client.get(f"/api/leaderboard/{test_league.id}").json()
+
+        assert data["prize_pool"] == 193.6
+        assert data["rankings"][0]["prize"] == 116.16
+        assert not any("sum(" in statement.lower() for statement in app_statements)
+
 
 class TestRefreshLeaderboard:
     def test_refresh_leaderboard_success(self, client, test_league, test_entry):
@@ -154,16 +174,33 @@ class TestRefreshLeaderboard:
         response = client.post("/api/leaderboard/99999/refresh")
         assert response.status_code == 404
 
+    def test_refresh_leaderboard_repairs_drifted_pool(self, client, test_league, test_entry, db_session):
+        """Test that refresh replaces a drifted running total with the amount received"""
+        test_entry.amount_paid = 96.8
+        leaderboard = db_session.query(Leaderboard).filter_by(league_id=test_league.id).one()
+        leaderboard.prize_pool = 500.0
+        db_session.commit()
+
+        response = client.post(f"/api/leaderboard/{test_league.id}/refresh")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["prize_pool"] == 96.8
+        assert data["first_place_prize"] == 58.08
+        assert data["second_place_prize"] == 29.04
+        assert data["third_place_prize"] == 9.68
+
     def test_refresh_leaderboard_recalculates_prizes(self, client, test_league, test_entry, test_user2, db_session):
         """Test that refresh recalculates prizes"""
         # Create additional entry
         entry2 = Entry(
             user_id=test_user2.id,
             league_id=test_league.id,
-            total_score=100.0
+            total_score=100.0,
+            amount_paid=100.0
         )
         db_session.add(entry2)
         test_entry.total_score = 150.0
+        test_entry.amount_paid = 100.0
         db_session.commit()
 
         # Refresh leaderboard
@@ -171,7 +208,7 @@ class TestRefreshLeaderboard:
         assert response.status_code == 200
         data = response.json()
 
-        # Check prize calculation (2 entries * 100.0 entry fee)
+        # Check prize calculation (2 entries paid 100.0 each)
         assert data["prize_pool"] == 200.0
         assert data["first_place_prize"] == 120.0  # 60%
         assert data["second_place_prize"] == 60.0  # 30%
@@ -1,4 +1,5 @@
 import pytest
+from app.models import Entry, User
 
 
 class TestCreateLeague:
@@ -194,3 +195,98 @@ class TestDeleteLeague:
         """Test deleting non-existent league"""
         response = client.delete("/api/leagues/99999", headers=auth_headers)
         assert response.status_code == 404
+
+
+class TestGetLeagueDashboard:
+    def test_dashboard_success(self, client, test_league, test_entry, test_team, auth_headers):
+        """Test getting every dashboard section in one call"""
+        response = client.get(f"/api/leagues/{test_league.id}/dashboard", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["unchanged"] == []
+        assert data["league"]["id"] == test_league.id
+        assert [e["id"] for e in data["entries"]] == [test_entry.id]
+        assert data["leaderboard"]["rankings"][0]["entry_id"] == test_entry.id
+        assert data["team"]["id"] == test_team.id
+        assert len(data["team"]["picks"]) == 5
+        assert data["tournament"]["id"] == test_league.tournament_id
+
+    def test_dashboard_with_unscored_entry(self, client, test_league, test_entry, test_user2, auth_headers, db_session):
+        """Test that entries without a score are listed and ranked last instead of failing the dashboard"""
+        scored = Entry(user_id=test_user2.id, league_id=test_league.id, total_score=12.0)
+        db_session.add(scored)
+        test_entry.total_score = None
+        db_session.commit()
+
+        response = client.get(f"/api/leagues/{test_league.id}/dashboard", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert {e["id"]: e["total_score"] for e in data["entries"]} == {test_entry.id: None, scored.id: 12.0}
+        rankings = data["leaderboard"]["rankings"]
+        assert [(r["entry_id"], r["score"]) for r in rankings] == [(scored.id, 12.0), (test_entry.id, None)]
+
+    def test_dashboard_unchanged_since_version(self, client, test_league, test_entry, test_team, auth_headers):
+        """Test that sections are omitted when unchanged since the client's version"""
+        first = client.get(f"/api/leagues/{test_league.id}/dashboard", headers=auth_headers).json()
+
+        response = client.get(
+            f"/api/leagues/{test_league.id}/dashboard",
+            params={"since": first["version"]},
+            headers=auth_headers
+        )
+        data = response.json()
+        assert data["version"] == first["version"]
+        assert set(data["unchanged"]) == {"league", "entries", "leaderboard", "team", "tournament"}
+        assert data["league"] is None
+        assert data["entries"] is None
+        assert data["leaderboard"] is None
+        assert data["team"] is None
+        assert data["tournament"] is None
+
+    def test_dashboard_recomputes_changed_sections(self, client, test_league, test_entry, test_user2, auth_headers, db_session):
+        """Test that only sections affected by a change are recomputed"""
+        first = client.get(f"/api/leagues/{test_league.id}/dashboard", headers=auth_headers).json()
+
+        db_session.add(Entry(user_id=test_user2.id, league_id=test_league.id, total_score=10.0))
+        db_session.commit()
+
+        response = client.get(
+            f"/api/leagues/{test_league.id}/dashboard",
+            params={"since": first["version"]},
+            headers=auth_headers
+        )
+        data = response.json()
+        assert set(data["unchanged"]) == {"league", "team", "tournament"}
+        assert len(data["entries"]) == 2
+        assert data["leaderboard"]["rankings"][0]["score"] == 10.0
+
+    def test_dashboard_query_count_is_fixed(self, client, test_league, test_entry, test_team, test_user2, auth_headers, db_session, app_statements):
+        """Test that the number of queries does not grow with the number of entries"""
+        # Warm up so per-user caches do not skew the counts
+        client.get(f"/api/leagues/{test_league.id}/dashboard", headers=auth_headers)
+
+        app_statements.clear()
+        client.get(f"/api/leagues/{test_league.id}/dashboard", headers=auth_headers)
+        small = len(app_statements)
+
+        for i in range(5):
+            user = User(email=f"dash{i}@example.com", username=f"dash{i}", hashed_password="hash")
+            db_session.add(user)
+            db_session.flush()
+            db_session.add(Entry(user_id=user.id, league_id=test_league.id))
+        db_session.commit()
+
+        app_statements.clear()
+        client.get(f"/api/leagues/{test_league.id}/dashboard", headers=auth_headers)
+        assert len(app_statements) == small
+
+    def test_dashboard_not_found(self, client, auth_headers):
+        """Test getting the dashboard of a non-existent league"""
+        response = client.get("/api/leagues/99999/dashboard", headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_dashboard_no_auth(self, client, test_league):
+        """Test getting the dashboard without authentication"""
+        response = client.get(f"/api/leagues/{test_league.id}/dashboard")
+        assert response.status_code == 403
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import subprocess
+import sys
+from prometheus_client import REGISTRY
+from app.services.stripe_service import stripe_call
+
+
+def sample(name, **labels):
+    """Current value of a metric sample in the default registry (0 when absent)"""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetricsEndpoint:
+    def test_exposes_prometheus_text(self, client):
+        """Test that /metrics serves the Prometheus text format"""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_requests_in_progress" in response.text
+        assert "threadpool_size" in response.text
+
+    def test_records_latency_by_route_template(self, client, test_league):
+        """Test that latency is labelled with the route template, not the raw path"""
+        labels = {"method": "GET", "route": "/api/leagues/{league_id}", "status": "200"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        client.get(f"/api/leagues/{test_league.id}")
+
+        assert sample("http_request_duration_seconds_count", **labels) == before + 1
+        assert 'route="/api/leagues/{league_id}"' in client.get("/metrics").text
+
+    def test_unmatched_paths_share_a_label(self, client):
+        """Test that unknown paths do not create a label per path"""
+        labels = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = sample("http_request_duration_seconds_count", **labels)
+
+        client.get("/api/does-not-exist-1")
+        client.get("/api/does-not-exist-2")
+
+        assert sample("http_request_duration_seconds_count", **labels) == before + 2
+
+    def test_counts_cache_hits_and_misses(self, client, auth_headers):
+        """Test that principal cache lookups are exported as hit/miss counters"""
+        hits = sample("cache_lookups_total", cache="principal", result="hit")
+        misses = sample("cache_lookups_total", cache="principal", result="miss")
+
+        client.get("/api/entries/my-entries", headers=auth_headers)
+        client.get("/api/entries/my-entries", headers=auth_headers)
+
+        assert sample("cache_lookups_total", cache="principal", result="miss") == misses + 1
+        assert sample("cache_lookups_total", cache="principal", result="hit") == hits + 1
+
+    def test_records_stripe_call_latency(self):
+        """Test that Stripe API calls are timed per operation"""
+        async def double(value):
+            return value * 2
+
+        before = sample("stripe_request_duration_seconds_count", operation="test.op")
+        assert asyncio.run(stripe_call("test.op", double, 21)) == 42
+        assert sample("stripe_request_duration_seconds_count", operation="test.op") == before + 1
+
+    def test_multiprocess_mode_merges_worker_files(self, tmp_path):
+        """Test that metrics written by several processes are merged on scrape"""
+        script = (
+            "from app.metrics import STRIPE_LATENCY, metrics_registry;"
+            "from prometheus_client import generate_latest;"
+            "STRIPE_LATENCY.labels('merge').observe(0.1);"
+            "print(generate_latest(metrics_registry()).decode())"
+        )
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        for _ in range(2):
+            result = subprocess.run(
+                [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+            )
+
+        assert 'stripe_request_duration_seconds_count{operation="merge"} 2.0' in result.stdout
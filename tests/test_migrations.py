@@ -0,0 +1,90 @@
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, func, select, text
+from app.database import Base
+from app.models import Entry, League, PlayerOdds, Team, TeamPick
+from app.services.home_service import home_entries_query
+
+
+@pytest.fixture(scope="module")
+def migrated_engine(tmp_path_factory):
+    """A fresh database built only from the Alembic migration history"""
+    url = f"sqlite:///{tmp_path_factory.mktemp('migrations') / 'migrated.db'}"
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, statement):
+    """Run EXPLAIN QUERY PLAN for a statement and return the plan details"""
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return [row.detail for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+class TestMigrations:
+    def test_migrations_match_models(self, migrated_engine):
+        """Test that the migration history produces exactly the schema the models declare"""
+        with migrated_engine.connect() as conn:
+            diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+        assert diff == []
+
+    def test_downgrade_to_base(self, tmp_path):
+        """Test that every migration can be reverted"""
+        url = f"sqlite:///{tmp_path / 'downgrade.db'}"
+        config = Config("alembic.ini")
+        config.set_main_option("sqlalchemy.url", url)
+        command.upgrade(config, "head")
+        command.downgrade(config, "base")
+
+        engine = create_engine(url)
+        with engine.connect() as conn:
+            tables = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars().all()
+        engine.dispose()
+        assert tables == ["alembic_version"]
+
+
+class TestHotQueryPlans:
+    """Hot queries must search an index, never scan a whole table"""
+
+    @pytest.mark.parametrize("statement, table", [
+        (select(Entry).where(Entry.league_id == 1), "entries"),
+        (select(Entry).where(Entry.user_id == 1), "entries"),
+        (select(func.count(Entry.id), func.max(Entry.updated_at)).where(Entry.league_id == 1), "entries"),
+        (select(Team).where(Team.entry_id == 1), "teams"),
+        (select(TeamPick).where(TeamPick.team_id == 1), "team_picks"),
+        (select(PlayerOdds).where(PlayerOdds.tournament_id == 1, PlayerOdds.category == 2), "player_odds"),
+        (select(League).where(League.creator_id == 1), "leagues"),
+        (select(Entry).where(Entry.stripe_payment_intent_id == "pi_1"), "entries"),
+    ])
+    def test_hot_query_uses_index(self, migrated_engine, statement, table):
+        plan = query_plan(migrated_engine, statement)
+        table_steps = [step for step in plan if f" {table} " in f" {step} "]
+        assert table_steps, plan
+        assert all(step.startswith("SEARCH") and "INDEX" in step for step in table_steps), plan
+
+    def test_league_entries_use_composite_index(self, migrated_engine):
+        """Test that league entry lookups use the (league_id, total_score) index"""
+        plan = query_plan(migrated_engine, select(Entry).where(Entry.league_id == 1))
+        assert any("ix_entries_league_id_total_score" in step for step in plan), plan
+
+    def test_odds_board_uses_composite_index(self, migrated_engine):
+        """Test that the odds board uses the (tournament_id, category) index"""
+        plan = query_plan(
+            migrated_engine,
+            select(PlayerOdds).where(PlayerOdds.tournament_id == 1, PlayerOdds.category == 2)
+        )
+        assert any("ix_player_odds_tournament_id_category" in step for step in plan), plan
+
+    def test_home_ranks_use_rank_index(self, migrated_engine):
+        """Test that the home feed ranks entries from the (league_id, total_score) index"""
+        plan = query_plan(migrated_engine, home_entries_query(1))
+        assert any("ix_entries_league_id_total_score" in step for step in plan), plan
+        assert not any(step.startswith("SCAN entries") for step in plan), plan
@@ -0,0 +1,628 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+import pytest
+import stripe
+from sqlalchemy import update
+from app.auth import create_access_token
+from app.database import get_read_db
+from app.models import Entry, Leaderboard, WebhookEvent, WebhookEventStatus
+from app.models.entry import PaymentStatus
+from app.services.stripe_standin import sign_webhook_payload
+from app.routers.payments import seen_webhook_events
+from app.services.payment_events import set_amount_paid
+from app.services import reconciliation
+from app.services.reconciliation import reconcile
+from app.services.stripe_service import CircuitBreaker, StripeGateway, StripeUnavailable, stripe_gateway
+from app.services.webhook_processor import retry_delay
+from main import app
+
+
+def post_event(client, event: dict, secret: str = "whsec_test"):
+    body = json.dumps(event).encode()
+    return client.post(
+        "/api/payments/webhook",
+        content=body,
+        headers={"stripe-signature": sign_webhook_payload(body, secret), "content-type": "application/json"},
+    )
+
+
+def checkout_completed(event_id: str, session: dict) -> dict:
+    return {"id": event_id, "type": "checkout.session.completed", "data": {"object": session}}
+
+
+def charge_refunded(event_id: str, payment_intent: str, refunded: bool = True) -> dict:
+    return {
+        "id": event_id,
+        "type": "charge.refunded",
+        "data": {"object": {"payment_intent": payment_intent, "refunded": refunded}},
+    }
+
+
+def prizes(db_session, league_id: int):
+    db_session.expire_all()
+    leaderboard = db_session.query(Leaderboard).filter_by(league_id=league_id).one()
+    return (
+        leaderboard.prize_pool,
+        leaderboard.first_place_prize,
+        leaderboard.second_place_prize,
+        leaderboard.third_place_prize,
+    )
+
+
+def charge_updated(event_id: str, payment_intent: str, balance_transaction: str) -> dict:
+    return {
+        "id": event_id,
+        "type": "charge.updated",
+        "data": {"object": {"payment_intent": payment_intent, "balance_transaction": balance_transaction}},
+    }
+
+
+class TestWebhookEndpoint:
+    def test_rejects_bad_signature(self, client, db_session):
+        """Test that events signed with the wrong secret are rejected and not stored"""
+        response = post_event(client, checkout_completed("evt_1", {}), secret="whsec_wrong")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid signature"
+        assert db_session.query(WebhookEvent).count() == 0
+
+    def test_rejects_invalid_payload(self, client):
+        """Test that a body that is not an event is rejected"""
+        body = b"not json"
+        response = client.post(
+            "/api/payments/webhook",
+            content=body,
+            headers={"stripe-signature": sign_webhook_payload(body, "whsec_test")},
+        )
+        assert response.status_code == 400
+
+    def test_queues_event_without_processing(self, client, db_session, test_entry, local_stripe):
+        """Test that a verified event is stored as pending and acknowledged before it is applied"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        response = post_event(client, checkout_completed("evt_1", session))
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+
+        event = db_session.query(WebhookEvent).one()
+        assert event.event_id == "evt_1"
+        assert event.event_type == "checkout.session.completed"
+        assert event.status == WebhookEventStatus.PENDING
+        assert db_session.get(Entry, test_entry.id).payment_status == PaymentStatus.PENDING
+        assert sum(local_stripe.calls.values()) == 0
+
+
+class TestWebhookIdempotency:
+    def test_redelivery_is_acknowledged_without_database_work(self, client, db_session, test_entry, local_stripe, app_statements):
+        """Test that a repeated event is answered from the seen-events cache"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        assert post_event(client, checkout_completed("evt_1", session)).json() == {"status": "ok"}
+        app_statements.clear()
+
+        response = post_event(client, checkout_completed("evt_1", session))
+        assert response.status_code == 200
+        assert response.json() == {"status": "duplicate"}
+        assert app_statements == []
+        assert db_session.query(WebhookEvent).count() == 1
+
+    def test_unique_event_id_catches_duplicates_missed_by_cache(self, client, db_session, test_entry, local_stripe):
+        """Test that an event stored by another process is acknowledged once, not stored twice"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        post_event(client, checkout_completed("evt_1", session))
+        seen_webhook_events.clear()
+
+        response = post_event(client, checkout_completed("evt_1", session))
+        assert response.status_code == 200
+        assert response.json() == {"status": "duplicate"}
+        assert db_session.query(WebhookEvent).count() == 1
+        assert seen_webhook_events.get("evt_1")
+
+    def test_duplicates_are_applied_once(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that a burst of redeliveries leads to a single processed event"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        transaction = local_stripe.add_balance_transaction(10000, 320)
+        for _ in range(5):
+            post_event(client, charge_updated("evt_2", session["payment_intent"], transaction["id"]))
+
+        assert asyncio.run(webhook_processor.drain()) == 1
+        assert local_stripe.calls["BalanceTransaction.retrieve"] == 1
+
+
+class TestWebhookReplay:
+    def test_replays_events_in_time_range(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that processed events received in the range are processed again, and only those"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        post_event(client, checkout_completed("evt_old", session))
+        post_event(client, checkout_completed("evt_new", session))
+        asyncio.run(webhook_processor.drain())
+
+        old = db_session.query(WebhookEvent).filter_by(event_id="evt_old").one()
+        old.created_at = datetime.utcnow() - timedelta(days=2)
+        db_session.commit()
+
+        now = datetime.utcnow()
+        replayed = asyncio.run(webhook_processor.replay(now - timedelta(hours=1), now + timedelta(seconds=1)))
+        assert replayed == 1
+
+        db_session.expire_all()
+        assert db_session.query(WebhookEvent).filter_by(event_id="evt_new").one().status == WebhookEventStatus.PENDING
+        assert db_session.query(WebhookEvent).filter_by(event_id="evt_old").one().status == WebhookEventStatus.DONE
+        assert asyncio.run(webhook_processor.drain()) == 1
+
+    def test_replay_filters_by_status(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that failed events can be retried on their own"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        post_event(client, checkout_completed("evt_1", session))
+        post_event(client, charge_updated("evt_2", session["payment_intent"], "txn_missing"))
+        failed = db_session.query(WebhookEvent).filter_by(event_id="evt_2").one()
+        failed.attempts = webhook_processor.max_attempts - 1
+        db_session.commit()
+        asyncio.run(webhook_processor.drain())
+
+        now = datetime.utcnow()
+        replayed = asyncio.run(
+            webhook_processor.replay(now - timedelta(hours=1), now, status=WebhookEventStatus.FAILED)
+        )
+        assert replayed == 1
+
+        db_session.expire_all()
+        event = db_session.query(WebhookEvent).filter_by(event_id="evt_2").one()
+        assert event.status == WebhookEventStatus.PENDING
+        assert event.attempts == 0
+        assert event.last_error is None
+
+
+class TestWebhookProcessor:
+    def test_checkout_completed_marks_entry_paid(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that draining the outbox applies a completed checkout"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        post_event(client, checkout_completed("evt_1", session))
+
+        assert asyncio.run(webhook_processor.drain()) == 1
+
+        db_session.expire_all()
+        assert db_session.get(Entry, test_entry.id).payment_status == PaymentStatus.PAID
+        event = db_session.query(WebhookEvent).one()
+        assert event.status == WebhookEventStatus.DONE
+        assert event.processed_at is not None
+
+    def test_charge_updated_records_net_amount(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that the net amount comes from the charge's balance transaction"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        transaction = local_stripe.add_balance_transaction(10000, 320)
+        post_event(client, charge_updated("evt_2", session["payment_intent"], transaction["id"]))
+
+        asyncio.run(webhook_processor.drain())
+
+        db_session.expire_all()
+        entry = db_session.get(Entry, test_entry.id)
+        assert entry.amount_paid == 96.8
+        assert local_stripe.calls["BalanceTransaction.retrieve"] == 1
+        # Found through Stripe this time; the ids are kept for later events
+        assert local_stripe.calls["checkout.Session.list"] == 1
+        assert entry.stripe_payment_intent_id == session["payment_intent"]
+        assert entry.stripe_checkout_session_id == session["id"]
+
+    def test_checkout_completed_stores_stripe_ids(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that a completed checkout records the session and payment intent ids on the entry"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        post_event(client, checkout_completed("evt_1", session))
+        asyncio.run(webhook_processor.drain())
+
+        db_session.expire_all()
+        entry = db_session.get(Entry, test_entry.id)
+        assert entry.stripe_checkout_session_id == session["id"]
+        assert entry.stripe_payment_intent_id == session["payment_intent"]
+
+    def test_charge_updated_resolves_entry_locally(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that a charge after its completed checkout needs no checkout session lookup"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        transaction = local_stripe.add_balance_transaction(10000, 320)
+        post_event(client, checkout_completed("evt_1", session))
+        post_event(client, charge_updated("evt_2", session["payment_intent"], transaction["id"]))
+
+        assert asyncio.run(webhook_processor.drain()) == 2
+
+        db_session.expire_all()
+        assert db_session.get(Entry, test_entry.id).amount_paid == 96.8
+        assert local_stripe.calls["checkout.Session.list"] == 0
+
+    def test_failure_is_retried_with_backoff(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that a failing event goes back to pending with a later retry time"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        post_event(client, charge_updated("evt_3", session["payment_intent"], "txn_missing"))
+
+        before = datetime.utcnow()
+        assert asyncio.run(webhook_processor.drain()) == 1  # Not due again yet
+
+        event = db_session.query(WebhookEvent).one()
+        assert event.status == WebhookEventStatus.PENDING
+        assert event.attempts == 1
+        assert "txn_missing" in event.last_error
+        assert event.next_attempt_at > before
+
+    def test_gives_up_after_max_attempts(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that an event failing on its last attempt is marked failed"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        post_event(client, charge_updated("evt_4", session["payment_intent"], "txn_missing"))
+        event = db_session.query(WebhookEvent).one()
+        event.attempts = webhook_processor.max_attempts - 1
+        db_session.commit()
+
+        asyncio.run(webhook_processor.drain())
+
+        db_session.expire_all()
+        event = db_session.query(WebhookEvent).one()
+        assert event.status == WebhookEventStatus.FAILED
+        assert event.attempts == webhook_processor.max_attempts
+
+    def test_workers_process_after_notify(self, client, db_session, test_entry, local_stripe, webhook_processor):
+        """Test that running workers pick up new events on their own"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        post_event(client, checkout_completed("evt_5", session))
+
+        async def run_workers():
+            await webhook_processor.start()
+            webhook_processor.notify()
+            try:
+                for _ in range(100):
+                    await asyncio.sleep(0.02)
+                    db_session.expire_all()
+                    if db_session.query(WebhookEvent).one().status == WebhookEventStatus.DONE:
+                        return True
+                return False
+            finally:
+                await webhook_processor.stop()
+
+        assert asyncio.run(run_workers())
+        db_session.expire_all()
+        assert db_session.get(Entry, test_entry.id).payment_status == PaymentStatus.PAID
+
+    def test_retry_delay_is_exponential_and_capped(self):
+        """Test the backoff schedule"""
+        assert [retry_delay(n, base=2, cap=600) for n in range(1, 5)] == [2, 4, 8, 16]
+        assert retry_delay(20, base=2, cap=600) == 600
+
+
+class TestPrizePool:
+    def pay(self, client, local_stripe, entry, event_number: int, amount: int = 10000, fee: int = 320):
+        session = local_stripe.add_checkout_session(entry.id, amount)
+        transaction = local_stripe.add_balance_transaction(amount, fee, payment_intent=session["payment_intent"])
+        post_event(client, checkout_completed(f"evt_{event_number}a", session))
+        post_event(client, charge_updated(f"evt_{event_number}b", session["payment_intent"], transaction["id"]))
+        return session
+
+    def test_payments_add_to_the_pool(self, client, db_session, test_league, test_entry, test_user2, local_stripe, webhook_processor):
+        """Test that each net payment is added to the pool and re-split 60/30/10"""
+        second_entry = Entry(user_id=test_user2.id, league_id=test_league.id)
+        db_session.add(second_entry)
+        db_session.commit()
+
+        self.pay(client, local_stripe, test_entry, 1)
+        self.pay(client, local_stripe, second_entry, 2)
+        asyncio.run(webhook_processor.drain())
+
+        assert prizes(db_session, test_league.id) == (193.6, 116.16, 58.08, 19.36)
+
+    def test_changed_amount_adjusts_by_the_difference(self, client, db_session, test_league, test_entry, local_stripe, webhook_processor):
+        """Test that a repeated or corrected charge moves the pool by the change only"""
+        session = self.pay(client, local_stripe, test_entry, 1)
+        corrected = local_stripe.add_balance_transaction(10000, 500, payment_intent=session["payment_intent"])
+        post_event(client, charge_updated("evt_2", session["payment_intent"], corrected["id"]))
+        asyncio.run(webhook_processor.drain())
+
+        assert prizes(db_session, test_league.id)[0] == 95.0
+
+    def test_refund_removes_payment_from_the_pool(self, client, db_session, test_league, test_entry, local_stripe, webhook_processor):
+        """Test that a full refund marks the entry refunded and takes its amount out of the pool"""
+        session = self.pay(client, local_stripe, test_entry, 1)
+        post_event(client, charge_refunded("evt_2", session["payment_intent"]))
+        asyncio.run(webhook_processor.drain())
+
+        assert prizes(db_session, test_league.id) == (0.0, 0.0, 0.0, 0.0)
+        entry = db_session.get(Entry, test_entry.id)
+        assert entry.payment_status == PaymentStatus.REFUNDED
+        assert entry.amount_paid == 0.0
+
+    def test_late_charge_update_does_not_refill_refunded_entry(self, client, db_session, test_league, test_entry, local_stripe, webhook_processor):
+        """Test that a charge update arriving after the refund leaves the pool alone"""
+        session = self.pay(client, local_stripe, test_entry, 1)
+        post_event(client, charge_refunded("evt_2", session["payment_intent"]))
+        transaction = local_stripe.add_balance_transaction(10000, 320, payment_intent=session["payment_intent"])
+        post_event(client, charge_updated("evt_3", session["payment_intent"], transaction["id"]))
+        asyncio.run(webhook_processor.drain())
+
+        assert prizes(db_session, test_league.id)[0] == 0.0
+
+    def test_concurrent_charge_updates_count_once(self, client, db_session, test_league, test_entry, local_stripe, webhook_processor):
+        """Test that two workers handling charge updates for the same entry at once add it to the pool once"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        transaction = local_stripe.add_balance_transaction(10000, 320, payment_intent=session["payment_intent"])
+        post_event(client, checkout_completed("evt_1", session))
+        asyncio.run(webhook_processor.drain())
+        post_event(client, charge_updated("evt_2", session["payment_intent"], transaction["id"]))
+        post_event(client, charge_updated("evt_3", session["payment_intent"], transaction["id"]))
+
+        async def process_concurrently():
+            await asyncio.gather(webhook_processor.process_next(), webhook_processor.process_next())
+
+        asyncio.run(process_concurrently())
+        # A worker that lost the database lock retries; make its retry due now
+        db_session.query(WebhookEvent).filter_by(status=WebhookEventStatus.PENDING).update(
+            {"next_attempt_at": datetime.utcnow()}
+        )
+        db_session.commit()
+        asyncio.run(webhook_processor.drain())
+
+        assert prizes(db_session, test_league.id)[0] == 96.8
+        assert db_session.get(Entry, test_entry.id).amount_paid == 96.8
+
+    def test_stale_amount_does_not_double_count(self, db_session, async_session_factory, test_league, test_entry):
+        """Test that a worker holding a stale amount_paid does not add the payment again"""
+        async def race():
+            async with async_session_factory() as first, async_session_factory() as second:
+                first_entry = await first.get(Entry, test_entry.id)
+                second_entry = await second.get(Entry, test_entry.id)
+                await second.commit()  # Both read amount_paid=0.0 before either wrote
+                assert await set_amount_paid(first, first_entry, 96.8)
+                await first.commit()
+                assert await set_amount_paid(second, second_entry, 96.8)
+                await second.commit()
+
+        asyncio.run(race())
+        assert prizes(db_session, test_league.id)[0] == 96.8
+
+    def test_replayed_checkout_does_not_revive_refunded_entry(self, client, db_session, test_league, test_entry, local_stripe, webhook_processor):
+        """Test that replaying a refunded entry's checkout event leaves it refunded"""
+        session = self.pay(client, local_stripe, test_entry, 1)
+        post_event(client, charge_refunded("evt_2", session["payment_intent"]))
+        asyncio.run(webhook_processor.drain())
+
+        now = datetime.utcnow()
+        assert asyncio.run(webhook_processor.replay(now - timedelta(hours=1), now + timedelta(seconds=1))) == 3
+        asyncio.run(webhook_processor.drain())
+
+        db_session.expire_all()
+        assert db_session.get(Entry, test_entry.id).payment_status == PaymentStatus.REFUNDED
+        assert prizes(db_session, test_league.id)[0] == 0.0
+
+    def test_pool_matches_full_recomputation(self, client, db_session, test_league, test_entry, local_stripe, webhook_processor):
+        """Test that the running total equals summing amount_paid over the league"""
+        self.pay(client, local_stripe, test_entry, 1, amount=5000, fee=175)
+        asyncio.run(webhook_processor.drain())
+
+        db_session.expire_all()
+        recomputed = Leaderboard(league_id=test_league.id)
+        recomputed.calculate_prizes(db_session.query(Entry).filter_by(league_id=test_league.id).all())
+        assert prizes(db_session, test_league.id) == (
+            recomputed.prize_pool,
+            recomputed.first_place_prize,
+            recomputed.second_place_prize,
+            recomputed.third_place_prize,
+        )
+
+
+class TestCheckout:
+    def test_create_league_returns_checkout_url(self, client, db_session, auth_headers, test_user):
+        """Test that creating a league opens a checkout session for the creator's entry and stores its id"""
+        response = client.post(
+            "/api/leagues",
+            json={"name": "Paid League", "tournament_id": 1, "entry_fee": 25.0, "max_participants": 10},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        checkout_url = response.json()["checkout_url"]
+
+        entry = db_session.query(Entry).filter_by(user_id=test_user.id).one()
+        session = stripe_gateway.checkout_sessions[entry.stripe_checkout_session_id]
+        assert session["url"] == checkout_url
+        assert session["amount_total"] == 2500
+        assert session["metadata"] == {"entry_id": str(entry.id)}
+
+    def test_join_league_stores_checkout_session(self, client, db_session, test_league, test_user2):
+        """Test that joining a league stores the checkout session id on the new entry"""
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user2.id)})}"}
+        response = client.post("/api/leagues/join", json={"invitation_code": test_league.invitation_code}, headers=headers)
+        assert response.status_code == 201
+
+        entry = db_session.get(Entry, response.json()["entry"]["id"])
+        assert entry.stripe_checkout_session_id in stripe_gateway.checkout_sessions
+
+    def test_no_connection_held_during_stripe_call(self, client, test_league, test_user2, auth_headers, async_session_factory, app_connections, monkeypatch):
+        """Test that neither the write session nor the authenticating read session is held while Stripe is called"""
+        async def separate_read_db():
+            async with async_session_factory() as session:
+                yield session
+
+        monkeypatch.setitem(app.dependency_overrides, get_read_db, separate_read_db)
+        held = []
+        original = stripe_gateway.create_checkout_session
+
+        async def recording_checkout(**kwargs):
+            held.append(app_connections())
+            return await original(**kwargs)
+
+        monkeypatch.setattr(stripe_gateway, "create_checkout_session", recording_checkout)
+        response = client.post(
+            "/api/leagues",
+            json={"name": "Pool League", "tournament_id": 1, "entry_fee": 25.0, "max_participants": 10},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user2.id)})}"}
+        response = client.post("/api/leagues/join", json={"invitation_code": test_league.invitation_code}, headers=headers)
+        assert response.status_code == 201
+        assert held == [0, 0]
+
+    def test_stripe_outage_returns_503(self, client, test_league, test_user2, monkeypatch):
+        """Test that an unavailable payment provider is reported as a retryable error"""
+        async def unavailable(**kwargs):
+            raise StripeUnavailable("circuit open")
+
+        monkeypatch.setattr(stripe_gateway, "create_checkout_session", unavailable)
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user2.id)})}"}
+        response = client.post("/api/leagues/join", json={"invitation_code": test_league.invitation_code}, headers=headers)
+        assert response.status_code == 503
+
+
+class TestStripeGateway:
+    def test_circuit_opens_after_consecutive_failures(self):
+        """Test that the breaker refuses calls once the failure threshold is reached"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.is_open
+        assert not breaker.allow()
+
+    def test_circuit_lets_one_trial_through_after_reset_timeout(self):
+        """Test the half-open state: a single trial call, closed again on success"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.reset_timeout = 60
+        assert not breaker.allow()  # Trial in flight
+        breaker.record_success()
+        assert breaker.allow()
+
+    def test_outages_trip_the_breaker_and_fail_fast(self):
+        """Test that connection errors surface as StripeUnavailable and stop further calls"""
+        gateway = StripeGateway(CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        attempts = []
+
+        async def unreachable(**kwargs):
+            attempts.append(kwargs)
+            raise stripe.APIConnectionError("connection reset")
+
+        async def call_three_times():
+            for _ in range(3):
+                with pytest.raises(StripeUnavailable):
+                    await gateway._request("test.op", unreachable)
+
+        asyncio.run(call_three_times())
+        assert len(attempts) == 2
+
+    def test_request_errors_do_not_trip_the_breaker(self):
+        """Test that Stripe rejecting a request counts as Stripe being reachable"""
+        gateway = StripeGateway(CircuitBreaker(failure_threshold=1, reset_timeout=60))
+
+        async def invalid(**kwargs):
+            raise stripe.InvalidRequestError("No such payment_intent", "id")
+
+        with pytest.raises(stripe.InvalidRequestError):
+            asyncio.run(gateway._request("test.op", invalid))
+        assert not gateway.breaker.is_open
+
+
+class TestReconciliation:
+    @pytest.fixture
+    def second_entry(self, db_session, test_league, test_user2):
+        entry = Entry(user_id=test_user2.id, league_id=test_league.id)
+        db_session.add(entry)
+        db_session.commit()
+        return entry
+
+    def test_repairs_entries_whose_webhooks_were_lost(self, db_session, async_session_factory, test_entry, second_entry, local_stripe):
+        """Test that pending entries with completed payments are marked paid with the net amount"""
+        for entry in (test_entry, second_entry):
+            session = local_stripe.add_checkout_session(entry.id, 10000)
+            local_stripe.add_balance_transaction(10000, 320, payment_intent=session["payment_intent"])
+
+        report = asyncio.run(reconcile(async_session_factory, local_stripe))
+
+        db_session.expire_all()
+        for entry in (test_entry, second_entry):
+            entry = db_session.get(Entry, entry.id)
+            assert entry.payment_status == PaymentStatus.PAID
+            assert entry.amount_paid == 96.8
+            assert entry.stripe_payment_intent_id is not None
+        assert prizes(db_session, test_entry.league_id)[0] == 193.6
+        assert report.checkout_sessions == 2
+        assert report.balance_transactions == 2
+        assert report.marked_paid == 2
+        assert report.amounts_corrected == 2
+        assert report.unmatched == 0
+
+    def test_is_idempotent(self, db_session, async_session_factory, test_entry, local_stripe):
+        """Test that a second run finds nothing left to correct"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        local_stripe.add_balance_transaction(10000, 320, payment_intent=session["payment_intent"])
+        asyncio.run(reconcile(async_session_factory, local_stripe))
+
+        report = asyncio.run(reconcile(async_session_factory, local_stripe))
+        assert (report.marked_paid, report.ids_backfilled, report.amounts_corrected) == (0, 0, 0)
+
+    def test_dry_run_reports_without_changes(self, db_session, async_session_factory, test_entry, local_stripe):
+        """Test that a dry run counts mismatches but leaves entries untouched"""
+        local_stripe.add_checkout_session(test_entry.id, 10000)
+
+        report = asyncio.run(reconcile(async_session_factory, local_stripe, dry_run=True))
+
+        assert report.marked_paid == 1
+        db_session.expire_all()
+        assert db_session.get(Entry, test_entry.id).payment_status == PaymentStatus.PENDING
+
+    def test_one_query_per_page(self, db_session, async_session_factory, test_entry, second_entry, local_stripe, app_statements):
+        """Test that each page is matched with a single query and corrected with batched updates"""
+        for entry in (test_entry, second_entry):
+            session = local_stripe.add_checkout_session(entry.id, 10000)
+            local_stripe.add_balance_transaction(10000, 320, payment_intent=session["payment_intent"])
+        local_stripe.add_checkout_session(9999, 10000)  # Entry that does not exist here
+
+        report = asyncio.run(reconcile(async_session_factory, local_stripe, page_size=2))
+
+        assert report.pages == 3  # Two pages of sessions, one of balance transactions
+        assert report.unmatched == 1
+        selects = [statement for statement in app_statements if statement.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == report.pages
+        assert local_stripe.calls["checkout.Session.list"] == 2
+        assert local_stripe.calls["BalanceTransaction.list"] == 1
+
+    def test_does_not_revive_refunded_entries(self, db_session, async_session_factory, test_entry, local_stripe):
+        """Test that refunded entries keep their status"""
+        test_entry.payment_status = PaymentStatus.REFUNDED
+        db_session.commit()
+        local_stripe.add_checkout_session(test_entry.id, 10000)
+
+        report = asyncio.run(reconcile(async_session_factory, local_stripe))
+
+        assert report.marked_paid == 0
+        assert report.ids_backfilled == 1
+        db_session.expire_all()
+        assert db_session.get(Entry, test_entry.id).payment_status == PaymentStatus.REFUNDED
+
+    def webhook_first(self, monkeypatch, **values):
+        """Make a webhook worker change the entries right before reconciliation's UPDATE"""
+        original = reconciliation._apply
+
+        async def apply_after_webhook(db, ids, conditions, changes):
+            await db.execute(update(Entry).where(Entry.id.in_(ids)).values(**values))
+            return await original(db, ids, conditions, changes)
+
+        monkeypatch.setattr(reconciliation, "_apply", apply_after_webhook)
+
+    def test_refund_after_read_is_not_marked_paid(self, db_session, async_session_factory, test_entry, local_stripe, monkeypatch):
+        """Test that an entry refunded between the page query and the UPDATE stays refunded"""
+        local_stripe.add_checkout_session(test_entry.id, 10000)
+        self.webhook_first(monkeypatch, payment_status=PaymentStatus.REFUNDED)
+
+        report = asyncio.run(reconcile(async_session_factory, local_stripe))
+
+        assert report.marked_paid == 0
+        db_session.expire_all()
+        assert db_session.get(Entry, test_entry.id).payment_status == PaymentStatus.REFUNDED
+
+    def test_amount_set_after_read_is_not_counted_twice(self, db_session, async_session_factory, test_league, test_entry, local_stripe, monkeypatch):
+        """Test that an amount a webhook worker recorded meanwhile is not added to the pool again"""
+        session = local_stripe.add_checkout_session(test_entry.id, 10000)
+        local_stripe.add_balance_transaction(10000, 320, payment_intent=session["payment_intent"])
+        test_entry.payment_status = PaymentStatus.PAID
+        test_entry.stripe_payment_intent_id = session["payment_intent"]
+        leaderboard = db_session.query(Leaderboard).filter_by(league_id=test_league.id).one()
+        leaderboard.prize_pool = 96.8  # The worker's payment, already in the pool
+        db_session.commit()
+        self.webhook_first(monkeypatch, amount_paid=96.8)
+
+        report = asyncio.run(reconcile(async_session_factory, local_stripe))
+
+        assert report.amounts_corrected == 0
+        assert prizes(db_session, test_league.id)[0] == 96.8
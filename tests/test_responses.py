@@ -0,0 +1,61 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app.models import Entry
+from app.models.entry import PaymentStatus
+from app.responses import FastJSONResponse, dumps, schema_columns
+from app.schemas import EntryResponse, LeaderboardDetailed, UserHome
+
+
+class TestFastJSONResponse:
+    def test_encodes_like_the_default_encoder(self):
+        """Test that orjson output matches FastAPI's encoder for enums, datetimes and models"""
+        created_at = datetime(2026, 4, 10, 14, 30, 5, 123456)
+        entry = EntryResponse(
+            user_id=1, league_id=2, id=3, payment_status=PaymentStatus.PAID,
+            amount_paid=24.1, total_score=-7.0, created_at=created_at, updated_at=created_at,
+        )
+        content = {"entry": entry, "status": PaymentStatus.PENDING, "at": created_at, "pool": Decimal("12.50")}
+        assert json.loads(dumps(content)) == jsonable_encoder(content)
+
+    def test_response_body_and_media_type(self):
+        """Test that the response renders its content as JSON"""
+        response = FastJSONResponse({"ids": [1, 2], "name": "Masters"})
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == {"ids": [1, 2], "name": "Masters"}
+
+    def test_schema_columns_follow_schema_fields(self):
+        """Test that selected columns carry the response schema's field names"""
+        columns = schema_columns(EntryResponse, Entry)
+        assert [column.key for column in columns] == list(EntryResponse.model_fields)
+
+
+class TestTrustedRoutes:
+    def test_my_entries_matches_entry_detail(self, client, test_entry, auth_headers):
+        """Test that the row-encoded entry list returns the same objects as the validated detail route"""
+        listed = client.get("/api/entries/my-entries", headers=auth_headers).json()
+        detail = client.get(f"/api/entries/{test_entry.id}", headers=auth_headers).json()
+        assert listed == [detail]
+
+    def test_league_entries_match_entry_detail(self, client, test_entry, test_league, auth_headers):
+        """Test that the league entry list returns the same objects as the validated detail route"""
+        listed = client.get(f"/api/leagues/{test_league.id}/entries", headers=auth_headers).json()
+        detail = client.get(f"/api/entries/{test_entry.id}", headers=auth_headers).json()
+        assert listed == [detail]
+
+    def test_unscored_entries_fit_published_schemas(self, client, test_entry, test_league, auth_headers, db_session):
+        """Test that unvalidated responses with a NULL score still match the response models in the docs"""
+        test_entry.total_score = None
+        db_session.commit()
+
+        entries = client.get("/api/entries/my-entries", headers=auth_headers).json()
+        assert entries[0]["total_score"] is None
+        TypeAdapter(List[EntryResponse]).validate_python(entries)
+        TypeAdapter(List[EntryResponse]).validate_python(
+            client.get(f"/api/leagues/{test_league.id}/entries", headers=auth_headers).json()
+        )
+        LeaderboardDetailed.model_validate(client.get(f"/api/leaderboard/{test_league.id}").json())
+        UserHome.model_validate(client.get("/api/users/me/home", headers=auth_headers).json())
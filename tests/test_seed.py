@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from app.auth import verify_password
+from app.database import Base
+from app.models import Entry, League, Leaderboard, PlayerOdds, Team, TeamPick, User
+from benchmarks.seed import FIELD_SIZE, SEED_PASSWORD, seed
+
+
+@pytest.fixture
+def seed_engine(tmp_path):
+    """Empty schema in a temporary SQLite file"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def dump(engine, model):
+    """All rows of a table, ordered by id"""
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(select(model.__table__).order_by(model.id))]
+
+
+class TestSeed:
+    def test_writes_requested_volumes(self, seed_engine):
+        """Test that the requested users, leagues and entries are written with their dependants"""
+        counts = seed(seed_engine, users=50, leagues=6, entries=40, batch_size=7)
+
+        assert counts["users"] == 50
+        assert counts["leagues"] == counts["leaderboards"] == 6
+        assert counts["entries"] == 40
+        assert counts["player_odds"] == FIELD_SIZE * 4
+        assert counts["team_picks"] == counts["teams"] * 5
+
+        with seed_engine.connect() as conn:
+            sizes = conn.execute(select(func.count()).select_from(Entry).group_by(Entry.league_id)).scalars().all()
+            assert sorted(sizes) == [6, 6, 7, 7, 7, 7]
+            invalid = conn.execute(
+                select(func.count()).select_from(Team).where(Team.is_valid != (Team.total_category_points >= 13))
+            ).scalar()
+            assert invalid == 0
+
+    def test_same_seed_gives_same_rows(self, seed_engine, tmp_path):
+        """Test that generation is deterministic for a given seed"""
+        other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+        Base.metadata.create_all(bind=other)
+        try:
+            seed(seed_engine, users=30, leagues=4, entries=20, seed_value=7)
+            seed(other, users=30, leagues=4, entries=20, seed_value=7)
+            for model in (User, League, Leaderboard, Entry, Team, TeamPick, PlayerOdds):
+                assert dump(seed_engine, model) == dump(other, model)
+        finally:
+            other.dispose()
+
+    def test_appends_after_existing_rows(self, seed_engine):
+        """Test that a second run adds new ids instead of colliding with the first"""
+        seed(seed_engine, users=20, leagues=2, entries=10)
+        counts = seed(seed_engine, users=20, leagues=2, entries=10, seed_value=1)
+
+        assert counts["player_odds"] == 0  # Reference data is only written once
+        with seed_engine.connect() as conn:
+            assert conn.execute(select(func.count()).select_from(User)).scalar() == 40
+            assert conn.execute(select(func.count()).select_from(Entry)).scalar() == 20
+
+    def test_rejects_more_members_than_users(self, seed_engine):
+        """Test that leagues cannot need more distinct members than there are users"""
+        with pytest.raises(ValueError):
+            seed(seed_engine, users=3, leagues=1, entries=10)
+
+    def test_seeded_users_can_log_in(self, seed_engine):
+        """Test that the shared seed password verifies against the stored hash"""
+        seed(seed_engine, users=1, leagues=0, entries=0)
+        with seed_engine.connect() as conn:
+            hashed_password = conn.execute(select(User.hashed_password)).scalar()
+        assert verify_password(SEED_PASSWORD, hashed_password)
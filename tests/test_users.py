@@ -1,4 +1,7 @@
 import pytest
+from app.auth import principal_cache
+from app.password_hasher import password_hasher
+from app.models import Entry, League, Leaderboard, User
 
 
 class TestUserRegistration:
@@ -89,6 +92,35 @@ class TestUserLogin:
         assert response.status_code == 401
 
 
+class TestHashingReleasesConnection:
+    @pytest.fixture
+    def connections_during_hash(self, monkeypatch, app_connections):
+        """Connections the app held each time a password was hashed or verified"""
+        seen = []
+        original = password_hasher.run
+
+        async def recording_run(fn, *args):
+            seen.append(app_connections())
+            return await original(fn, *args)
+
+        monkeypatch.setattr(password_hasher, "run", recording_run)
+        return seen
+
+    def test_login_hashes_without_a_connection(self, client, test_user, connections_during_hash):
+        """Test that login returns its connection to the pool before verifying the password"""
+        response = client.post("/api/users/login", json={"email": test_user.email, "password": "testpassword123"})
+        assert response.status_code == 200
+        assert connections_during_hash == [0]
+
+    def test_register_hashes_without_a_connection(self, client, connections_during_hash):
+        """Test that registration returns its connection to the pool before hashing the password"""
+        response = client.post("/api/users/register", json={
+            "email": "pool@example.com", "username": "pooluser", "password": "secret123",
+        })
+        assert response.status_code == 201
+        assert connections_during_hash == [0]
+
+
 class TestGetCurrentUser:
     def test_get_current_user_success(self, client, test_user, auth_headers):
         """Test getting current user info"""
@@ -113,6 +145,49 @@ class TestGetCurrentUser:
         assert response.status_code == 401
 
 
+class TestPrincipalCache:
+    def test_principal_cached_after_first_request(self, client, test_user, auth_headers):
+        """Test that authenticated requests reuse the cached principal"""
+        client.get("/api/entries/my-entries", headers=auth_headers)
+        assert principal_cache.get(test_user.id).username == test_user.username
+
+        hits = principal_cache.hits
+        client.get("/api/entries/my-entries", headers=auth_headers)
+        assert principal_cache.hits > hits
+
+    def test_principal_invalidated_on_user_update(self, client, test_user, auth_headers, db_session):
+        """Test that updating a user drops its cached principal"""
+        client.get("/api/entries/my-entries", headers=auth_headers)
+        assert principal_cache.get(test_user.id) is not None
+
+        test_user.username = "renamed"
+        db_session.commit()
+        assert principal_cache.get(test_user.id) is None
+
+        response = client.get("/api/users/me", headers=auth_headers)
+        assert response.json()["username"] == "renamed"
+
+    def test_principal_kept_until_commit(self, client, test_user, auth_headers, db_session):
+        """Test that a flushed but uncommitted change leaves the principal cached, and a rollback keeps it"""
+        client.get("/api/entries/my-entries", headers=auth_headers)
+
+        test_user.username = "renamed"
+        db_session.flush()
+        assert principal_cache.get(test_user.id) is not None
+        db_session.rollback()
+        db_session.commit()
+        assert principal_cache.get(test_user.id) is not None
+
+    def test_deleted_user_rejected(self, client, test_user, auth_headers, db_session):
+        """Test that a deleted user's token stops working"""
+        client.get("/api/entries/my-entries", headers=auth_headers)
+        db_session.delete(test_user)
+        db_session.commit()
+
+        response = client.get("/api/entries/my-entries", headers=auth_headers)
+        assert response.status_code == 401
+
+
 class TestGetUser:
     def test_get_user_by_id_success(self, client, test_user):
         """Test getting user by ID"""
@@ -126,3 +201,98 @@ class TestGetUser:
         """Test getting non-existent user"""
         response = client.get("/api/users/99999")
         assert response.status_code == 404
+
+
+class TestUserHome:
+    def test_home_entry_details(self, client, test_entry, test_team, test_league, auth_headers, db_session):
+        """Test that the home feed returns each entry with league, team, rank and field size"""
+        leaderboard = db_session.query(Leaderboard).filter_by(league_id=test_league.id).one()
+        leaderboard.first_place_prize = 60.0
+        db_session.commit()
+
+        response = client.get("/api/users/me/home", headers=auth_headers)
+        assert response.status_code == 200
+        [entry] = response.json()["entries"]
+        assert entry["entry_id"] == test_entry.id
+        assert entry["league_name"] == test_league.name
+        assert entry["tournament_name"] == "Masters Tournament"
+        assert entry["team_id"] == test_team.id
+        assert entry["team_valid"] is True
+        assert entry["rank"] == 1
+        assert entry["field_size"] == 1
+        assert entry["projected_prize"] == 60.0
+
+    def test_home_ranks_against_whole_league(self, client, test_user, test_user2, auth_headers, db_session):
+        """Test that ranks and field sizes count every entry of each league"""
+        scores = {1: [10.0, 30.0, 20.0], 2: [5.0, 5.0]}
+        for number, league_scores in scores.items():
+            league = League(
+                name=f"League {number}", creator_id=test_user.id, tournament_id=1,
+                entry_fee=10.0, invitation_code=f"HOME000{number}",
+            )
+            db_session.add(league)
+            db_session.flush()
+            db_session.add(Leaderboard(league_id=league.id))
+            db_session.add(Entry(user_id=test_user.id, league_id=league.id, total_score=league_scores[0]))
+            db_session.add(Entry(user_id=test_user2.id, league_id=league.id, total_score=league_scores[1]))
+            for index, score in enumerate(league_scores[2:]):
+                other = User(email=f"home{number}{index}@example.com", username=f"home{number}{index}", hashed_password="x")
+                db_session.add(other)
+                db_session.flush()
+                db_session.add(Entry(user_id=other.id, league_id=league.id, total_score=score))
+        db_session.commit()
+
+        entries = client.get("/api/users/me/home", headers=auth_headers).json()["entries"]
+        assert [(e["league_name"], e["rank"], e["field_size"]) for e in entries] == [
+            ("League 1", 3, 3),
+            ("League 2", 1, 2),
+        ]
+        assert all(e["team_valid"] is False and e["team_id"] is None for e in entries)
+
+    def test_home_ranks_match_leaderboard_positions(self, client, test_user, test_user2, test_league, auth_headers, db_session):
+        """Test that ties and missing scores are ranked as on the leaderboard, so projected prizes agree"""
+        db_session.add(Entry(user_id=test_user2.id, league_id=test_league.id, total_score=5.0))
+        db_session.flush()
+        mine = Entry(user_id=test_user.id, league_id=test_league.id, total_score=5.0)
+        other = User(email="unscored@example.com", username="unscored", hashed_password="x")
+        db_session.add_all([mine, other])
+        db_session.flush()
+        unscored = Entry(user_id=other.id, league_id=test_league.id)
+        db_session.add(unscored)
+        db_session.flush()
+        unscored.total_score = None
+        leaderboard = db_session.query(Leaderboard).filter_by(league_id=test_league.id).one()
+        leaderboard.first_place_prize = 60.0
+        leaderboard.second_place_prize = 30.0
+        leaderboard.third_place_prize = 10.0
+        db_session.commit()
+
+        entries = client.get("/api/users/me/home", headers=auth_headers).json()["entries"]
+        assert [(e["entry_id"], e["rank"], e["projected_prize"]) for e in entries] == [(mine.id, 2, 30.0)]
+        rankings = client.get(f"/api/leaderboard/{test_league.id}").json()["rankings"]
+        positions = {r["entry_id"]: r["position"] for r in rankings}
+        assert positions[mine.id] == 2
+        assert positions[unscored.id] == 3
+
+    def test_home_runs_one_query(self, client, test_entry, test_user, auth_headers, db_session, app_statements):
+        """Test that the feed is one statement however many leagues the user entered"""
+        for number in range(3):
+            league = League(
+                name=f"Extra {number}", creator_id=test_user.id, tournament_id=2,
+                entry_fee=10.0, invitation_code=f"EXTRA00{number}",
+            )
+            db_session.add(league)
+            db_session.flush()
+            db_session.add(Entry(user_id=test_user.id, league_id=league.id))
+        db_session.commit()
+
+        client.get("/api/users/me", headers=auth_headers)  # Cache the principal
+        app_statements.clear()
+        response = client.get("/api/users/me/home", headers=auth_headers)
+        assert len(response.json()["entries"]) == 4
+        assert len(app_statements) == 1
+
+    def test_home_requires_authentication(self, client):
+        """Test that the home feed needs a bearer token"""
+        response = client.get("/api/users/me/home")
+        assert response.status_code == 403